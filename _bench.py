@@ -0,0 +1,41 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+import ujson
+
+from impl.assets_utils.path import ASSETS_ROOT
+from impl.benchmark.harness import BenchmarkHarness
+
+
+async def run(args):
+    with BenchmarkHarness(args.fixtures, record=args.record, latency=args.latency, timeout=args.timeout) as harness:
+        results = await harness.run(args.spider or None, manager=not args.no_manager)
+    print(BenchmarkHarness.format_results(results))
+    if args.output:
+        args.output.write_text(ujson.dumps([i.to_dict() for i in results], indent=4), encoding="utf-8")
+    if args.baseline:
+        baseline = ujson.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = BenchmarkHarness.compare(results, baseline, args.threshold)
+        for i in regressions:
+            print(f"性能退化: {i}")
+        if regressions:
+            raise SystemExit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="爬虫基准测试：回放录制的上游响应")
+    parser.add_argument("--fixtures", type=Path, default=ASSETS_ROOT / "bench" / "fixtures", help="录制数据目录")
+    parser.add_argument("--record", action="store_true", help="请求真实上游并录制响应")
+    parser.add_argument("--latency", type=float, default=0.0, help="回放时模拟的网络延迟（秒）")
+    parser.add_argument("--timeout", type=float, default=600.0, help="单个爬虫的超时时间（秒）")
+    parser.add_argument("--spider", action="append", help="只运行指定的爬虫类，可重复")
+    parser.add_argument("--no-manager", action="store_true", help="不运行完整的 SpiderManager.start_crawl")
+    parser.add_argument("--output", type=Path, default=None, help="结果输出为 JSON")
+    parser.add_argument("--baseline", type=Path, default=None, help="与基线 JSON 比较")
+    parser.add_argument("--threshold", type=float, default=0.2, help="允许的相对退化比例")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
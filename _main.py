@@ -1,3 +1,5 @@
+import argparse
+
 from impl.config import config
 
 import logging
@@ -8,6 +10,8 @@ if config.DEBUG:
 from persica.context.application import ApplicationContext
 from persica.applicationbuilder import ApplicationBuilder
 
+from impl.models.enums import Game, DataType
+
 app = (
     ApplicationBuilder()
     .set_application_context_class(ApplicationContext)
@@ -16,14 +20,93 @@ app = (
 )
 
 
+def _parse_enum(enum_class):
+    def wrapper(value: str) -> str:
+        for i in enum_class:
+            if value.lower() in (i.value.lower(), i.name.lower()):
+                return i.value
+        raise argparse.ArgumentTypeError(f"invalid choice: {value}")
+
+    return wrapper
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description="爬取游戏资源")
+    parser.add_argument(
+        "-g", "--game", action="append", type=_parse_enum(Game), default=[], help="只爬取指定的游戏，可重复"
+    )
+    parser.add_argument(
+        "-t",
+        "--data-type",
+        action="append",
+        type=_parse_enum(DataType),
+        default=[],
+        help="只爬取指定的数据类型，可重复",
+    )
+    parser.add_argument(
+        "-s", "--source", action="append", type=str.lower, default=[], help="只爬取指定的数据源，可重复"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="只输出将要运行的爬取单元")
+    parser.add_argument("--no-icons", action="store_true", help="只爬取数据，不下载图标")
+    parser.add_argument("--resume", action="store_true", help="从上一次中断的检查点继续爬取")
+    parser.add_argument("--force", action="store_true", help="忽略数据源指纹，强制重新解析")
+    parser.add_argument("--workers", type=int, default=None, help="启动指定数量的工作进程并行爬取")
+    parser.add_argument("--worker", action="store_true", help="以工作进程模式运行，从工作队列中领取爬取单元")
+    parser.add_argument("--queue", type=str, default=None, help="工作队列目录，默认为 data/queue")
+    return parser.parse_args(args)
+
+
+def apply_args(args):
+    """命令行参数覆盖环境变量中的配置"""
+    if args.game:
+        config.GAMES = args.game
+    if args.data_type:
+        config.DATA_TYPES = args.data_type
+    if args.source:
+        config.SOURCES = args.source
+    config.DRY_RUN = config.DRY_RUN or args.dry_run
+    config.NO_ICONS = config.NO_ICONS or args.no_icons
+    config.RESUME = config.RESUME or args.resume
+    config.FORCE = config.FORCE or args.force
+    if args.workers is not None:
+        config.WORKERS = args.workers
+    config.WORKER = config.WORKER or args.worker
+    if args.queue:
+        config.QUEUE_DIR = args.queue
+
+
+def apply_queue_config():
+    """工作进程沿用协调者的配置"""
+    from impl.core.work_queue import WorkQueue, get_queue_dir
+
+    for key, value in WorkQueue(get_queue_dir()).load_config().items():
+        setattr(config, key, value)
+
+
 async def run():
     from impl.core._abstract_spider import SpiderManager
+    from impl.core.checkpoint import CheckpointStore
+    from impl.core.disk_writer import DiskWriter
 
-    await app.initialize()
-    await SpiderManager.start_crawl()
+    try:
+        if config.WORKER:
+            await app.initialize()
+            await SpiderManager.run_worker()
+            return
+        if not config.RESUME and not config.DRY_RUN:
+            CheckpointStore.clear()
+        await app.initialize()
+        await SpiderManager.start_crawl()
+    finally:
+        # 后台写线程是守护线程，退出前确保所有文件已经落盘
+        await DiskWriter.flush()
+        DiskWriter.stop()
 
 
 def main():
+    apply_args(parse_args())
+    if config.WORKER:
+        apply_queue_config()
     app.context.run()
     app.loop.run_until_complete(run())
 
@@ -0,0 +1,19 @@
+import argparse
+from pathlib import Path
+
+from impl.core.publisher import Publisher, LocalBucket
+
+
+def main():
+    parser = argparse.ArgumentParser(description="发布爬取结果：生成清单并增量重建归档分片")
+    parser.add_argument("--bucket", type=Path, default=None, help="本地模拟存储桶目录，用于同步校验")
+    parser.add_argument("--no-full-archive", action="store_true", help="不生成全量归档")
+    parser.add_argument("--workers", type=int, default=None, help="并行线程数")
+    args = parser.parse_args()
+
+    bucket = LocalBucket(args.bucket) if args.bucket else None
+    Publisher.publish(bucket=bucket, full_archive=not args.no_full_archive, max_workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import abc
 from typing import List, Dict, Any, Optional
 
 from impl.core._abstract_spider import BaseSpider
+from impl.core.file_manager import FileManager
 from impl.models.base import BaseWikiModel
 
 
@@ -13,34 +14,20 @@ class AmbrBaseSpider(BaseSpider):
 
     async def start_crawl(self) -> List[BaseWikiModel]:
         req, _ = await self._request("GET", self.url)
-        data = req.json()
-        d = []
-        tasks = []
-        for i in data.get("data", {}).get("items", {}).values():
-            tasks.append(self._parse_content(i))
-            if len(tasks) > 10:
-                t = await self.gather_tasks(tasks)
-                d.extend([j for j in t if j])
-        if tasks:
-            t = await self.gather_tasks(tasks)
-            d.extend([j for j in t if j])
-        return d
+        if self.check_source(req.content):
+            return []
+        data = await FileManager.decode_json(req.content)
+        items = {str(k): v for k, v in data.get("data", {}).get("items", {}).items()}
+        return await self.parse_items(items, lambda _, i: self.parse_content(i))
 
     @staticmethod
     def get_icon_url(filename: str, ext: str) -> str:
         return f"https://gi.yatta.moe/assets/UI/{filename}.{ext}"
 
-    async def _parse_content(self, data: Dict[str, Any]) -> Optional[BaseWikiModel]:
-        try:
-            return await self.parse_content(data)
-        except Exception as e:
-            print(f"解析数据失败: {e}")
-            return None
-
     @abc.abstractmethod
-    async def parse_content(self, data: Dict[str, Any]) -> BaseWikiModel:
+    async def parse_content(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         解析数据
         :param data:
-        :return:
+        :return: 模型数据，由 parse_items 整批校验
         """
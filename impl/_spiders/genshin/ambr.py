@@ -1,5 +1,4 @@
 from typing import Dict, Any
-from impl.models.base import BaseWikiModel, IconAsset, IconAssetUrl
 from impl.models.enums import Game, DataType
 from impl.models.genshin.enums import Association
 from impl.models.genshin.artifact import Artifact
@@ -13,6 +12,7 @@ from impl._spiders.ambr import AmbrBaseSpider
 class AmbrCharacterSpider(AmbrBaseSpider):
     game: "Game" = Game.GENSHIN
     data_type: "DataType" = DataType.CHARACTER
+    model = Character
 
     url = "https://gi.yatta.moe/api/v2/chs/avatar"
 
@@ -47,29 +47,18 @@ class AmbrCharacterSpider(AmbrBaseSpider):
             "association": Association.convert(data["region"]),
         }
 
-    async def parse_content(self, data: Dict[str, Any]) -> BaseWikiModel:
+    async def parse_content(self, data: Dict[str, Any]) -> Dict[str, Any]:
         c_data = await self.get_character_data(data)
         game_name = self.get_game_name(data["icon"])
-        c = Character.model_validate(c_data)
         # 图片
-        game_name_map = self.game_name_map(game_name)
-        for k, v in game_name_map.items():
-            u = self.get_icon_url(v[0], v[1])
-            try:
-                p = await self._download_file(u)
-            except Exception as e:
-                print(f"下载图片失败：", c, e)
-                continue
-            i = IconAsset()
-            j = IconAssetUrl(url=u, path=str(p))
-            setattr(i, v[1], j)
-            setattr(c, k, i)
-        return c
+        c_data.update(await self.get_icon_assets(self.game_name_map(game_name)))
+        return c_data
 
 
 class AmbrWeaponSpider(AmbrBaseSpider):
     game: "Game" = Game.GENSHIN
     data_type: "DataType" = DataType.WEAPON
+    model = Weapon
 
     url = "https://gi.yatta.moe/api/v2/chs/weapon"
 
@@ -96,29 +85,18 @@ class AmbrWeaponSpider(AmbrBaseSpider):
             "description": "",
         }
 
-    async def parse_content(self, data: Dict[str, Any]) -> BaseWikiModel:
+    async def parse_content(self, data: Dict[str, Any]) -> Dict[str, Any]:
         c_data = await self.get_character_data(data)
         game_name = self.get_game_name(data["icon"])
-        c = Weapon.model_validate(c_data)
         # 图片
-        game_name_map = self.game_name_map(game_name)
-        for k, v in game_name_map.items():
-            u = self.get_icon_url(v[0], v[1])
-            try:
-                p = await self._download_file(u)
-            except Exception as e:
-                print(f"下载图片失败：", c, e)
-                continue
-            i = IconAsset()
-            j = IconAssetUrl(url=u, path=str(p))
-            setattr(i, v[1], j)
-            setattr(c, k, i)
-        return c
+        c_data.update(await self.get_icon_assets(self.game_name_map(game_name)))
+        return c_data
 
 
 class AmbrMaterialSpider(AmbrBaseSpider):
     game: "Game" = Game.GENSHIN
     data_type: "DataType" = DataType.MATERIAL
+    model = Material
 
     url = "https://gi.yatta.moe/api/v2/chs/material"
 
@@ -138,28 +116,17 @@ class AmbrMaterialSpider(AmbrBaseSpider):
             "material_type": "",
         }
 
-    async def parse_content(self, data: Dict[str, Any]) -> BaseWikiModel:
+    async def parse_content(self, data: Dict[str, Any]) -> Dict[str, Any]:
         c_data = await self.get_character_data(data)
-        c = Material.model_validate(c_data)
         # 图片
-        game_name_map = self.game_name_map(data["icon"])
-        for k, v in game_name_map.items():
-            u = self.get_icon_url(v[0], v[1])
-            try:
-                p = await self._download_file(u)
-            except Exception as e:
-                print(f"下载图片失败：", c, e)
-                continue
-            i = IconAsset()
-            j = IconAssetUrl(url=u, path=str(p))
-            setattr(i, v[1], j)
-            setattr(c, k, i)
-        return c
+        c_data.update(await self.get_icon_assets(self.game_name_map(data["icon"])))
+        return c_data
 
 
 class AmbrArtifactSpider(AmbrBaseSpider):
     game: "Game" = Game.GENSHIN
     data_type: "DataType" = DataType.ARTIFACT
+    model = Artifact
 
     url = "https://gi.yatta.moe/api/v2/chs/reliquary"
 
@@ -187,36 +154,17 @@ class AmbrArtifactSpider(AmbrBaseSpider):
     def get_icon_url(filename: str, ext: str) -> str:
         return f"https://gi.yatta.moe/assets/UI/reliquary/{filename}.{ext}"
 
-    async def parse_content(self, data: Dict[str, Any]) -> BaseWikiModel:
+    async def parse_content(self, data: Dict[str, Any]) -> Dict[str, Any]:
         c_data = await self.get_character_data(data)
-        c = Artifact.model_validate(c_data)
         # 图片
-        game_name_map = self.game_name_map(c.id)
-        for k, v in game_name_map.items():
-            u = self.get_icon_url(v[0], v[1])
-            try:
-                p = await self._download_file(u)
-            except Exception as e:
-                if c.id not in [
-                    "15004",  # 冰之川与雪之砂
-                    "15009",  # 祭火之人
-                    "15010",  # 祭水之人
-                    "15011",  # 祭雷之人
-                    "15012",  # 祭风之人
-                    "15013",  # 祭冰之人
-                ]:
-                    print(f"下载图片失败：", c, e)
-                continue
-            i = IconAsset()
-            j = IconAssetUrl(url=u, path=str(p))
-            setattr(i, v[1], j)
-            setattr(c, k, i)
-        return c
+        c_data.update(await self.get_icon_assets(self.game_name_map(str(c_data["id"]))))
+        return c_data
 
 
 class AmbrNameCardSpider(AmbrBaseSpider):
     game: "Game" = Game.GENSHIN
     data_type: "DataType" = DataType.NAMECARD
+    model = NameCard
 
     url = "https://gi.yatta.moe/api/v2/chs/namecard"
     priority = 90
@@ -243,20 +191,8 @@ class AmbrNameCardSpider(AmbrBaseSpider):
     def get_icon_url(filename: str, ext: str) -> str:
         return f"https://gi.yatta.moe/assets/UI/namecard/{filename}.{ext}"
 
-    async def parse_content(self, data: Dict[str, Any]) -> BaseWikiModel:
+    async def parse_content(self, data: Dict[str, Any]) -> Dict[str, Any]:
         c_data = await self.get_character_data(data)
-        c = NameCard.model_validate(c_data)
         # 图片
-        game_name_map = self.game_name_map(data["icon"])
-        for k, v in game_name_map.items():
-            u = self.get_icon_url(v[0], v[1])
-            try:
-                p = await self._download_file(u)
-            except Exception as e:
-                print(f"下载图片失败：", c, e)
-                continue
-            i = IconAsset()
-            j = IconAssetUrl(url=u, path=str(p))
-            setattr(i, v[1], j)
-            setattr(c, k, i)
-        return c
+        c_data.update(await self.get_icon_assets(self.game_name_map(data["icon"])))
+        return c_data
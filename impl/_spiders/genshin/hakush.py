@@ -1,7 +1,6 @@
 from enum import StrEnum
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-from impl.models.base import BaseWikiModel, IconAsset, IconAssetUrl
 from impl.models.enums import Game, DataType
 from impl.models.genshin.artifact import Artifact
 from impl.models.genshin.character import Character
@@ -26,6 +25,7 @@ class GIElement(StrEnum):
 class HakushCharacterSpider(HakushBaseSpider):
     game: "Game" = Game.GENSHIN
     data_type: "DataType" = DataType.CHARACTER
+    model = Character
 
     url = "https://api.hakush.in/gi/data/character.json"
 
@@ -63,29 +63,18 @@ class HakushCharacterSpider(HakushBaseSpider):
             "association": "其它",
         }
 
-    async def parse_content(self, key: str, data: Dict[str, Any]) -> BaseWikiModel:
+    async def parse_content(self, key: str, data: Dict[str, Any]) -> Dict[str, Any]:
         c_data = await self.get_character_data(key, data)
         game_name = self.get_game_name(data["icon"])
-        c = Character.model_validate(c_data)
         # 图片
-        game_name_map = self.game_name_map(game_name)
-        for k, v in game_name_map.items():
-            u = self.get_icon_url(v[0], v[1])
-            try:
-                p = await self._download_file(u)
-            except Exception as e:
-                print(f"下载图片失败：", c, e)
-                continue
-            i = IconAsset()
-            j = IconAssetUrl(url=u, path=str(p))
-            setattr(i, v[1], j)
-            setattr(c, k, i)
-        return c
+        c_data.update(await self.get_icon_assets(self.game_name_map(game_name)))
+        return c_data
 
 
 class HakushWeaponSpider(HakushBaseSpider):
     game: "Game" = Game.GENSHIN
     data_type: "DataType" = DataType.WEAPON
+    model = Weapon
 
     url = "https://api.hakush.in/gi/data/weapon.json"
 
@@ -112,29 +101,18 @@ class HakushWeaponSpider(HakushBaseSpider):
             "description": "",
         }
 
-    async def parse_content(self, key: str, data: Dict[str, Any]) -> BaseWikiModel:
+    async def parse_content(self, key: str, data: Dict[str, Any]) -> Dict[str, Any]:
         c_data = await self.get_character_data(key, data)
         game_name = self.get_game_name(data["icon"])
-        c = Weapon.model_validate(c_data)
         # 图片
-        game_name_map = self.game_name_map(game_name)
-        for k, v in game_name_map.items():
-            u = self.get_icon_url(v[0], v[1])
-            try:
-                p = await self._download_file(u)
-            except Exception as e:
-                print(f"下载图片失败：", c, e)
-                continue
-            i = IconAsset()
-            j = IconAssetUrl(url=u, path=str(p))
-            setattr(i, v[1], j)
-            setattr(c, k, i)
-        return c
+        c_data.update(await self.get_icon_assets(self.game_name_map(game_name)))
+        return c_data
 
 
 class HakushMaterialSpider(HakushBaseSpider):
     game: "Game" = Game.GENSHIN
     data_type: "DataType" = DataType.MATERIAL
+    model = Material
 
     url = "https://api.hakush.in/gi/data/zh/item.json"
 
@@ -158,31 +136,20 @@ class HakushMaterialSpider(HakushBaseSpider):
             "material_type": data["Type"],
         }
 
-    async def parse_content(self, key: str, data: Dict[str, Any]) -> BaseWikiModel:
+    async def parse_content(self, key: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         c_data = await self.get_character_data(key, data)
         game_name = self.get_game_name(data["Icon"])
-        c = Material.model_validate(c_data)
-        if c.name == "？？？" or c.id in ["107024", "107029"]:
+        if c_data["name"] == "？？？" or str(c_data["id"]) in ["107024", "107029"]:
             return None
         # 图片
-        game_name_map = self.game_name_map(game_name)
-        for k, v in game_name_map.items():
-            u = self.get_icon_url(v[0], v[1])
-            try:
-                p = await self._download_file(u)
-            except Exception as e:
-                print(f"下载图片失败：", c, e)
-                continue
-            i = IconAsset()
-            j = IconAssetUrl(url=u, path=str(p))
-            setattr(i, v[1], j)
-            setattr(c, k, i)
-        return c
+        c_data.update(await self.get_icon_assets(self.game_name_map(game_name)))
+        return c_data
 
 
 class HakushArtifactSpider(HakushBaseSpider):
     game: "Game" = Game.GENSHIN
     data_type: "DataType" = DataType.ARTIFACT
+    model = Artifact
 
     url = "https://api.hakush.in/gi/data/artifact.json"
 
@@ -212,28 +179,8 @@ class HakushArtifactSpider(HakushBaseSpider):
             "affix_list": affix_list,
         }
 
-    async def parse_content(self, key: str, data: Dict[str, Any]) -> BaseWikiModel:
+    async def parse_content(self, key: str, data: Dict[str, Any]) -> Dict[str, Any]:
         c_data = await self.get_character_data(key, data)
-        c = Artifact.model_validate(c_data)
         # 图片
-        game_name_map = self.game_name_map(key)
-        for k, v in game_name_map.items():
-            u = self.get_icon_url(v[0], v[1])
-            try:
-                p = await self._download_file(u)
-            except Exception as e:
-                if c.id not in [
-                    "15004",  # 冰之川与雪之砂
-                    "15009",  # 祭火之人
-                    "15010",  # 祭水之人
-                    "15011",  # 祭雷之人
-                    "15012",  # 祭风之人
-                    "15013",  # 祭冰之人
-                ]:
-                    print(f"下载图片失败：", c, e)
-                continue
-            i = IconAsset()
-            j = IconAssetUrl(url=u, path=str(p))
-            setattr(i, v[1], j)
-            setattr(c, k, i)
-        return c
+        c_data.update(await self.get_icon_assets(self.game_name_map(key)))
+        return c_data
@@ -1,5 +1,4 @@
 import asyncio
-import itertools
 import re
 import traceback
 from asyncio import Queue
@@ -11,8 +10,9 @@ from bs4 import BeautifulSoup
 from httpx import Response, URL
 
 from impl.core._abstract_spider import BaseSpider
+from impl.core.checkpoint import CheckpointStore
 from impl.core.file_manager import FileManager
-from impl.models.base import BaseWikiModel, IconAsset, IconAssetUrl
+from impl.models.base import BaseWikiModel, get_list_adapter
 from impl.models.enums import Game, DataType
 from impl.models.genshin.enums import WeaponType, AttributeType
 from impl.models.genshin.namecard import NameCard
@@ -24,6 +24,7 @@ HONEY_HOST = URL("https://gensh.honeyhunterworld.com/")
 class HoneyWeaponSpider(BaseSpider):
     game: "Game" = Game.GENSHIN
     data_type: "DataType" = DataType.WEAPON
+    model = Weapon
     data_source: str = "honey"
     file_type: str = "json"
     priority = 110
@@ -152,11 +153,12 @@ class HoneyWeaponSpider(BaseSpider):
             yield await queue.get()  # 取出并返回一个存放的 Model
 
     async def get_name_list(self, *, with_url: bool = False) -> List[Union[str, Tuple[str, URL]]]:
-        # 重写此函数的目的是名字去重，例如单手剑页面中有三个 “「一心传」名刀”
-        name_list = [i async for i in self._name_list_generator(with_url=with_url)]
-        if with_url:
-            return [(i[0], list(i[1])[0][1]) for i in itertools.groupby(name_list, lambda x: x[0])]
-        return [i[0] for i in itertools.groupby(name_list, lambda x: x)]
+        # 重写此函数的目的是名字去重，例如单手剑页面中有三个 “「一心传」名刀”；
+        # 页面并发爬取，重复的名字不一定相邻，按名字保留第一次出现的项，每个页面只解析一次
+        name_list: Dict[str, Union[str, Tuple[str, URL]]] = {}
+        async for i in self._name_list_generator(with_url=with_url):
+            name_list.setdefault(i[0] if with_url else i, i)
+        return list(name_list.values())
 
     async def full_data_generator(self) -> AsyncIterator["BaseWikiModel"]:
         """Model 生成器
@@ -169,11 +171,19 @@ class HoneyWeaponSpider(BaseSpider):
         """
         queue: Queue["BaseWikiModel"] = Queue()  # 存放 Model 的队列
         signal = Value("i", 0)  # 一个用于异步任务同步的信号
+        spider_name = self.__class__.__name__
+        done_items = await CheckpointStore.load_items(self.game, self.data_type, spider_name)  # 上次中断前已完成的数据
 
         async def task(u):
             # 包装的爬虫任务
             try:
-                await queue.put(await self._scrape(u))  # 爬取一条数据，并将其放入队列中
+                key = str(u)
+                if key in done_items:
+                    await queue.put(Weapon.model_validate(done_items[key]))
+                    return
+                model = await self._scrape(u)  # 爬取一条数据，并将其放入队列中
+                await CheckpointStore.save_item(self.game, self.data_type, spider_name, key, model.model_dump())
+                await queue.put(model)
             except NotImplementedError as exc:
                 print("爬取数据出现测试服数据 %s", str(exc))
             except Exception as exc:  # pylint: disable=W0703
@@ -208,7 +218,7 @@ class HoneyWeaponSpider(BaseSpider):
             self.data_type,
             self.data_source,
             "json",
-            ujson.dumps([i.model_dump() for i in data if i]).encode("utf-8"),
+            get_list_adapter(self.model).dump_json([i for i in data if i]),
         )
         return data
 
@@ -216,6 +226,7 @@ class HoneyWeaponSpider(BaseSpider):
 class HoneyNameCardSpider(BaseSpider):
     game: "Game" = Game.GENSHIN
     data_type: "DataType" = DataType.NAMECARD
+    model = NameCard
     data_source: str = "honey"
     file_type: str = "json"
 
@@ -240,7 +251,7 @@ class HoneyNameCardSpider(BaseSpider):
         if tasks:
             t = await self.gather_tasks(tasks)
             d.extend([j for j in t if j])
-        return d
+        return list(self.validate_items(dict(enumerate(d))).values())
 
     @staticmethod
     def game_name_map(nid: str) -> dict[str, tuple[str, str]]:
@@ -263,7 +274,7 @@ class HoneyNameCardSpider(BaseSpider):
     def get_icon_url(filename: str, ext: str) -> str:
         return f"https://gensh.honeyhunterworld.com/img/{filename}.{ext}"
 
-    async def _parse_content(self, data: Dict[str, Any]) -> Optional[BaseWikiModel]:
+    async def _parse_content(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         try:
             return await self.parse_content(data)
         except Exception as e:
@@ -271,20 +282,8 @@ class HoneyNameCardSpider(BaseSpider):
             print(f"解析数据失败: {e}")
             return None
 
-    async def parse_content(self, data: Dict) -> BaseWikiModel:
+    async def parse_content(self, data: Dict) -> Dict[str, Any]:
         c_data = await self.get_character_data(data)
-        c = NameCard.model_validate(c_data)
         # 图片
-        game_name_map = self.game_name_map(c.id)
-        for k, v in game_name_map.items():
-            u = self.get_icon_url(v[0], v[1])
-            try:
-                p = await self._download_file(u)
-            except Exception as e:
-                print(f"下载图片失败：", c, e)
-                continue
-            i = IconAsset()
-            j = IconAssetUrl(url=u, path=str(p))
-            setattr(i, v[1], j)
-            setattr(c, k, i)
-        return c
+        c_data.update(await self.get_icon_assets(self.game_name_map(str(c_data["id"]))))
+        return c_data
@@ -1,11 +1,11 @@
 import typing
+from collections import Counter
 from functools import partial
 from os import path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
 import bs4
 
-from impl.config import config
 from impl.core._abstract_spider import BaseSpider, RequestClient
 from impl.core.file_manager import FileManager
 from impl.models.base import BaseWikiModel
@@ -153,11 +153,11 @@ class GenshinRoleMaterialSpider(BaseSpider):
                 # 未上线角色
                 continue
             avatar_name = self.zh_lang[str(avatar["nameTextMapHash"])]
-            if avatar_name not in ignore_name_list and avatar_name not in name_list:
+            if avatar_name not in ignore_name_list and avatar_name not in self.data["data"]:
                 name_list.append(avatar_name)
                 self.avatar_promote_data[avatar_name] = avatar["avatarPromoteId"]
                 self.skill_depot_map[avatar_name] = avatar["skillDepotId"]
-                self.data["data"][avatar_name] = {}
+                self.data["data"][avatar_name] = {"id": str(avatar["id"])}
         return name_list
 
     async def load_material_data(self):
@@ -168,42 +168,89 @@ class GenshinRoleMaterialSpider(BaseSpider):
             except KeyError:
                 pass
 
-    async def get_up_data(self):
-        _avatar_promote_data = await FileManager.load_json(self.avatar_promote_data_path)
-        data_map: Dict[str, Dict] = {}
-        data_material_map: Dict[str, List[str]] = {}
-        for avatar in _avatar_promote_data:
-            pid = avatar["avatarPromoteId"]
-            cos = avatar.get("costItems", [])
-            if len(cos) != 4:
+    @staticmethod
+    def explode_cost_items(
+        rows: List[Dict], key: str, level_key: str, size: Optional[int] = None
+    ) -> Dict[str, List[int]]:
+        """
+        把每行的 costItems 展开为列式数组，每个消耗占一行
+        :param rows: 原始数据
+        :param key: 分组字段
+        :param level_key: 等级字段
+        :param size: costItems 的长度，不一致的行直接跳过
+        :return: key / level / slot / id / count 五列等长数组
+        """
+        columns: Dict[str, List[int]] = {"key": [], "level": [], "slot": [], "id": [], "count": []}
+        for row in rows:
+            cost_items = row.get("costItems", [])
+            if size is not None and len(cost_items) != size:
                 continue
-            for i in cos[2:]:
-                if not i:
+            group, level = row.get(key), row.get(level_key, 0)
+            for slot, item in enumerate(cost_items):
+                if not item or not item.get("id"):
                     continue
-                t_list = data_material_map.get(pid, [])
-                if i["id"] not in t_list:
-                    t_list.append(i["id"])
-                    data_material_map[pid] = t_list
+                columns["key"].append(group)
+                columns["level"].append(level)
+                columns["slot"].append(slot)
+                columns["id"].append(item["id"])
+                columns["count"].append(item.get("count", 0))
+        return columns
 
-            if avatar.get("promoteLevel") != 6:
-                continue
-            data_map[avatar["avatarPromoteId"]] = avatar
-            data_material_map.get(pid, []).sort()
-        for avatar in self.avatar_promote_data.keys():
-            pid = self.avatar_promote_data[avatar]
-            t = data_map[pid]
-            self.data["data"][avatar]["ascension_materials"] = self.material_data[t["costItems"][0]["id"]]
-            self.data["data"][avatar]["level_up_materials"] = self.material_data[t["costItems"][1]["id"]]
-            self.data["data"][avatar]["materials"] = [self.material_data[i] for i in data_material_map[pid] if i]
-
-    async def load_avatar_skill_depot_data(self) -> Dict[int, int]:
+    @staticmethod
+    def group_sum(keys: List[int], ids: List[int], counts: List[int]) -> Dict[int, Dict[int, int]]:
+        """按 key 分组，对同一 id 的数量求和"""
+        result: Dict[int, Dict[int, int]] = {}
+        for key, item_id, count in zip(keys, ids, counts):
+            group = result.setdefault(key, {})
+            group[item_id] = group.get(item_id, 0) + count
+        return result
+
+    @staticmethod
+    def group_pick(columns: Dict[str, List[int]], level: int) -> Dict[int, Dict[int, int]]:
+        """取每个 key 在指定等级的 slot -> id"""
+        result: Dict[int, Dict[int, int]] = {}
+        for key, _level, slot, item_id in zip(columns["key"], columns["level"], columns["slot"], columns["id"]):
+            if _level == level:
+                result.setdefault(key, {})[slot] = item_id
+        return result
+
+    def get_material_names(self, totals: Dict[int, int]) -> Dict[str, int]:
+        """id -> 数量 转为 名称 -> 数量，按 id 排序"""
+        return {self.material_data.get(i, str(i)): totals[i] for i in sorted(totals)}
+
+    async def get_up_data(self):
+        _avatar_promote_data = await FileManager.load_json(self.avatar_promote_data_path)
+        columns = self.explode_cost_items(_avatar_promote_data, "avatarPromoteId", "promoteLevel", 4)
+        # 突破全部消耗
+        totals = self.group_sum(columns["key"], columns["id"], columns["count"])
+        # 6 级突破的 宝石 与 boss 材料
+        snapshot = self.group_pick(columns, 6)
+        # 地区特产 与 怪物掉落
+        materials: Dict[int, Dict[int, None]] = {}
+        for key, slot, item_id in zip(columns["key"], columns["slot"], columns["id"]):
+            if slot >= 2:
+                materials.setdefault(key, {})[item_id] = None
+        for avatar, pid in self.avatar_promote_data.items():
+            t = snapshot[pid]
+            self.data["data"][avatar]["ascension_materials"] = self.material_data[t[0]]
+            self.data["data"][avatar]["level_up_materials"] = self.material_data[t[1]]
+            self.data["data"][avatar]["materials"] = [self.material_data[i] for i in sorted(materials.get(pid, {}))]
+            self.data["data"][avatar].setdefault("cumulative", {})["ascension"] = self.get_material_names(
+                totals.get(pid, {})
+            )
+
+    async def load_avatar_skill_depot_data(self) -> Dict[int, List[int]]:
+        """
+        技能组 id -> [普通攻击, 元素战技, 元素爆发] 技能 id，元素爆发固定在最后
+        """
         _avatar_skill_depot_data = await FileManager.load_json(self.avatar_skill_depot_data_path)
-        energy_skill_map: Dict[int, int] = {}
+        skill_map: Dict[int, List[int]] = {}
         for _avatar in _avatar_skill_depot_data:
             if "energySkill" not in _avatar:
                 continue
-            energy_skill_map[_avatar["id"]] = _avatar["energySkill"]
-        return energy_skill_map
+            skills = [i for i in _avatar.get("skills", [])[:2] if i]
+            skill_map[_avatar["id"]] = skills + [_avatar["energySkill"]]
+        return skill_map
 
     async def load_avatar_skill_data(self) -> Dict[int, int]:
         _avatar_skill_data = await FileManager.load_json(self.avatar_skill_data_path)
@@ -214,27 +261,35 @@ class GenshinRoleMaterialSpider(BaseSpider):
             avatar_skill_map[_avatar["id"]] = _avatar["proudSkillGroupId"]
         return avatar_skill_map
 
-    async def load_proud_skill_data(self) -> Dict[int, List[str]]:
+    async def load_proud_skill_data(self) -> Tuple[Dict[int, List[str]], Dict[int, Dict[int, int]]]:
+        """
+        :return: 天赋组 id -> 10 级天赋的 [书籍系列, 周本材料]；天赋组 id -> 1 级升到 10 级的全部消耗
+        """
         _proud_skill_data = await FileManager.load_json(self.proud_skill_data_path)
+        columns = self.explode_cost_items(_proud_skill_data, "proudSkillGroupId", "level")
+        totals = self.group_sum(columns["key"], columns["id"], columns["count"])
         proud_skill_map: Dict[int, List[str]] = {}
-        for _avatar in _proud_skill_data:
-            if _avatar["level"] != 10:
+        for key, cos in self.group_pick(columns, 10).items():
+            if 0 not in cos or 2 not in cos:
                 continue
-            key = _avatar["proudSkillGroupId"]
-            cos = _avatar["costItems"]
-            value = [self.material_data[cos[0]["id"]][1:3], self.material_data[cos[2]["id"]]]
-            proud_skill_map[key] = value
-        return proud_skill_map
+            proud_skill_map[key] = [self.material_data[cos[0]][1:3], self.material_data[cos[2]]]
+        return proud_skill_map, totals
 
     async def get_skill_data(self):
-        energy_skill_map = await self.load_avatar_skill_depot_data()
+        skill_map = await self.load_avatar_skill_depot_data()
         avatar_skill_map = await self.load_avatar_skill_data()
-        proud_skill_map = await self.load_proud_skill_data()
-        for avatar in self.skill_depot_map.keys():
-            depot_id = self.skill_depot_map[avatar]
-            skill_id = energy_skill_map[depot_id]
-            skill_group_id = avatar_skill_map[skill_id]
+        proud_skill_map, totals = await self.load_proud_skill_data()
+        for avatar, depot_id in self.skill_depot_map.items():
+            skills = skill_map[depot_id]
+            skill_group_id = avatar_skill_map[skills[-1]]
             self.data["data"][avatar]["talent"] = proud_skill_map[skill_group_id]
+            # 三个天赋的消耗合计
+            talents = Counter()
+            for group_id in (avatar_skill_map[i] for i in skills if i in avatar_skill_map):
+                talents.update(totals.get(group_id, {}))
+            cumulative = self.data["data"][avatar].setdefault("cumulative", {})
+            cumulative["talent"] = self.get_material_names(totals.get(skill_group_id, {}))
+            cumulative["talents"] = self.get_material_names(talents)
 
     async def get_material_data(self):
         await self.get_name_list()
@@ -243,17 +298,13 @@ class GenshinRoleMaterialSpider(BaseSpider):
         await self.get_skill_data()
         await FileManager.save_data_file(self.game, self.data_type, self.data, "roles_material")
 
-    async def initialize(self):
-        if not config.GENSHIN:
-            return
+    async def start_crawl(self) -> List[BaseWikiModel]:
         print("Download raw file")
         await self.download_data_file()
         print("Download raw file success")
         self.zh_lang = await FileManager.load_json(self.zh_lang_path)
         await self.get_material_data()
-
-    async def start_crawl(self) -> List[BaseWikiModel]:
-        pass
+        return []
 
 
 class GenshinDailyMaterialSpider(BaseSpider):
@@ -371,32 +422,26 @@ class GenshinDailyMaterialSpider(BaseSpider):
                     materials.clear()
                     materials.extend(new_data)
 
-    async def initialize(self):
-        if not config.GENSHIN:
-            return
+    async def start_crawl(self) -> List[BaseWikiModel]:
         print("parse_honey_impact_source")
         data = await self._parse_honey_impact_source()
         await self.fix_honey_material_id(data)
         await FileManager.save_data_file(self.game, self.data_type, data.model_dump(), "daily_material")
-
-    async def start_crawl(self) -> List[BaseWikiModel]:
-        pass
+        return []
 
 
 class GenshinOtherSpider(BaseSpider):
-    __order__ = 10
     game: "Game" = Game.GENSHIN
     data_type: "DataType" = DataType.OTHER
+    data_source: str = "data"
+    priority = 110
+    depends_on = ("GenshinRoleMaterialSpider", "GenshinDailyMaterialSpider")
 
-    async def initialize(self):
-        if not config.GENSHIN:
-            return
+    async def start_crawl(self) -> List[BaseWikiModel]:
         print("merge genshin other data")
         data = {
             "daily_material": await FileManager.load_data_file(self.game, self.data_type, "daily_material"),
             "roles_material": await FileManager.load_data_file(self.game, self.data_type, "roles_material"),
         }
         await FileManager.save_data_file(self.game, self.data_type, data)
-
-    async def start_crawl(self) -> List[BaseWikiModel]:
-        pass
+        return []
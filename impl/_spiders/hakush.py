@@ -2,6 +2,7 @@ import abc
 from typing import List, Dict, Any, Optional
 
 from impl.core._abstract_spider import BaseSpider
+from impl.core.file_manager import FileManager
 from impl.models.base import BaseWikiModel
 
 
@@ -13,35 +14,20 @@ class HakushBaseSpider(BaseSpider):
 
     async def start_crawl(self) -> List[BaseWikiModel]:
         req, _ = await self._request("GET", self.url)
-        data = req.json()
-        d = []
-        tasks = []
-        for key, i in data.items():
-            tasks.append(self._parse_content(key, i))
-            if len(tasks) > 10:
-                t = await self.gather_tasks(tasks)
-                d.extend([j for j in t if j])
-        if tasks:
-            t = await self.gather_tasks(tasks)
-            d.extend([j for j in t if j])
-        return d
+        if self.check_source(req.content):
+            return []
+        data = await FileManager.decode_json(req.content)
+        return await self.parse_items({str(k): v for k, v in data.items()}, self.parse_content)
 
     @staticmethod
     def get_icon_url(filename: str, ext: str) -> str:
         return f"https://api.hakush.in/gi/UI/{filename}.{ext}"
 
-    async def _parse_content(self, key: str, data: Dict[str, Any]) -> Optional[BaseWikiModel]:
-        try:
-            return await self.parse_content(key, data)
-        except Exception as e:
-            print(f"解析数据失败: {e}")
-            return None
-
     @abc.abstractmethod
-    async def parse_content(self, key: str, data: Dict[str, Any]) -> BaseWikiModel:
+    async def parse_content(self, key: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         解析数据
         :param key:
         :param data:
-        :return:
+        :return: 模型数据，由 parse_items 整批校验
         """
@@ -2,11 +2,27 @@
 
 from pathlib import Path
 
-__all__ = ["ASSETS_ROOT", "ASSETS_BASE_PATH", "ASSETS_DATA_RAW_ROOT"]
+__all__ = [
+    "ASSETS_ROOT",
+    "ASSETS_BASE_PATH",
+    "ASSETS_DATA_ROOT",
+    "ASSETS_DATA_RAW_ROOT",
+    "ASSETS_ARCHIVE_PATH",
+    "ASSETS_DATA_ARCHIVE_ROOT",
+    "ASSETS_CACHE_ROOT",
+]
 
 # 资源根目录
 ASSETS_ROOT = Path(__file__).joinpath("../../../").resolve()
 
 ASSETS_BASE_PATH = Path("data/raw")
+ASSETS_DATA_ROOT = ASSETS_ROOT / "data"
 ASSETS_DATA_RAW_ROOT = ASSETS_ROOT / ASSETS_BASE_PATH
 ASSETS_DATA_RAW_ROOT.mkdir(parents=True, exist_ok=True)
+
+# 归档分片目录
+ASSETS_ARCHIVE_PATH = Path("data/archive")
+ASSETS_DATA_ARCHIVE_ROOT = ASSETS_ROOT / ASSETS_ARCHIVE_PATH
+
+# 爬虫的内部缓存目录，不随数据发布
+ASSETS_CACHE_ROOT = ASSETS_ROOT / ".cache"
@@ -0,0 +1,181 @@
+"""图片变体：缩略图与降采样的立绘"""
+
+import asyncio
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import ujson
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover
+    Image = None
+
+__all__ = (
+    "ImageVariant",
+    "ImageVariantBuilder",
+    "THUMBNAIL",
+    "GACHA_MEDIUM",
+    "get_variant_path",
+    "is_available",
+)
+
+
+class ImageVariant:
+    """
+    图片变体
+
+    等比缩放到长边不超过 size，并转换为 format 格式
+    """
+
+    def __init__(self, name: str, size: int, format: str = "webp", quality: int = 85):  # pylint: disable=W0622
+        self.name = name
+        self.size = size
+        self.format = format
+        self.quality = quality
+
+    def key(self) -> str:
+        """变体参数，参数变化时需要重新生成"""
+        return f"{self.name}:{self.size}:{self.format}:{self.quality}"
+
+
+THUMBNAIL = ImageVariant("thumb", 128)
+"""128px webp 缩略图"""
+GACHA_MEDIUM = ImageVariant("medium", 1024)
+"""长边 1024px 的立绘"""
+
+
+def is_available() -> bool:
+    """是否安装了 Pillow"""
+    return Image is not None
+
+
+def get_variant_path(source: "Path", variant: "ImageVariant") -> "Path":
+    """变体与原图放在同一目录：name.png -> name.thumb.webp"""
+    return source.with_name(f"{source.stem}.{variant.name}.{variant.format}")
+
+
+def _hash_file(path: "Path") -> str:
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def _render(
+    source: str, target: str, size: int, fmt: str, quality: int, digest: Optional[str]
+) -> Tuple[str, Optional[str], bool]:
+    """
+    在子进程中生成一个变体
+    :return: 目标路径、原图 hash、是否重新生成
+    """
+    source_hash = _hash_file(Path(source))
+    target_path = Path(target)
+    if digest == source_hash and target_path.exists():
+        return target, source_hash, False
+    with Image.open(source) as image:
+        image.load()
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        params = {"quality": quality}
+        if fmt == "webp":
+            params["method"] = 4
+        tmp_path = target_path.with_name(f"{target_path.name}.tmp")
+        image.save(tmp_path, format=fmt.upper(), **params)
+    os.replace(tmp_path, target_path)
+    return target, source_hash, True
+
+
+class ImageVariantBuilder:
+    """
+    在进程池中批量生成图片变体
+
+    index.json 记录 变体路径 -> 原图 hash、大小、修改时间与变体参数；
+    原图大小与修改时间未变化且变体已存在时直接跳过，不读取原图；
+    否则在子进程中计算 hash，hash 未变化时同样跳过；只有存在需要检查的变体时才创建进程池
+    """
+
+    def __init__(self, index_path: "Path", max_workers: Optional[int] = None):
+        self.index_path = index_path
+        self.max_workers = max_workers
+        self.index: Dict[str, Dict[str, Any]] = {}
+        if index_path.exists():
+            try:
+                with open(index_path, "r", encoding="utf-8") as file:
+                    self.index = ujson.load(file)
+            except ValueError:
+                self.index = {}
+
+    def save_index(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(f"{self.index_path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            ujson.dump(self.index, file, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, self.index_path)
+
+    def _get_key(self, target: "Path") -> str:
+        try:
+            return target.relative_to(self.index_path.parent).as_posix()
+        except ValueError:
+            return target.as_posix()
+
+    def _get_entry(self, target: "Path", variant: "ImageVariant") -> Optional[Dict[str, Any]]:
+        entry = self.index.get(self._get_key(target))
+        if not entry or entry.get("variant") != variant.key():
+            return None
+        return entry
+
+    def _get_digest(self, target: "Path", variant: "ImageVariant") -> Optional[str]:
+        entry = self._get_entry(target, variant)
+        return entry.get("hash") if entry else None
+
+    def _is_fresh(self, source: "Path", target: "Path", variant: "ImageVariant") -> bool:
+        """原图大小与修改时间均与记录一致，且变体存在"""
+        entry = self._get_entry(target, variant)
+        if not entry or not target.exists():
+            return False
+        stat = source.stat()
+        return entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns
+
+    async def build(self, jobs: Iterable[Tuple["Path", "ImageVariant"]]) -> List["Path"]:
+        """
+        生成变体
+        :param jobs: 原图路径 与 变体
+        :return: 重新生成的变体路径
+        """
+        if not is_available():
+            return []
+        jobs = [(s, v) for s, v in jobs if s.exists() and not self._is_fresh(s, get_variant_path(s, v), v)]
+        if not jobs:
+            return []
+        loop = asyncio.get_running_loop()
+        built = []
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = []
+            for source, variant in jobs:
+                target = get_variant_path(source, variant)
+                args = (str(source), str(target), variant.size, variant.format, variant.quality)
+                future = loop.run_in_executor(executor, _render, *args, self._get_digest(target, variant))
+                futures.append((future, source, variant))
+            results = await asyncio.gather(*[i[0] for i in futures], return_exceptions=True)
+            for (_, source, variant), result in zip(futures, results):
+                if isinstance(result, BaseException):
+                    # 原图损坏或格式不支持，保留原图
+                    continue
+                target, source_hash, rebuilt = result
+                stat = source.stat()
+                self.index[self._get_key(Path(target))] = {
+                    "hash": source_hash,
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "variant": variant.key(),
+                }
+                if rebuilt:
+                    built.append(Path(target))
+        self.save_index()
+        return built
@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import ujson
+from httpx import AsyncBaseTransport, AsyncHTTPTransport, Request, Response
+
+
+class FixtureStore:
+    """
+    录制的上游响应
+
+    每个响应保存为 <key>.bin，key 为 method 与 url 的 sha1，
+    index.json 记录 key 对应的 method、url、状态码与响应头
+    """
+
+    INDEX_NAME = "index.json"
+
+    def __init__(self, root: "Path"):
+        self.root = root
+        self.index_path = root / self.INDEX_NAME
+        self.index: Dict[str, Dict[str, Any]] = {}
+        if self.index_path.exists():
+            with open(self.index_path, "r", encoding="utf-8") as file:
+                self.index = ujson.loads(file.read())
+
+    @staticmethod
+    def get_key(method: str, url: str) -> str:
+        return hashlib.sha1(f"{method.upper()} {url}".encode("utf-8")).hexdigest()
+
+    def get(self, method: str, url: str) -> Optional[Response]:
+        key = self.get_key(method, url)
+        meta = self.index.get(key)
+        if meta is None:
+            return None
+        content = (self.root / f"{key}.bin").read_bytes()
+        return Response(meta["status_code"], headers=meta["headers"], content=content)
+
+    def put(self, method: str, url: str, response: Response):
+        key = self.get_key(method, url)
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / f"{key}.bin").write_bytes(response.content)
+        headers = {k: v for k, v in response.headers.items() if k.lower() == "content-type"}
+        self.index[key] = {
+            "method": method.upper(),
+            "url": url,
+            "status_code": response.status_code,
+            "headers": headers,
+        }
+
+    def save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, "w", encoding="utf-8") as file:
+            file.write(ujson.dumps(self.index, ensure_ascii=False, indent=4))
+
+
+class TransportStats:
+    """传输层统计"""
+
+    def __init__(self):
+        self.requests = 0
+        self.misses = 0
+        self.bytes = 0
+        self.cpu_time = 0.0
+
+    def reset(self):
+        self.__init__()
+
+
+class RecordingTransport(AsyncBaseTransport):
+    """透传真实请求，并把响应写入 FixtureStore"""
+
+    def __init__(self, store: "FixtureStore"):
+        self.store = store
+        self.inner = AsyncHTTPTransport()
+        self.stats = TransportStats()
+
+    async def handle_async_request(self, request: Request) -> Response:
+        response = await self.inner.handle_async_request(request)
+        await response.aread()
+        start = time.thread_time()
+        self.store.put(request.method, str(request.url), response)
+        self.stats.requests += 1
+        self.stats.bytes += len(response.content)
+        self.stats.cpu_time += time.thread_time() - start
+        # 响应体已解压，不再携带 content-encoding 等头
+        return self.store.get(request.method, str(request.url))
+
+    async def aclose(self):
+        self.store.save()
+        await self.inner.aclose()
+
+
+class ReplayTransport(AsyncBaseTransport):
+    """
+    从 FixtureStore 回放响应
+
+    未录制的请求返回 404；latency 用于模拟网络延迟
+    """
+
+    def __init__(self, store: "FixtureStore", latency: float = 0.0):
+        self.store = store
+        self.latency = latency
+        self.stats = TransportStats()
+
+    async def handle_async_request(self, request: Request) -> Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        start = time.thread_time()
+        response = self.store.get(request.method, str(request.url))
+        self.stats.requests += 1
+        if response is None:
+            self.stats.misses += 1
+            response = Response(404, content=b"")
+        self.stats.bytes += len(response.content)
+        self.stats.cpu_time += time.thread_time() - start
+        return response
@@ -0,0 +1,276 @@
+import asyncio
+import importlib
+import inspect
+import resource
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Type
+
+from httpx import AsyncClient, AsyncBaseTransport
+
+from .fixtures import FixtureStore, RecordingTransport, ReplayTransport
+from ..core import file_manager, checkpoint, source_cache, work_queue, _abstract_spider
+from ..config import config
+from ..core._abstract_spider import BaseSpider, RequestClient, SpiderManager
+from ..core.disk_writer import DiskWriter
+from ..core.icon_planner import IconPlanner
+from ..core.metrics import Metrics
+
+SPIDER_MODULES = [
+    "impl._spiders.genshin.ambr",
+    "impl._spiders.genshin.hakush",
+    "impl._spiders.genshin.honey",
+    "impl._spiders.genshin.other",
+]
+# 导入时就绑定了输出目录的模块属性 -> 在工作目录中对应的路径
+REDIRECTED_PATHS = [
+    (file_manager, "ASSETS_ROOT", "."),
+    (file_manager, "ASSETS_DATA_RAW_ROOT", "data/raw"),
+    (checkpoint, "CHECKPOINT_ROOT", "data/checkpoint"),
+    (source_cache, "SOURCE_CACHE_ROOT", ".cache/source"),
+    (work_queue, "QUEUE_ROOT", "data/queue"),
+    (_abstract_spider, "ASSETS_DATA_ROOT", "data"),
+]
+
+
+def get_peak_rss() -> int:
+    """进程峰值常驻内存，单位 KB；只增不减，因此只能用于整次运行"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def get_spider_classes(name_filter: Optional[List[str]] = None) -> List[Type["BaseSpider"]]:
+    """获取所有可运行的爬虫类"""
+    classes = []
+    for module_name in SPIDER_MODULES:
+        module = importlib.import_module(module_name)
+        for _, clz in inspect.getmembers(module, inspect.isclass):
+            if not issubclass(clz, BaseSpider) or clz.__module__ != module_name:
+                continue
+            if not getattr(clz, "game", None) or not getattr(clz, "data_type", None):
+                continue
+            if name_filter and clz.__name__ not in name_filter:
+                continue
+            classes.append(clz)
+    return classes
+
+
+class BenchmarkResult:
+    def __init__(self, name: str):
+        self.name = name
+        self.wall_time = 0.0
+        self.requests = 0
+        self.misses = 0
+        self.bytes = 0
+        self.items = 0
+        self.cpu_total = 0.0
+        self.cpu_parse = 0.0
+        self.cpu_io = 0.0
+        self.peak_rss: Optional[int] = None
+        """只有整次运行的结果记录峰值内存"""
+        self.error: Optional[str] = None
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.requests / self.wall_time if self.wall_time else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "wall_time": round(self.wall_time, 4),
+            "requests": self.requests,
+            "requests_per_second": round(self.requests_per_second, 2),
+            "misses": self.misses,
+            "bytes": self.bytes,
+            "items": self.items,
+            "cpu_total": round(self.cpu_total, 4),
+            "cpu_parse": round(self.cpu_parse, 4),
+            "cpu_io": round(self.cpu_io, 4),
+            "peak_rss_kb": self.peak_rss,
+            "error": self.error,
+        }
+
+
+class _Measure:
+    """
+    计时上下文
+
+    主线程 CPU 时间扣除传输层回放的部分计为解析耗时，
+    传输层与其他线程（aiofiles 线程池）的 CPU 时间计为 I/O 耗时
+    """
+
+    def __init__(self, result: "BenchmarkResult", transport: "AsyncBaseTransport"):
+        self.result = result
+        self.transport = transport
+
+    def __enter__(self):
+        self.transport.stats.reset()
+        self.wall = time.perf_counter()
+        self.process = time.process_time()
+        self.thread = time.thread_time()
+        return self
+
+    def __exit__(self, *_):
+        stats = self.transport.stats
+        main_thread = time.thread_time() - self.thread
+        self.result.wall_time = time.perf_counter() - self.wall
+        self.result.cpu_total = time.process_time() - self.process
+        self.result.cpu_parse = max(main_thread - stats.cpu_time, 0.0)
+        self.result.cpu_io = max(self.result.cpu_total - self.result.cpu_parse, 0.0)
+        self.result.requests = stats.requests
+        self.result.misses = stats.misses
+        self.result.bytes = stats.bytes
+
+
+class BenchmarkHarness:
+    """
+    爬虫基准测试
+
+    用本地录制的上游响应替换 RequestClient 的传输层，
+    在临时目录中运行每个爬虫以及完整的 SpiderManager.start_crawl；
+    峰值内存是进程级的最高值，只在最后的 total 结果中报告
+    """
+
+    def __init__(
+        self,
+        fixtures_path: "Path",
+        record: bool = False,
+        latency: float = 0.0,
+        work_dir: Optional["Path"] = None,
+        timeout: float = 600.0,
+    ):
+        self.timeout = timeout
+        self.store = FixtureStore(fixtures_path)
+        if record:
+            self.transport = RecordingTransport(self.store)
+        else:
+            self.transport = ReplayTransport(self.store, latency)
+        self._tmp_dir = None
+        if work_dir is None:
+            self._tmp_dir = tempfile.TemporaryDirectory(prefix="gram_bench_")
+            work_dir = Path(self._tmp_dir.name)
+        self.work_dir = work_dir
+        self._origin_client = RequestClient.client
+        self._origin_paths = [getattr(module, name) for module, name, _ in REDIRECTED_PATHS]
+        self._origin_metrics = config.METRICS
+
+    def __enter__(self):
+        RequestClient.client = AsyncClient(transport=self.transport)
+        # 基准测试自行统计，不输出运行指标文件
+        config.METRICS = False
+        return self
+
+    def _use_work_dir(self, name: str):
+        """每次运行使用独立的输出目录，避免上一次运行下载的图标被当作缓存"""
+        root = self.work_dir / name
+        Metrics.reset()
+        IconPlanner.reset()
+        source_cache.NegativeCache.reset()
+        RequestClient.reset_cache()
+        for module, name, path in REDIRECTED_PATHS:
+            setattr(module, name, root / path)
+        file_manager.ASSETS_DATA_RAW_ROOT.mkdir(parents=True, exist_ok=True)
+
+    def __exit__(self, *_):
+        RequestClient.client = self._origin_client
+        config.METRICS = self._origin_metrics
+        for (module, name, _), origin in zip(REDIRECTED_PATHS, self._origin_paths):
+            setattr(module, name, origin)
+        if isinstance(self.transport, RecordingTransport):
+            self.store.save()
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+
+    @staticmethod
+    def _has_own_initialize(spider: "BaseSpider") -> bool:
+        return type(spider).initialize is not BaseSpider.initialize
+
+    async def run_spider(self, clz: Type["BaseSpider"]) -> "BenchmarkResult":
+        """单独运行一个爬虫"""
+        result = BenchmarkResult(clz.__name__)
+        self._use_work_dir(result.name)
+        with _Measure(result, self.transport):
+            try:
+                spider = clz()
+                # 部分爬虫的工作在 initialize 中完成
+                if self._has_own_initialize(spider):
+                    await asyncio.wait_for(spider.initialize(), self.timeout)
+                items = await asyncio.wait_for(spider.start_crawl(), self.timeout)
+                await asyncio.wait_for(IconPlanner.execute(), self.timeout)
+                await asyncio.wait_for(DiskWriter.flush(), self.timeout)
+                result.items = len(items or [])
+            except Exception as e:  # pylint: disable=W0703
+                result.error = repr(e)
+        return result
+
+    async def run_manager(self, classes: List[Type["BaseSpider"]]) -> "BenchmarkResult":
+        """完整运行 SpiderManager.start_crawl"""
+        result = BenchmarkResult("SpiderManager.start_crawl")
+        SpiderManager.spiders.clear()
+        SpiderManager.unselected.clear()
+        self._use_work_dir(result.name)
+        with _Measure(result, self.transport):
+            try:
+                spiders = [clz() for clz in classes]
+                for order in sorted({i.__order__ for i in spiders}):
+                    for spider in spiders:
+                        if spider.__order__ == order:
+                            await asyncio.wait_for(spider.initialize(), self.timeout)
+                await asyncio.wait_for(SpiderManager.start_crawl(), self.timeout)
+            except Exception as e:  # pylint: disable=W0703
+                result.error = repr(e)
+        return result
+
+    async def run(self, name_filter: Optional[List[str]] = None, manager: bool = True) -> List["BenchmarkResult"]:
+        classes = get_spider_classes(name_filter)
+        total = BenchmarkResult("total")
+        wall, process = time.perf_counter(), time.process_time()
+        results = [await self.run_spider(clz) for clz in classes]
+        if manager:
+            results.append(await self.run_manager(classes))
+        total.wall_time = time.perf_counter() - wall
+        total.cpu_total = time.process_time() - process
+        total.peak_rss = get_peak_rss()
+        results.append(total)
+        return results
+
+    @staticmethod
+    def format_results(results: List["BenchmarkResult"]) -> str:
+        header = (
+            f"{'name':<32}{'wall(s)':>10}{'req':>8}{'req/s':>10}{'miss':>6}"
+            f"{'cpu(s)':>10}{'parse(s)':>10}{'io(s)':>10}{'rss(MB)':>10}"
+        )
+        lines = [header, "-" * len(header)]
+        for r in results:
+            lines.append(
+                f"{r.name:<32}{r.wall_time:>10.3f}{r.requests:>8}{r.requests_per_second:>10.1f}{r.misses:>6}"
+                f"{r.cpu_total:>10.3f}{r.cpu_parse:>10.3f}{r.cpu_io:>10.3f}"
+                + (f"{r.peak_rss / 1024:>10.1f}" if r.peak_rss is not None else f"{'-':>10}")
+                + (f"  ERROR {r.error}" if r.error else "")
+            )
+        return "\n".join(lines)
+
+    @staticmethod
+    def compare(
+        results: List["BenchmarkResult"],
+        baseline: List[Dict[str, Any]],
+        threshold: float = 0.2,
+    ) -> List[str]:
+        """
+        与基线比较，返回退化超过阈值的指标
+        :param results: 本次结果
+        :param baseline: 基线结果
+        :param threshold: 允许的相对退化比例
+        :return:
+        """
+        baseline_map = {i["name"]: i for i in baseline}
+        regressions = []
+        for r in results:
+            base = baseline_map.get(r.name)
+            if not base:
+                continue
+            current = r.to_dict()
+            for key in ("wall_time", "cpu_total", "cpu_parse", "peak_rss_kb"):
+                if base.get(key) and current[key] is not None and current[key] > base[key] * (1 + threshold):
+                    regressions.append(f"{r.name} {key}: {base[key]} -> {current[key]}")
+        return regressions
@@ -1,16 +1,24 @@
 import asyncio
 import contextlib
+import threading
+import time
 from pathlib import Path
 from ssl import SSLZeroReturnError
-from typing import Optional, List, Dict, TypeVar, Generic, Callable, Type
+from typing import Optional, List, Dict, TypeVar, Generic, Callable, Type, Tuple
 
 from aiofiles import open as async_open
-from httpx import AsyncClient, HTTPError, Response
+from httpx import AsyncClient, HTTPError, Response, URL
 
+from .assets_utils import variants as image_variants
 from .assets_utils.path import ASSETS_ROOT
+from .assets_utils.variants import ImageVariant
+from .core.bundle import BundleWriter, BundleReader, BundleItems, BundleMapping
+from .core.disk_writer import DiskWriter
 from .core.file_manager import FileManager
-from .models.base import BaseWikiModel, IconAsset
+from .core.retry import RetryPolicy, CircuitBreaker, RequestError
+from .models.base import BaseWikiModel, IconAsset, IconAssetUrl
 from .models.enums import Game, DataType
+from .models.frozen import FrozenModelFactory
 from utils.const import PROJECT_ROOT
 from utils.log import logger
 from utils.typedefs import StrOrURL, StrOrInt
@@ -27,6 +35,13 @@ def _icon_getter(mode: str) -> Callable[["_AssetsService", StrOrInt, StrOrInt],
     return wrapper
 
 
+def _variant_getter(mode: str, variant: str) -> Callable[["_AssetsService", StrOrInt, StrOrInt], Path]:
+    def wrapper(self: "_AssetsService", target: StrOrInt, second_target: StrOrInt = None) -> Path:
+        return self._get_icon_variant(self.get_target(target, second_target), mode, variant)
+
+    return wrapper
+
+
 class _AssetsServiceError(Exception):
     pass
 
@@ -38,43 +53,126 @@ class _AssetsCouldNotFound(_AssetsServiceError):
         super().__init__(f"{message}: target={target}")
 
 
+class _HostStats:
+    """
+    按 host 记录图标下载情况
+
+    耗时取指数加权平均，失败会增加惩罚，用于给图标的候选下载地址排序
+    """
+
+    def __init__(self, alpha: float = 0.3, default_latency: float = 1.0, failure_penalty: float = 5.0):
+        self.alpha = alpha
+        self.default_latency = default_latency
+        self.failure_penalty = failure_penalty
+        self.latency: Dict[str, float] = {}
+        self.failures: Dict[str, int] = {}
+
+    def record(self, host: str, elapsed: float, success: bool):
+        if not success:
+            self.failures[host] = self.failures.get(host, 0) + 1
+            return
+        self.failures.pop(host, None)
+        last = self.latency.get(host)
+        self.latency[host] = elapsed if last is None else self.alpha * elapsed + (1 - self.alpha) * last
+
+    def score(self, host: str) -> float:
+        """越小越优先"""
+        return self.latency.get(host, self.default_latency) + self.failures.get(host, 0) * self.failure_penalty
+
+
 class _AssetsService(Generic[T]):
     client: "AsyncClient" = AsyncClient(timeout=60.0)
+    retry_policy: "RetryPolicy" = RetryPolicy(base_delay=1.0, circuit_breaker=CircuitBreaker())
+    host_stats: "_HostStats" = _HostStats()
+    """所有素材服务共享的 host 下载统计"""
+    ICON_FORMATS = ("png", "webp", "jpg")
     BASE_URL = "https://nb-1s.enzonix.com/bucket-1565-2162/"
     game: "Game"
     data_type: "DataType"
     data_model: Type[T]
     DEFAULT_ID: int = None
+    variants: Dict[str, Tuple["ImageVariant", ...]] = {}
+    """图标字段 -> 需要生成的图片变体，需要安装 Pillow"""
+    read_only: bool = False
+    """使用只读的 __slots__ 对象代替 pydantic 模型，数据已在爬虫中校验，加载时不再校验"""
+    use_bundle: bool = False
+    """优先以 mmap 打开爬虫生成的二进制数据包，多个进程共享同一份数据，数据在访问时才解码"""
     _instance = None
 
     @classmethod
-    def get_instance(cls):
+    def create_instance(cls):
+        """获取实例，不读取数据"""
         if cls._instance is None:
             cls._instance = cls()
         return cls._instance
 
+    @classmethod
+    def get_instance(cls):
+        """获取实例，首次调用时在当前线程同步读取数据"""
+        instance = cls.create_instance()
+        instance.ensure_loaded()
+        return instance
+
+    @classmethod
+    async def get_instance_async(cls):
+        """获取实例，在线程池中读取数据，并发的首次调用共享同一次读取"""
+        instance = cls.create_instance()
+        await instance.load()
+        return instance
+
     def __init__(self):
         self.all_items: List[T] = []
         self.all_items_map: Dict[str, T] = {}
         self.all_items_name: Dict[str, T] = {}
-        self.sync_read_metadata()
+        self._bundle: Optional["BundleReader"] = None
+        self.loaded = False
+        self._load_lock = threading.Lock()
+        self._load_future: Optional["asyncio.Future"] = None
+
+    def ensure_loaded(self, force: bool = False):
+        """读取本地数据，只读取一次；force 为 True 时重新读取，例如数据文件已更新"""
+        with self._load_lock:
+            if self.loaded and not force:
+                return
+            self.sync_read_metadata()
+            self.loaded = True
+
+    async def load(self, force: bool = False):
+        """
+        在线程池中读取本地数据，不阻塞事件循环
+        并发的调用共享同一次读取；force 为 True 时在之前的读取完成后重新读取
+        """
+        if self.loaded and not force:
+            return
+        future = self._load_future
+        if force or future is None or future.get_loop() is not asyncio.get_running_loop() or future.cancelled():
+            future = self._load_future = asyncio.ensure_future(asyncio.to_thread(self.ensure_loaded, force))
+        try:
+            await asyncio.shield(future)
+        except Exception:
+            if self._load_future is future:
+                self._load_future = None
+            raise
 
     async def _remote_get(self, url: StrOrURL, retry: int = 5) -> Optional["Response"]:
-        for time in range(retry):
+        def on_retry(_: int, status_code: Optional[int]):
+            if status_code is None:
+                logger.debug("请求 %s 失败，正在重试", url)
+            else:
+                logger.debug("请求 %s 返回 %s，正在重试", url, status_code)
+
+        async def send() -> "Response":
             try:
-                response = await self.client.get(url, follow_redirects=False)
+                return await self.client.get(url, follow_redirects=False)
             except Exception as error:  # pylint: disable=W0703
                 if not isinstance(error, (HTTPError, SSLZeroReturnError)):
                     logger.error(error)  # 打印未知错误
-                if time != retry - 1:  # 未达到重试次数
-                    await asyncio.sleep(1)
-                else:
-                    raise error
-                continue
-            if response.status_code != 200:  # 判定页面是否正常
-                return None
-            return response
-        return None
+                raise error
+
+        response = await self.retry_policy.execute(URL(str(url)).host, send, on_retry, max_attempts=retry)
+        if response.status_code != 200:  # 判定页面是否正常
+            return None
+        return response
 
     async def _download(self, url: StrOrURL, path: Path, retry: int = 5) -> Optional[Path]:
         """从 url 下载图标至 path"""
@@ -108,52 +206,151 @@ class _AssetsService(Generic[T]):
         """数据的本地地址"""
         return self.base_path.parent / f"{self.data_type.value}.json"
 
+    @property
+    def bundle_url(self) -> str:
+        """数据包的远程地址"""
+        return self.data_url.removesuffix(".json") + ".bin"
+
+    @property
+    def bundle_path(self) -> Path:
+        """数据包的本地地址"""
+        return BundleWriter.get_bundle_path(self.data_path)
+
     def clear_class_data(self) -> None:
+        if self._bundle is not None:
+            self._bundle.close()
+            self._bundle = None
+            self.all_items, self.all_items_map, self.all_items_name = [], {}, {}
+            return
         self.all_items.clear()
         self.all_items_map.clear()
         self.all_items_name.clear()
 
-    def _get_icon_path(self, model: "IconAsset") -> Optional[Path]:
+    def _get_format_path(self, icon: "IconAssetUrl") -> Optional[Path]:
+        """某一格式图标的本地路径，扩展名与格式一致"""
         try:
-            file_name = Path(model.path.replace("\\", "/")).parts[-2:]
+            file_name = Path(icon.path.replace("\\", "/")).parts[-2:]
             return self.base_path / Path(*file_name)
-        except ValueError:
-            logger.debug("图标路径错误: %s", model)
+        except (TypeError, ValueError):
+            logger.debug("图标路径错误: %s", icon)
             return None
 
-    async def _download_icon(self, model: "IconAsset"):
-        """下载图标"""
-        try:
-            url = self.BASE_URL + model.path.replace("\\", "/")
-            path = self._get_icon_path(model)
-        except ValueError:
+    def _get_format_paths(self, model: "IconAsset") -> List[Tuple[str, Path]]:
+        """按 ICON_FORMATS 顺序列出各格式的本地路径"""
+        paths = []
+        for fmt in self.ICON_FORMATS:
+            icon: Optional["IconAssetUrl"] = getattr(model, fmt, None)
+            if not icon or not icon.path:
+                continue
+            path = self._get_format_path(icon)
+            if path is not None:
+                paths.append((fmt, path))
+        return paths
+
+    def _get_icon_path(self, model: "IconAsset") -> Optional[Path]:
+        """
+        图标的本地路径：优先返回已经下载的格式，首选格式缺失时可能是回退下载的其他格式；
+        都未下载时返回首选格式的路径
+        """
+        paths = self._get_format_paths(model)
+        if not paths:
             logger.debug("图标路径错误: %s", model)
             return None
-        if path.exists():
+        for _, path in paths:
+            if path.exists():
+                return path
+        return paths[0][1]
+
+    def _get_icon_sources(self, model: "IconAsset") -> List[Tuple[str, Path]]:
+        """
+        图标的候选下载地址与对应格式的保存路径
+
+        依次为各格式的镜像地址与爬虫记录的原始地址，按 host 的历史耗时与失败次数排序，
+        分数相同时镜像优先、png 优先；回退到其他格式时按该格式的扩展名保存
+        """
+        mirrors, origins = [], []
+        for fmt in self.ICON_FORMATS:
+            icon: Optional["IconAssetUrl"] = getattr(model, fmt, None)
+            if not icon or not icon.path:
+                continue
+            path = self._get_format_path(icon)
+            if path is None:
+                continue
+            mirrors.append((self.BASE_URL + icon.path.replace("\\", "/"), path))
+            if icon.url and icon.url.startswith("http"):
+                origins.append((icon.url, path))
+        sources = list(dict.fromkeys(mirrors + origins))
+        return sorted(sources, key=lambda i: self.host_stats.score(URL(i[0]).host))
+
+    async def _download_icon(self, model: "IconAsset") -> Optional[Path]:
+        """下载图标，镜像缺失时回退到其他格式与原始地址，返回实际保存的路径"""
+        path = self._get_icon_path(model)
+        if path is None or path.exists():
             return path
-        await self._download(url, path)
+        for url, target in self._get_icon_sources(model):
+            host = URL(url).host
+            start = time.perf_counter()
+            try:
+                result = await self._download(url, target, retry=3)
+            except (HTTPError, SSLZeroReturnError, OSError, RequestError) as error:
+                logger.debug("从 %s 下载图标失败: %s", url, error)
+                self.host_stats.record(host, 0.0, False)
+                continue
+            # 单个文件缺失不代表 host 不可用，只记录成功的耗时
+            if result is not None:
+                self.host_stats.record(host, time.perf_counter() - start, True)
+                return target
+        logger.debug("图标所有下载地址均失败: %s", model)
         return path
 
     def _sync_read_metadata(self, datas):
         self.clear_class_data()
         for data in datas:
-            item = self.data_model.model_validate(data)
+            item = self._decode_item(data)
             self.all_items.append(item)
             self.all_items_map[item.id] = item
             self.all_items_name[item.name] = item
 
+    def _decode_item(self, data) -> T:
+        if self.read_only:
+            return FrozenModelFactory.from_data(self.data_model, data)
+        return self.data_model.model_validate(data)
+
+    def _open_bundle(self) -> bool:
+        """以 mmap 打开数据包，只读取文件头"""
+        try:
+            reader = BundleReader(self.bundle_path)
+        except (OSError, ValueError) as error:
+            logger.debug("数据包 %s 无法打开: %s", self.bundle_path, error)
+            return False
+        self.clear_class_data()
+        self._bundle = reader
+        items = BundleItems(reader, self._decode_item)
+        self.all_items = items
+        self.all_items_map = BundleMapping(items)
+        self.all_items_name = BundleMapping(items, by_name=True)
+        return True
+
     def sync_read_metadata(self):
+        if self.use_bundle and self.bundle_path.exists() and self._open_bundle():
+            return
         if not self.data_path.exists():
             return
         datas = FileManager.sync_load_json(self.data_path)
         self._sync_read_metadata(datas)
 
     async def read_metadata(self, force: bool):
-        if force or not self.data_path.exists():
+        """下载缺失的数据，再通过 load 读取，与其他协程的首次调用共享同一次读取"""
+        if self.use_bundle and (force or not self.bundle_path.exists()):
+            response = await self._remote_get(self.bundle_url)
+            if response is not None:
+                await FileManager.save_file(self.bundle_path, response.content)
+                await DiskWriter.wait_for(self.bundle_path)
+        if not (self.use_bundle and self.bundle_path.exists()) and (force or not self.data_path.exists()):
             datas = await self._remote_get(self.data_url)
             await FileManager.save_file(self.data_path, datas.content)
-        datas = await FileManager.load_json(self.data_path)
-        self._sync_read_metadata(datas)
+            await DiskWriter.wait_for(self.data_path)
+        await self.load(force)
 
     async def download_icons(self):
         need_download_fields = []
@@ -176,11 +373,31 @@ class _AssetsService(Generic[T]):
             await asyncio.gather(*tasks)
             tasks.clear()
 
+    async def build_variants(self):
+        """生成图片变体，原图未变化的跳过"""
+        if not self.variants:
+            return
+        if not image_variants.is_available():
+            logger.debug("未安装 Pillow，跳过生成图片变体")
+            return
+        jobs = []
+        for item in self.all_items:
+            for field, field_variants in self.variants.items():
+                icon: "IconAsset" = getattr(item, field, None)
+                path = self._get_icon_path(icon) if icon else None
+                if path is None:
+                    continue
+                jobs.extend((path, variant) for variant in field_variants)
+        builder = image_variants.ImageVariantBuilder(self.base_path / "variants.json")
+        built = await builder.build(jobs)
+        logger.debug("%s 生成了 %s 个图片变体", self.data_type.value, len(built))
+
     async def initialize(self, force):
         """初始化数据"""
         logger.info("正在初始化 %s 素材", self.data_type.value)
         await self.read_metadata(force)
         await self.download_icons()
+        await self.build_variants()
 
     def get_by_id(self, cid: StrOrInt) -> Optional[T]:
         cid = str(cid)
@@ -216,3 +433,19 @@ class _AssetsService(Generic[T]):
         if not icon:
             return None
         return self._get_icon_path(icon)
+
+    def _get_icon_variant(self, model: T, property_name: str, variant_name: str) -> Optional[Path]:
+        """获取图片变体，变体不存在时返回原图"""
+        path = self._get_icon(model, property_name)
+        if path is None:
+            return None
+        for variant in self.variants.get(property_name, ()):
+            if variant.name == variant_name:
+                variant_path = image_variants.get_variant_path(path, variant)
+                if variant_path.exists():
+                    return variant_path
+        return path
+
+    def get_icon_variant(self, target: StrOrInt, property_name: str, variant_name: str) -> Optional[Path]:
+        """按图标字段与变体名称获取图片，如 get_icon_variant(10000046, "icon", "thumb")"""
+        return self._get_icon_variant(self.get_target(target), property_name, variant_name)
@@ -1,3 +1,5 @@
+from typing import List
+
 import dotenv
 
 from pydantic_settings import BaseSettings
@@ -13,5 +15,65 @@ class SpiderSettings(BaseSettings):
     ZZZ: bool = True
     WW: bool = True
 
+    GAMES: List[str] = []
+    """只爬取指定的游戏，为空时不过滤"""
+    DATA_TYPES: List[str] = []
+    """只爬取指定的数据类型，为空时不过滤"""
+    SOURCES: List[str] = []
+    """只爬取指定的数据源，为空时不过滤"""
+    DRY_RUN: bool = False
+    """只输出将要运行的爬取单元，不实际爬取"""
+    NO_ICONS: bool = False
+    """只爬取数据，不下载图标"""
+
+    MAX_CONCURRENT_SPIDERS: int = 4
+    """同时运行的爬虫数量"""
+    ICON_CONCURRENCY: int = 16
+    """图标下载的总并发数"""
+    ICON_HOST_CONCURRENCY: int = 8
+    """同一域名的图标下载并发数"""
+
+    WORKERS: int = 0
+    """大于 0 时以协调者模式运行，启动指定数量的工作进程并行爬取"""
+    WORKER: bool = False
+    """以工作进程模式运行，从工作队列中领取爬取单元"""
+    QUEUE_DIR: str = ""
+    """工作队列目录，为空时使用 data/queue；多台机器共享该目录即可共同消费"""
+    WORKER_CLAIM_TIMEOUT: int = 3600
+    """领取后超过该秒数仍未完成的单元重新放回队列"""
+
+    REQUEST_CACHE_TTL: int = 300
+    """GET / HEAD 响应在内存中缓存的秒数，为 0 时只合并同时进行的相同请求"""
+    REQUEST_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    """响应缓存的总字节数上限，超过时淘汰最久未使用的响应"""
+    REQUEST_CACHE_MAX_ITEM_BYTES: int = 64 * 1024
+    """二进制响应（例如图片）只有不超过该字节数时才缓存，文本响应不受限制"""
+
+    RESUME: bool = False
+    """从上一次中断的检查点继续爬取"""
+    FORCE: bool = False
+    """忽略数据源指纹，强制重新解析"""
+    NEGATIVE_CACHE_TTL: int = 7 * 24 * 60 * 60
+    """返回 404 的链接在多少秒内不再请求"""
+    JSON_OFFLOAD_THRESHOLD: int = 1024 * 1024
+    """超过该字节数的 JSON 在线程池或进程池中解析，不阻塞事件循环"""
+    JSON_DECODE_EXECUTOR: str = "thread"
+    """解析大 JSON 的执行器 thread / process"""
+    JSON_DECODE_WORKERS: int = 2
+    """解析大 JSON 的线程或进程数"""
+    WRITE_BEHIND: bool = True
+    """文件由后台写线程写入，保存时不等待磁盘"""
+    WRITE_THREADS: int = 4
+    """后台写线程数"""
+    WRITE_QUEUE_SIZE: int = 256
+    """等待写入的文件数上限，超过时保存需要等待"""
+    WRITE_FSYNC: str = "none"
+    """同步到磁盘的策略 none / batch（flush 时统一同步）/ always（每个文件写入后同步）"""
+
+    METRICS: bool = True
+    """运行结束后输出指标"""
+    METRICS_FORMAT: str = "json"
+    """指标格式 json / prometheus"""
+
 
 config = SpiderSettings()
@@ -1,38 +1,169 @@
 import abc
 import asyncio
+import functools
+import os
+import socket
+import sys
+import time
 import traceback
 
-from asyncio import sleep, PriorityQueue
-from typing import Dict, List, Any, Tuple, Self
+from asyncio import PriorityQueue
+from collections import OrderedDict
+from typing import Dict, List, Any, Tuple, Self, Optional, Callable, Awaitable, Type, Union
 
-from httpx import AsyncClient, Response
+from httpx import AsyncClient, Response, URL
 from persica.factory.component import AsyncInitializingComponent
+from pydantic import BaseModel, ValidationError
 
+from .bundle import BundleWriter
+from .checkpoint import CheckpointStore
+from .disk_writer import DiskWriter
 from .file_manager import FileManager
+from .icon_planner import IconPlanner
+from .metrics import Metrics, current_spider
+from .retry import RetryPolicy, CircuitBreaker, RequestError
+from .scheduler import TaskGraph, DependencyError
+from .source_cache import SourceCache, ItemHashStore, NegativeCache
+from .work_queue import WorkQueue, get_queue_dir
+from ..assets_utils.path import ASSETS_ROOT, ASSETS_DATA_ROOT
 from ..config import config
-from ..models.base import BaseWikiModel
+from ..models.base import BaseWikiModel, get_list_adapter
 from ..models.enums import DataType
 from ..models.enums import Game
 
 
+TEXT_CONTENT_TYPES = {"application/json", "application/javascript", "application/xml", "application/xhtml+xml"}
+
+
 class RequestClient:
+    """
+    GET / HEAD 请求在一次运行内去重：同时进行的相同请求共享同一次请求，
+    成功的文本响应与较小的二进制响应在内存中缓存 REQUEST_CACHE_TTL 秒，总大小受 REQUEST_CACHE_MAX_BYTES 限制
+    """
+
     client = AsyncClient()
+    retry_policy = RetryPolicy(circuit_breaker=CircuitBreaker())
+    inflight: Dict[Tuple[str, str], "asyncio.Task"] = {}
+    """正在进行的请求"""
+    cache: "OrderedDict[Tuple[str, str], Tuple[float, Response]]" = OrderedDict()
+    """(方法, 地址) -> 过期时间与响应，按最近使用排序"""
+    cache_bytes: int = 0
 
     @staticmethod
-    async def request(method: str, url: str, times: int = 3) -> "Response":
-        try:
-            response = await RequestClient.client.request(method, url)
-            if response.status_code == 200:
+    def reset_cache():
+        RequestClient.cache.clear()
+        RequestClient.cache_bytes = 0
+
+    @staticmethod
+    def _get_cached(key: Tuple[str, str]) -> Optional["Response"]:
+        entry = RequestClient.cache.get(key)
+        if entry is None:
+            return None
+        expires, response = entry
+        if expires <= time.monotonic():
+            RequestClient._evict(key)
+            return None
+        RequestClient.cache.move_to_end(key)
+        return response
+
+    @staticmethod
+    def _evict(key: Tuple[str, str]):
+        _, response = RequestClient.cache.pop(key)
+        RequestClient.cache_bytes -= len(response.content)
+
+    @staticmethod
+    def is_text(response: "Response") -> bool:
+        content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type.startswith("text/") or content_type in TEXT_CONTENT_TYPES
+
+    @staticmethod
+    def _set_cached(key: Tuple[str, str], response: "Response"):
+        """只缓存文本响应与较小的二进制响应"""
+        size = len(response.content)
+        if config.REQUEST_CACHE_TTL <= 0 or size > config.REQUEST_CACHE_MAX_BYTES:
+            return
+        if size > config.REQUEST_CACHE_MAX_ITEM_BYTES and not RequestClient.is_text(response):
+            return
+        if key in RequestClient.cache:
+            RequestClient._evict(key)
+        while RequestClient.cache and RequestClient.cache_bytes + size > config.REQUEST_CACHE_MAX_BYTES:
+            RequestClient._evict(next(iter(RequestClient.cache)))
+        RequestClient.cache[key] = (time.monotonic() + config.REQUEST_CACHE_TTL, response)
+        RequestClient.cache_bytes += size
+
+    @staticmethod
+    async def request(method: str, url: str, times: int = 3, cache: bool = True) -> "Response":
+        """
+        发送请求，GET / HEAD 请求与同时进行或刚刚完成的相同请求共享响应
+        :param method: 请求方法
+        :param url: 请求地址
+        :param times: 最大重试次数
+        :param cache: 是否去重与缓存，调用方已经按链接去重时（例如图标下载）传 False
+        :return: 状态码为 200 的响应，否则抛出 RequestError
+        """
+        method = method.upper()
+        if not cache or method not in ("GET", "HEAD"):
+            return await RequestClient._request(method, url, times)
+        key = (method, str(url))
+        host = URL(str(url)).host
+        spider = current_spider.get()
+        response = RequestClient._get_cached(key)
+        if response is not None:
+            Metrics.inc("request_dedup_total", host=host, spider=spider, source="cache")
+            return response
+        task = RequestClient.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(RequestClient._request(method, url, times))
+            RequestClient.inflight[key] = task
+
+            def done(t: "asyncio.Task"):
+                if RequestClient.inflight.get(key) is t:
+                    del RequestClient.inflight[key]
+                if not t.cancelled() and t.exception() is None:
+                    RequestClient._set_cached(key, t.result())
+
+            task.add_done_callback(done)
+        else:
+            Metrics.inc("request_dedup_total", host=host, spider=spider, source="inflight")
+        # 某个调用方被取消时，请求仍为其他调用方继续
+        return await asyncio.shield(task)
+
+    @staticmethod
+    async def _request(method: str, url: str, times: int = 3) -> "Response":
+        """
+        发送请求，按 retry_policy 重试
+        :param method: 请求方法
+        :param url: 请求地址
+        :param times: 最大重试次数
+        :return: 状态码为 200 的响应，否则抛出 RequestError
+        """
+        host = URL(str(url)).host
+        spider = current_spider.get()
+
+        async def send() -> "Response":
+            start = time.perf_counter()
+            status = "error"
+            try:
+                response = await RequestClient.client.request(method, url)
+                status = response.status_code
                 return response
-            else:
-                times = 0
-                raise Exception(f"Request {method} {url} failed with status code {response.status_code}")
-        except Exception as e:
-            if times > 0:
-                await sleep(0.3)
-                return await RequestClient.request(method, url, times - 1)
-            else:
-                raise e
+            finally:
+                Metrics.observe("request_duration_seconds", time.perf_counter() - start, host=host)
+                Metrics.inc("requests_total", host=host, spider=spider, status=status)
+
+        def on_retry(_: int, status_code: Optional[int]):
+            Metrics.inc("request_retries_total", host=host, spider=spider, status=status_code or "error")
+
+        try:
+            response = await RequestClient.retry_policy.execute(host, send, on_retry, max_attempts=times + 1)
+        except Exception:
+            Metrics.inc("request_failures_total", host=host, spider=spider, status="error")
+            raise
+        if response.status_code != 200:
+            Metrics.inc("request_failures_total", host=host, spider=spider, status=response.status_code)
+            raise RequestError(method, str(url), response.status_code)
+        Metrics.inc("request_bytes_total", len(response.content), host=host, spider=spider)
+        return response
 
 
 class BaseSpider(AsyncInitializingComponent):
@@ -41,6 +172,14 @@ class BaseSpider(AsyncInitializingComponent):
     data_source: str
     file_type: str = "json"
     priority: int = 100
+    depends_on: Tuple[str, ...] = ()
+    """依赖的爬虫类名，依赖全部完成后才会开始爬取"""
+    model: Type[BaseWikiModel] = BaseWikiModel
+    """爬取结果的模型，用于整批校验与序列化"""
+    source_fingerprint: Optional[str] = None
+    """本次运行的数据源指纹"""
+    source_unchanged: bool = False
+    """数据源与上一次相同，沿用上一次的输出"""
 
     @property
     def default_headers(self) -> Dict[str, str]:
@@ -60,7 +199,8 @@ class BaseSpider(AsyncInitializingComponent):
         save: bool = True,
         process_func=None,
     ) -> Tuple["Response", Any]:
-        response = await RequestClient.request(method, url)
+        with Metrics.timer("spider_request_duration_seconds", spider=self.__class__.__name__):
+            response = await RequestClient.request(method, url)
         if process_func:
             data = await process_func(response)
         else:
@@ -69,12 +209,155 @@ class BaseSpider(AsyncInitializingComponent):
             await FileManager.save_raw_file(self.game, self.data_type, self.data_source, response_type, data)
         return response, data
 
-    async def _download_file(self, url: str) -> str:
+    async def _download_file(self, url: str, priority: Optional[int] = None, optional: bool = False) -> str:
+        """
+        登记图标下载意图，图标在全部爬虫完成后由 IconPlanner 统一下载
+        :param url: 图标链接
+        :param priority: 下载优先级，默认为爬虫优先级
+        :param optional: 下载失败不影响数据源指纹与数据项指纹
+        :return: 图标的相对路径，下载失败时会从输出中移除
+        """
+        spider = self.__class__.__name__
         exists, p = FileManager.has_raw_icon(url, self.game, self.data_type, self.data_source)
         if exists:
+            Metrics.inc("icon_cache_hits_total", spider=spider)
             return p
-        response = await RequestClient.request("GET", url)
-        return await FileManager.save_raw_icon(url, self.game, self.data_type, self.data_source, response.content)
+        if config.NO_ICONS:
+            # 只爬取数据，图标路径照常记录
+            Metrics.inc("icon_skipped_total", spider=spider)
+            ItemHashStore.mark_incomplete()
+            return p
+        path = FileManager.get_raw_icon_path(url, self.game, self.data_type, self.data_source)
+        priority = self.priority if priority is None else priority
+        return IconPlanner.register(url, path, str(p), priority, optional, spider, self.data_source)
+
+    def check_source(self, content: bytes) -> bool:
+        """
+        记录数据源指纹
+        :param content: 数据源的原始内容
+        :return: 数据源与上一次相同，不需要继续解析
+        """
+        name = self.__class__.__name__
+        self.source_fingerprint = SourceCache.get_fingerprint(content)
+        # 不存在的图标记录过期后需要重新解析，让这些图标重新请求
+        expired = NegativeCache.has_expired(self.data_source, name)
+        unchanged = SourceCache.is_unchanged(self.game, self.data_type, name, self.source_fingerprint)
+        self.source_unchanged = unchanged and not expired
+        return self.source_unchanged
+
+    async def parse_items(
+        self,
+        items: Dict[str, Any],
+        parse: Callable[[str, Any], Awaitable[Union[BaseWikiModel, Dict[str, Any], None]]],
+    ) -> List[BaseWikiModel]:
+        """
+        解析数据源中的每一项，只解析新增或变化的项，未变化的项直接使用上一次的结果
+        :param items: 数据项 id -> 原始数据
+        :param parse: 解析单项的函数，返回模型数据，全部解析完成后整批校验；解析失败时抛出异常
+        :return: 按数据源顺序排列的结果
+        """
+        name = self.__class__.__name__
+        adapter = get_list_adapter(self.model)
+        store = await ItemHashStore.load(self.game, self.data_type, name)
+        results: Dict[str, Optional[BaseWikiModel]] = {}
+        reused: Dict[str, Dict[str, Any]] = {}
+        pending = []
+        for key, value in items.items():
+            item_hash = ItemHashStore.hash_item(value)
+            entry = store.get_unchanged(key, item_hash)
+            if entry is None:
+                pending.append((key, item_hash, value))
+            elif entry["data"]:
+                reused[key] = entry["data"]
+        store.remove_missing(list(items.keys()))
+        if reused:
+            # 沿用的结果整批校验为模型
+            results.update(zip(reused.keys(), adapter.validate_python(list(reused.values()))))
+        parsed: Dict[str, Tuple[str, Any, bool]] = {}
+
+        async def task(key: str, item_hash: str, value: Any):
+            state = ItemHashStore.begin_item()
+            try:
+                item = await parse(key, value)
+            except Exception as e:
+                print(f"解析数据失败: {e}")
+                # 输出不完整，不记录指纹，下次运行重新解析
+                self.source_fingerprint = None
+                store.discard(key)
+                return
+            parsed[key] = (item_hash, item, state["complete"])
+
+        tasks = []
+        for i in pending:
+            tasks.append(task(*i))
+            if len(tasks) > 10:
+                await self.gather_tasks(tasks)
+        if tasks:
+            await self.gather_tasks(tasks)
+        validated = self.validate_items({k: v[1] for k, v in parsed.items() if v[1]})
+        dumped = dict(zip(validated.keys(), adapter.dump_python(list(validated.values()), mode="json")))
+        for key, (item_hash, item, complete) in parsed.items():
+            if item and key not in validated:
+                self.source_fingerprint = None
+                store.discard(key)
+            elif complete:
+                store.update(key, item_hash, dumped.get(key))
+            else:
+                store.discard(key)
+        results.update(validated)
+        await store.save()
+        report = store.get_report()
+        for change, keys in report.items():
+            if keys:
+                Metrics.inc("spider_item_changes_total", len(keys), spider=name, change=change)
+        print(
+            f"{self.game} {name} 新增 {len(report['added'])} 变化 {len(report['changed'])} "
+            f"删除 {len(report['removed'])} 沿用 {len(items) - len(pending)}"
+        )
+        return [results[k] for k in items if results.get(k)]
+
+    def validate_items(self, items: Dict[Any, Any]) -> Dict[Any, BaseWikiModel]:
+        """
+        用 TypeAdapter(List[model]) 整批校验模型数据
+        :param items: 键 -> 模型数据
+        :return: 键 -> 模型，校验失败的项不包含在内
+        """
+        adapter = get_list_adapter(self.model)
+        keys, values = list(items.keys()), list(items.values())
+        try:
+            return dict(zip(keys, adapter.validate_python(values)))
+        except ValidationError as e:
+            # 按错误位置找出失败的项，其余项重新整批校验
+            failed: Dict[int, List[str]] = {}
+            for i in e.errors():
+                failed.setdefault(i["loc"][0], []).append(f"{'.'.join(map(str, i['loc'][1:]))}: {i['msg']}")
+            for index, messages in failed.items():
+                print(f"解析数据失败: {keys[index]} {'; '.join(messages)}")
+            keys = [k for i, k in enumerate(keys) if i not in failed]
+            values = [v for i, v in enumerate(values) if i not in failed]
+            return dict(zip(keys, adapter.validate_python(values)))
+
+    async def get_icon_assets(self, game_name_map: Dict[str, Tuple[str, str]]) -> Dict[str, Dict[str, Dict[str, str]]]:
+        """
+        登记图标下载
+        :param game_name_map: 字段 -> (文件名, 格式)
+        :return: 字段 -> IconAsset 数据
+        """
+        icons = {}
+        for k, v in game_name_map.items():
+            u = self.get_icon_url(v[0], v[1])
+            try:
+                p = await self._download_file(u)
+            except Exception as e:
+                print(f"下载图片失败：{u} {e}")
+                continue
+            icons[k] = {v[1]: {"url": u, "path": str(p)}}
+        return icons
+
+    @staticmethod
+    def get_icon_url(filename: str, ext: str) -> str:
+        """图标链接，使用 get_icon_assets 的爬虫需要实现"""
+        raise NotImplementedError
 
     async def initialize(self):
         if not hasattr(self, "game") or not self.game or not self.data_type:
@@ -102,12 +385,38 @@ class BaseSpider(AsyncInitializingComponent):
 
 class SpiderManager:
     spiders: Dict["Game", Dict["DataType", PriorityQueue]] = {}
+    unselected: Dict[Tuple["Game", "DataType"], List["BaseSpider"]] = {}
+    """只因数据源过滤而未运行的爬虫，合并时沿用其上一次的输出"""
     SPIDER_INDEX_MAP: Dict["Game", Dict["DataType", str]] = {
         Game.GENSHIN: {DataType.WEAPON: "name", DataType.NAMECARD: "name"}
     }
 
+    @staticmethod
+    def is_selected(game: "Game", data_type: "DataType", data_source: str = "") -> bool:
+        """
+        判断爬取单元是否被选中
+        :param game: 游戏，受 config.GENSHIN 等开关与 config.GAMES 过滤
+        :param data_type: 数据类型，受 config.DATA_TYPES 过滤
+        :param data_source: 数据源，受 config.SOURCES 过滤，为空时不过滤
+        :return:
+        """
+        if not getattr(config, game.name, True):
+            return False
+        if config.GAMES and game.value not in config.GAMES:
+            return False
+        if config.DATA_TYPES and data_type.value not in config.DATA_TYPES:
+            return False
+        if config.SOURCES and data_source and data_source.lower() not in config.SOURCES:
+            return False
+        return True
+
     @staticmethod
     async def add_to_spider(game: "Game", data_type: "DataType", clz: "BaseSpider"):
+        if not SpiderManager.is_selected(game, data_type):
+            return
+        if not SpiderManager.is_selected(game, data_type, clz.data_source):
+            SpiderManager.unselected.setdefault((game, data_type), []).append(clz)
+            return
         if game.value not in SpiderManager.spiders:
             SpiderManager.spiders[game] = {}
         if data_type.value not in SpiderManager.spiders[game]:
@@ -134,6 +443,28 @@ class SpiderManager:
                 dict_1[key] = value
         return dict_1
 
+    @staticmethod
+    def merge_model(model_1: BaseModel, model_2: BaseModel) -> BaseModel:
+        """
+        按 merge_dict 的规则在模型上合并，不经过 dict：model_1 中为空的字段取 model_2 的值，嵌套模型递归合并
+        :param model_1:
+        :param model_2:
+        :return:
+        """
+        fields = type(model_1).model_fields
+        for key in type(model_2).model_fields:
+            value = getattr(model_2, key)
+            if not value or key not in fields:
+                continue
+            old_value = getattr(model_1, key)
+            if not old_value:
+                setattr(model_1, key, value)
+            elif isinstance(value, BaseModel) and isinstance(old_value, BaseModel):
+                SpiderManager.merge_model(old_value, value)
+            elif isinstance(value, dict) and isinstance(old_value, dict):
+                SpiderManager.merge_dict(old_value, value)
+        return model_1
+
     @staticmethod
     def get_spider_model_index_key(game: "Game", data_type: "DataType") -> str:
         """
@@ -146,51 +477,302 @@ class SpiderManager:
             return SpiderManager.SPIDER_INDEX_MAP[game][data_type]
         return "id"
 
+    @staticmethod
+    def get_units() -> List[Tuple["Game", "DataType", "BaseSpider"]]:
+        """
+        取出所有选中的爬取单元，同一数据类型内按优先级排序
+        :return:
+        """
+        units = []
+        for game, data_types in SpiderManager.spiders.items():
+            for data_type, spiders in data_types.items():
+                while not spiders.empty():
+                    spider = spiders.get_nowait()
+                    if SpiderManager.is_selected(game, data_type):
+                        units.append((game, data_type, spider))
+        return units
+
+    @staticmethod
+    async def crawl_unit(game: "Game", data_type: "DataType", spider: "BaseSpider") -> List[BaseWikiModel]:
+        """
+        运行单个爬虫
+        :return: 爬取结果
+        """
+        name = spider.__class__.__name__
+        adapter = get_list_adapter(spider.model)
+        if CheckpointStore.is_done(game, data_type, name):
+            d = adapter.validate_json(await CheckpointStore.load_output(game, data_type, name))
+            # 检查点中的图标可能尚未下载，重新登记
+            for i in await CheckpointStore.load_icons(game, data_type, name):
+                await spider._download_file(i["url"], i["priority"], i["optional"])  # pylint: disable=W0212
+            print(f"{game} {name} 从检查点恢复，数据量: {len(d)}")
+            return d
+        start = time.perf_counter()
+        try:
+            with Metrics.spider_context(name):
+                d = await spider.start_crawl()
+            if spider.source_unchanged:
+                d = adapter.validate_json(await SourceCache.load_output(game, data_type, name))
+                Metrics.inc("spider_source_unchanged_total", spider=name)
+                print(f"{game} {name} 数据源未变化，沿用上一次的输出")
+            else:
+                d = [i for i in d or [] if i]
+            await CheckpointStore.save_output(game, data_type, name, adapter.dump_json(d))
+            await CheckpointStore.save_icons(game, data_type, name, IconPlanner.get_intents(name))
+            Metrics.inc("spider_items_total", len(d), spider=name)
+            print(f"{game} {name} 爬取完成，数据量: {len(d)}")
+            return d
+        except Exception as e:
+            Metrics.inc("spider_failures_total", spider=name)
+            traceback.print_exc()
+            print(f"{game} {name} 报错: {e}")
+            raise e
+        finally:
+            Metrics.observe(
+                "spider_crawl_duration_seconds",
+                time.perf_counter() - start,
+                spider=name,
+                game=game.value,
+                data_type=data_type.value,
+            )
+
+    @staticmethod
+    async def finish_unit(game: "Game", data_type: "DataType", spider: "BaseSpider", data: List[BaseWikiModel]):
+        """
+        图标下载完成后移除下载失败的图标，并保存数据源指纹；
+        图标缺失的数据项删除指纹，下次解析时重新登记；存在图标下载失败（而不是不存在）时不保存数据源指纹
+        """
+        name = spider.__class__.__name__
+        if IconPlanner.prune(data):
+            print(f"{game} {name} 部分图标下载失败，已从输出中移除")
+        if name in IconPlanner.failed_spiders or name in IconPlanner.missing_spiders:
+            await ItemHashStore.discard_failed_icons(game, data_type, name, IconPlanner.prune)
+        # 爬虫结束的写入屏障，写入失败（例如图标未能落盘）时同样不保存数据源指纹
+        write_failed = await DiskWriter.flush()
+        if write_failed:
+            print(f"{game} {name} {len(write_failed)} 个文件写入失败")
+        if write_failed or spider.source_unchanged:
+            return
+        content = get_list_adapter(spider.model).dump_json(data)
+        if name not in IconPlanner.failed_spiders and spider.source_fingerprint:
+            await SourceCache.save(game, data_type, name, spider.source_fingerprint, content)
+        else:
+            # 没有指纹的爬虫同样保存输出，只运行部分数据源时用于合并
+            await SourceCache.save_output(game, data_type, name, content)
+        await DiskWriter.flush()
+
+    @staticmethod
+    async def save_merged(game: "Game", data_type: "DataType", data: List[List[BaseWikiModel]]):
+        """
+        按爬虫优先级合并同一数据类型的结果并保存
+        :param game:
+        :param data_type:
+        :param data: 每个爬虫的结果，按优先级排列
+        :return:
+        """
+        model_index_key = SpiderManager.get_spider_model_index_key(game, data_type)
+        # 合并
+        final_data: List[BaseWikiModel] = []
+        final_data_ids: Dict[str, BaseWikiModel] = {}
+        for i in range(len(data)):
+            if i == 0:
+                final_data = data[i]
+                final_data_ids = {getattr(j, model_index_key): j for j in data[i]}
+                continue
+            for j in data[i]:
+                index = getattr(j, model_index_key)
+                if index not in final_data_ids:
+                    final_data.append(j)
+                    final_data_ids[index] = j
+                else:
+                    SpiderManager.merge_model(final_data_ids[index], j)
+        # 保存
+        if len(final_data) > 0:
+            file_path = FileManager.get_raw_file_path(game, data_type)
+            content = get_list_adapter(type(final_data[0])).dump_json(final_data, indent=4)
+            await FileManager.save_file(file_path, content)
+            await BundleWriter.save(file_path, final_data)
+            print(f"{game} {data_type} 爬取完成，数据量: {len(final_data)}")
+        else:
+            print(f"{game} {data_type} 没有数据")
+
     @staticmethod
     async def start_crawl():
         """
         启动所有爬虫
+
+        每个爬虫是任务图中的一个节点，按 depends_on 声明的依赖调度，互不依赖的爬虫并发运行；
+        全部完成后统一下载图标，再按数据类型合并保存
         :return:
         """
-        for game, data_types in SpiderManager.spiders.items():
-            if game is Game.GENSHIN and not config.GENSHIN:
+        units = SpiderManager.get_units()
+        if config.DRY_RUN:
+            SpiderManager.print_plan(units)
+            return
+        graph = TaskGraph(config.MAX_CONCURRENT_SPIDERS)
+        names = {spider.__class__.__name__ for _, _, spider in units}
+        for game, data_type, spider in units:
+            # 未选中的依赖视为已经完成，沿用上一次的输出
+            depends_on = [i for i in spider.depends_on if i in names]
+            graph.add(
+                spider.__class__.__name__,
+                functools.partial(SpiderManager.crawl_unit, game, data_type, spider),
+                depends_on,
+            )
+        try:
+            # 分布式运行同样需要检查，依赖成环的单元在队列中永远无法领取
+            graph.check()
+        except DependencyError as e:
+            print(f"爬虫依赖错误，未开始爬取: {e}")
+            raise SystemExit(1) from e
+        if config.WORKERS > 0:
+            await SpiderManager.start_distributed(units)
+            return
+        results = await graph.run()
+        for name, error in graph.errors.items():
+            if isinstance(error, DependencyError):
+                print(f"{name} 跳过: {error}")
+        await IconPlanner.execute()
+        for game, data_type, spider in units:
+            d = results.get(spider.__class__.__name__)
+            if d is not None:
+                await SpiderManager.finish_unit(game, data_type, spider, d)
+        await SpiderManager.save_results(units, results)
+        failed_writes = await DiskWriter.flush()
+        # 全部成功，下次运行从头开始；否则保留检查点供 RESUME 使用
+        if not graph.failed() and not failed_writes:
+            CheckpointStore.clear()
+        SpiderManager.dump_metrics()
+
+    @staticmethod
+    async def save_results(
+        units: List[Tuple["Game", "DataType", "BaseSpider"]], results: Dict[str, List[BaseWikiModel]]
+    ):
+        """
+        按数据类型合并保存
+        :param results: 爬虫名称 -> 结果，失败的爬虫不在其中
+        """
+        groups: Dict[Tuple["Game", "DataType"], List[Tuple["BaseSpider", List[BaseWikiModel]]]] = {}
+        for game, data_type, spider in units:
+            d = results.get(spider.__class__.__name__)
+            groups.setdefault((game, data_type), [])
+            if d is not None:
+                groups[(game, data_type)].append((spider, d))
+        for (game, data_type), data in groups.items():
+            missing = []
+            for spider in SpiderManager.unselected.get((game, data_type), []):
+                name = spider.__class__.__name__
+                if not SourceCache.has_output(game, data_type, name):
+                    missing.append(name)
+                    continue
+                d = get_list_adapter(spider.model).validate_json(await SourceCache.load_output(game, data_type, name))
+                data.append((spider, d))
+            if missing:
+                # 缺少未运行数据源的结果，保存会丢失这些数据源的数据
+                print(f"{game} {data_type} 未运行的 {', '.join(missing)} 没有上一次的输出，不保存合并结果")
                 continue
-            if game is Game.STARRAIL and not config.STARRAIL:
+            data.sort(key=lambda i: i[0])
+            await SpiderManager.save_merged(game, data_type, [d for _, d in data])
+
+    @staticmethod
+    async def start_distributed(units: List[Tuple["Game", "DataType", "BaseSpider"]]):
+        """
+        协调者：把爬取单元写入工作队列，启动 WORKERS 个工作进程消费，全部完成后合并保存
+
+        其他机器以 --worker --queue 指向同一目录运行即可加入；
+        工作进程异常退出时，超过 WORKER_CLAIM_TIMEOUT 的单元重新放回队列
+        """
+        queue = WorkQueue(get_queue_dir())
+        queue.reset()
+        queue.save_config(config.model_dump(mode="json", exclude={"WORKERS", "WORKER", "QUEUE_DIR"}))
+        names = {spider.__class__.__name__ for _, _, spider in units}
+        for order, (game, data_type, spider) in enumerate(units):
+            depends_on = [i for i in spider.depends_on if i in names]
+            queue.put(spider.__class__.__name__, order, depends_on, game=game.value, data_type=data_type.value)
+        args = [sys.executable, str(ASSETS_ROOT / "_main.py"), "--worker", "--queue", str(queue.root)]
+        processes = [await asyncio.create_subprocess_exec(*args, cwd=ASSETS_ROOT) for _ in range(config.WORKERS)]
+        print(f"已启动 {config.WORKERS} 个工作进程，工作队列: {queue.root}")
+        while not queue.is_finished():
+            for name in queue.requeue_stale(config.WORKER_CLAIM_TIMEOUT):
+                print(f"{name} 超时未完成，重新放回队列")
+            if all(p.returncode is not None for p in processes):
+                # 本机的工作进程全部退出，剩余的单元视为失败
+                print("工作进程已全部退出，队列中仍有未完成的爬取单元")
+                break
+            await asyncio.sleep(1)
+        for p in processes:
+            await p.wait()
+        # 合并工作进程的指标，与单进程运行的指标一致
+        for p in queue.metrics.glob("*.json"):
+            Metrics.merge(FileManager.sync_load_json(p))
+        results: Dict[str, List[BaseWikiModel]] = {}
+        failed = False
+        for _, _, spider in units:
+            name = spider.__class__.__name__
+            content = queue.load_result(name)
+            if content is None:
+                failed = True
+                print(f"{name} 失败: {queue.get_error(name) or '未完成'}")
                 continue
-            if game is Game.ZZZ and not config.ZZZ:
+            results[name] = get_list_adapter(spider.model).validate_json(content)
+        await SpiderManager.save_results(units, results)
+        failed_writes = await DiskWriter.flush()
+        if not failed and not failed_writes:
+            CheckpointStore.clear()
+        SpiderManager.dump_metrics()
+
+    @staticmethod
+    async def run_worker():
+        """
+        工作进程：从工作队列领取爬取单元，爬取、下载图标后把结果写回队列，队列完成后退出
+
+        每个单元的图标在领取它的进程内下载，同一链接只在单个进程内去重
+        """
+        queue = WorkQueue(get_queue_dir())
+        worker = f"{socket.gethostname()}-{os.getpid()}"
+        spiders = {unit[2].__class__.__name__: unit for unit in SpiderManager.get_units()}
+        while True:
+            unit = queue.claim(worker)
+            if unit is None:
+                if queue.is_finished():
+                    break
+                await asyncio.sleep(0.5)
                 continue
-            if game is Game.WW and not config.WW:
+            name = unit["name"]
+            if name not in spiders:
+                queue.fail(unit, "spider not found")
                 continue
-            for data_type, spiders in data_types.items():
-                data: List[List[Dict]] = []
-                model_index_key = SpiderManager.get_spider_model_index_key(game, data_type)
-                while not spiders.empty():
-                    spider = await spiders.get()
-                    try:
-                        d = await spider.start_crawl()
-                        data.append([i.model_dump() for i in d if i])
-                        print(f"{game} {spider.__class__.__name__} 爬取完成，数据量: {len(d)}")
-                    except Exception as e:
-                        traceback.print_exc()
-                        print(f"{game} {spider.__class__.__name__} 报错: {e}")
-                # 合并
-                final_data: List[Dict] = []
-                final_data_ids: Dict[str, Dict] = {}
-                for i in range(len(data)):
-                    if i == 0:
-                        final_data = data[i]
-                        final_data_ids = {j[model_index_key]: j for j in data[i]}
-                        continue
-                    for j in data[i]:
-                        if j[model_index_key] not in final_data_ids:
-                            final_data.append(j)
-                            final_data_ids[j[model_index_key]] = j
-                        else:
-                            old_data = final_data_ids[j[model_index_key]]
-                            SpiderManager.merge_dict(old_data, j)
-                # 保存
-                if len(final_data) > 0:
-                    await FileManager.save_data_file(game, data_type, final_data)
-                    print(f"{game} {data_type} 爬取完成，数据量: {len(final_data)}")
-                else:
-                    print(f"{game} {data_type} 没有数据")
+            game, data_type, spider = spiders[name]
+            print(f"[{worker}] 开始 {name}")
+            try:
+                d = await SpiderManager.crawl_unit(game, data_type, spider)
+                await IconPlanner.execute()
+                await SpiderManager.finish_unit(game, data_type, spider, d)
+                queue.complete(unit, get_list_adapter(spider.model).dump_json(d))
+            except Exception as e:  # pylint: disable=W0703
+                traceback.print_exc()
+                queue.fail(unit, repr(e))
+            finally:
+                IconPlanner.reset()
+        if config.METRICS:
+            # 统一输出为 JSON，由协调者合并
+            Metrics.dump(queue.metrics / f"{worker}.json", "json")
+
+    @staticmethod
+    def print_plan(units: List[Tuple["Game", "DataType", "BaseSpider"]]):
+        """输出将要运行的爬取单元"""
+        for game, data_type, spider in units:
+            depends_on = f" <- {', '.join(spider.depends_on)}" if spider.depends_on else ""
+            print(
+                f"[dry-run] {game.value} {data_type.value} {spider.data_source} {spider.__class__.__name__}{depends_on}"
+            )
+
+    @staticmethod
+    def dump_metrics():
+        """输出本次运行的指标"""
+        if not config.METRICS:
+            return
+        for line in Metrics.summary():
+            print(f"爬虫耗时 {line}")
+        p = Metrics.dump(ASSETS_DATA_ROOT / "metrics", config.METRICS_FORMAT)
+        print(f"运行指标已保存至 {p}")
@@ -0,0 +1,242 @@
+import mmap
+import struct
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import ujson
+from pydantic import BaseModel
+
+from .file_manager import FileManager
+
+BUNDLE_MAGIC = b"GRB1"
+BUNDLE_VERSION = 1
+# magic, version, 保留, 记录数, 字符串表 offset/size, 记录区 offset, id 索引 offset, 名称索引 offset, 数据区 offset/size
+HEADER = struct.Struct("<4sHHIQQQQQQQ")
+# id / name / en_name 的字符串表 offset 与长度, rank, 数据 offset 与长度
+RECORD = struct.Struct("<IIIIIIIQI")
+INDEX_ENTRY = struct.Struct("<I")
+
+
+class _StringTable:
+    """去重后的 UTF-8 字符串表"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets: Dict[str, tuple] = {}
+
+    def add(self, value: str) -> tuple:
+        if value in self.offsets:
+            return self.offsets[value]
+        raw = value.encode("utf-8")
+        ref = (len(self.data), len(raw))
+        self.data += raw
+        self.offsets[value] = ref
+        return ref
+
+
+class BundleWriter:
+    """
+    二进制数据包
+
+    布局：文件头 | 字符串表 | 定长记录 | 按 id 排序的索引 | 按名称排序的索引 | 数据区；
+    每条记录的 id、名称、英文名、星级可以直接从定长记录读取，完整数据以紧凑 JSON 存放在数据区，
+    读取端通过 mmap 打开，多个进程共享同一份页缓存
+    """
+
+    @staticmethod
+    def build(items: List["BaseModel"]) -> bytes:
+        strings = _StringTable()
+        blob = bytearray()
+        records = []
+        for item in items:
+            doc = item.model_dump_json().encode("utf-8")
+            id_ref = strings.add(str(getattr(item, "id", "")))
+            name_ref = strings.add(str(getattr(item, "name", "")))
+            en_name_ref = strings.add(str(getattr(item, "en_name", "")))
+            rank = int(getattr(item, "rank", 0) or 0)
+            records.append((*id_ref, *name_ref, *en_name_ref, rank, len(blob), len(doc)))
+            blob += doc
+        count = len(records)
+        id_order = sorted(range(count), key=lambda i: strings.data[records[i][0] : records[i][0] + records[i][1]])
+        name_order = sorted(range(count), key=lambda i: strings.data[records[i][2] : records[i][2] + records[i][3]])
+
+        strings_offset = HEADER.size
+        records_offset = strings_offset + len(strings.data)
+        id_index_offset = records_offset + RECORD.size * count
+        name_index_offset = id_index_offset + INDEX_ENTRY.size * count
+        blob_offset = name_index_offset + INDEX_ENTRY.size * count
+
+        out = bytearray(
+            HEADER.pack(
+                BUNDLE_MAGIC,
+                BUNDLE_VERSION,
+                0,
+                count,
+                strings_offset,
+                len(strings.data),
+                records_offset,
+                id_index_offset,
+                name_index_offset,
+                blob_offset,
+                len(blob),
+            )
+        )
+        out += strings.data
+        for record in records:
+            out += RECORD.pack(*record)
+        for i in id_order:
+            out += INDEX_ENTRY.pack(i)
+        for i in name_order:
+            out += INDEX_ENTRY.pack(i)
+        out += blob
+        return bytes(out)
+
+    @staticmethod
+    def get_bundle_path(json_path: "Path") -> "Path":
+        """character.json -> character.bin"""
+        return json_path.with_suffix(".bin")
+
+    @staticmethod
+    async def save(json_path: "Path", items: List["BaseModel"]) -> "Path":
+        """在 json 数据旁写入同名数据包；替换而不是原地写入，已经映射旧文件的进程不受影响"""
+        path = BundleWriter.get_bundle_path(json_path)
+        await FileManager.save_file(path, BundleWriter.build(items))
+        return path
+
+
+class BundleReader:
+    """
+    以 mmap 只读打开数据包
+
+    打开时只解析文件头，按 id / 名称查找为索引上的二分查找，数据在访问时才解码
+    """
+
+    def __init__(self, path: "Path"):
+        self.path = path
+        with open(path, "rb") as file:
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = HEADER.unpack_from(self._mm, 0)
+        if header[0] != BUNDLE_MAGIC or header[1] != BUNDLE_VERSION:
+            self._mm.close()
+            raise ValueError(f"not a data bundle: {path}")
+        (
+            _,
+            _,
+            _,
+            self.count,
+            self._strings_offset,
+            _,
+            self._records_offset,
+            self._id_index_offset,
+            self._name_index_offset,
+            self._blob_offset,
+            _,
+        ) = header
+
+    def close(self):
+        self._mm.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _record(self, index: int) -> tuple:
+        return RECORD.unpack_from(self._mm, self._records_offset + RECORD.size * index)
+
+    def _raw_string(self, offset: int, length: int) -> bytes:
+        start = self._strings_offset + offset
+        return self._mm[start : start + length]
+
+    def get_id(self, index: int) -> str:
+        record = self._record(index)
+        return self._raw_string(record[0], record[1]).decode("utf-8")
+
+    def get_name(self, index: int) -> str:
+        record = self._record(index)
+        return self._raw_string(record[2], record[3]).decode("utf-8")
+
+    def get_document(self, index: int) -> Dict[str, Any]:
+        record = self._record(index)
+        start = self._blob_offset + record[7]
+        return ujson.loads(self._mm[start : start + record[8]])
+
+    def _search(self, index_offset: int, field: int, value: str) -> Optional[int]:
+        target = value.encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            index = INDEX_ENTRY.unpack_from(self._mm, index_offset + INDEX_ENTRY.size * mid)[0]
+            record = self._record(index)
+            key = self._raw_string(record[field], record[field + 1])
+            if key < target:
+                low = mid + 1
+            elif key > target:
+                high = mid
+            else:
+                return index
+        return None
+
+    def find_by_id(self, value: str) -> Optional[int]:
+        return self._search(self._id_index_offset, 0, value)
+
+    def find_by_name(self, value: str) -> Optional[int]:
+        return self._search(self._name_index_offset, 2, value)
+
+    def iter_ids(self) -> Iterator[str]:
+        for i in range(self.count):
+            yield self.get_id(i)
+
+    def iter_names(self) -> Iterator[str]:
+        for i in range(self.count):
+            yield self.get_name(i)
+
+
+class BundleItems(Sequence):
+    """按记录顺序访问数据包，解码结果缓存"""
+
+    def __init__(self, reader: "BundleReader", decode: Callable[[Dict[str, Any]], Any]):
+        self.reader = reader
+        self.decode = decode
+        self._cache: Dict[int, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.reader)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        if index not in self._cache:
+            self._cache[index] = self.decode(self.reader.get_document(index))
+        return self._cache[index]
+
+
+class BundleMapping(Mapping):
+    """按 id 或名称访问数据包"""
+
+    def __init__(self, items: "BundleItems", by_name: bool = False):
+        self.items = items
+        self.by_name = by_name
+
+    def _find(self, key: Any) -> Optional[int]:
+        reader = self.items.reader
+        return reader.find_by_name(str(key)) if self.by_name else reader.find_by_id(str(key))
+
+    def __getitem__(self, key: Any) -> Any:
+        index = self._find(key)
+        if index is None:
+            raise KeyError(key)
+        return self.items[index]
+
+    def __contains__(self, key: Any) -> bool:
+        return self._find(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        reader = self.items.reader
+        return reader.iter_names() if self.by_name else reader.iter_ids()
+
+    def __len__(self) -> int:
+        return len(self.items)
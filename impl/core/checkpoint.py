@@ -0,0 +1,102 @@
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Any, Optional
+
+import aiofiles
+import ujson
+
+from .disk_writer import DiskWriter
+from .file_manager import FileManager
+from ..assets_utils.path import ASSETS_DATA_ROOT
+from ..config import config
+
+if TYPE_CHECKING:
+    from ..models.enums import Game, DataType
+
+CHECKPOINT_ROOT = ASSETS_DATA_ROOT / "checkpoint"
+
+
+class CheckpointStore:
+    """
+    爬取检查点
+
+    每个 (game, data_type, spider) 单元完成后保存其输出，
+    单元内每完成一条数据追加一行到 .items.jsonl，
+    中途失败后以 RESUME 模式重新运行时跳过已完成的单元和数据
+    """
+
+    @staticmethod
+    def get_unit_path(game: "Game", data_type: "DataType", spider: str, suffix: str = ".json") -> "Path":
+        p = CHECKPOINT_ROOT / game.value / data_type.value / f"{spider}{suffix}"
+        p.parent.mkdir(parents=True, exist_ok=True)
+        return p
+
+    @staticmethod
+    def is_done(game: "Game", data_type: "DataType", spider: str) -> bool:
+        """单元是否已经完成，仅在 RESUME 模式下生效"""
+        if not config.RESUME:
+            return False
+        file_path = CheckpointStore.get_unit_path(game, data_type, spider)
+        return DiskWriter.is_pending(file_path) or file_path.exists()
+
+    @staticmethod
+    async def save_output(game: "Game", data_type: "DataType", spider: str, content: bytes):
+        """保存单元输出（已序列化的 JSON），输出落盘后再删除该单元的逐条检查点"""
+        file_path = CheckpointStore.get_unit_path(game, data_type, spider)
+        await FileManager.save_file(file_path, content)
+        if not await DiskWriter.wait_for(file_path):
+            # 写入失败，保留逐条检查点供下次恢复
+            return
+        CheckpointStore.get_unit_path(game, data_type, spider, ".items.jsonl").unlink(missing_ok=True)
+
+    @staticmethod
+    async def load_output(game: "Game", data_type: "DataType", spider: str) -> Optional[bytes]:
+        file_path = CheckpointStore.get_unit_path(game, data_type, spider)
+        await DiskWriter.wait_for(file_path)
+        if not file_path.exists():
+            return None
+        return await FileManager.load_file(file_path)
+
+    @staticmethod
+    async def save_icons(game: "Game", data_type: "DataType", spider: str, intents: List[Dict[str, Any]]):
+        """保存单元登记的图标下载意图，恢复单元时重新登记"""
+        file_path = CheckpointStore.get_unit_path(game, data_type, spider, ".icons.json")
+        await FileManager.save_file(file_path, ujson.dumps(intents, ensure_ascii=False).encode("utf-8"))
+
+    @staticmethod
+    async def load_icons(game: "Game", data_type: "DataType", spider: str) -> List[Dict[str, Any]]:
+        file_path = CheckpointStore.get_unit_path(game, data_type, spider, ".icons.json")
+        if not file_path.exists():
+            return []
+        return await FileManager.decode_json(await FileManager.load_file(file_path))
+
+    @staticmethod
+    async def save_item(game: "Game", data_type: "DataType", spider: str, key: str, data: Dict[str, Any]):
+        """追加一条已完成的数据，与单元输出经过同一个写线程，顺序不会颠倒"""
+        file_path = CheckpointStore.get_unit_path(game, data_type, spider, ".items.jsonl")
+        line = ujson.dumps({"key": key, "data": data}, ensure_ascii=False) + "\n"
+        await FileManager.append_file(file_path, line.encode("utf-8"))
+
+    @staticmethod
+    async def load_items(game: "Game", data_type: "DataType", spider: str) -> Dict[str, Dict[str, Any]]:
+        """加载已完成的数据，仅在 RESUME 模式下生效；最后一行可能因中断而不完整，直接忽略"""
+        if not config.RESUME:
+            return {}
+        file_path = CheckpointStore.get_unit_path(game, data_type, spider, ".items.jsonl")
+        await DiskWriter.wait_for(file_path)
+        if not file_path.exists():
+            return {}
+        items = {}
+        async with aiofiles.open(file_path, "r", encoding="utf-8") as file:
+            async for line in file:
+                try:
+                    item = ujson.loads(line)
+                except ValueError:
+                    continue
+                items[item["key"]] = item["data"]
+        return items
+
+    @staticmethod
+    def clear():
+        """清除所有检查点"""
+        shutil.rmtree(CHECKPOINT_ROOT, ignore_errors=True)
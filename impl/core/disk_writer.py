@@ -0,0 +1,187 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from .metrics import Metrics
+from ..config import config
+
+
+class DiskWriter:
+    """
+    后台写盘
+
+    save_file 把内容放入有界队列后立即返回，由 WRITE_THREADS 个写线程写入磁盘，队列满时才等待；
+    同一目录的文件由同一个线程按提交顺序写入，例如先输出后指纹、先逐条追加后整体输出的顺序不会被打乱；已创建的目录只创建一次；
+    读取尚未落盘的文件前等待其写入完成，flush 等待所有写入完成并按 WRITE_FSYNC 同步到磁盘
+    """
+
+    _loop: Optional["asyncio.AbstractEventLoop"] = None
+    _queues: List["queue.SimpleQueue"] = []
+    _threads: List["threading.Thread"] = []
+    _slots: Optional["asyncio.Semaphore"] = None
+    _pending: Dict["Path", "asyncio.Future"] = {}
+    """路径 -> 最后一次提交的写入"""
+    _dirs: Set["Path"] = set()
+    """已经创建的目录"""
+    _unsynced: List["Path"] = []
+    """WRITE_FSYNC 为 batch 时，上一次 flush 之后写入的文件"""
+    _errors: List[Tuple["Path", Exception]] = []
+
+    @staticmethod
+    def ensure_dir(path: "Path"):
+        """创建目录，同一目录只创建一次"""
+        if path not in DiskWriter._dirs:
+            path.mkdir(parents=True, exist_ok=True)
+            DiskWriter._dirs.add(path)
+
+    @staticmethod
+    def _start():
+        loop = asyncio.get_running_loop()
+        if DiskWriter._loop is loop:
+            return
+        DiskWriter.stop()
+        DiskWriter._loop = loop
+        DiskWriter._slots = asyncio.Semaphore(config.WRITE_QUEUE_SIZE)
+        DiskWriter._queues = [queue.SimpleQueue() for _ in range(max(config.WRITE_THREADS, 1))]
+        DiskWriter._threads = [
+            threading.Thread(target=DiskWriter._run, args=(q, loop), name=f"disk-writer-{i}", daemon=True)
+            for i, q in enumerate(DiskWriter._queues)
+        ]
+        for thread in DiskWriter._threads:
+            thread.start()
+
+    @staticmethod
+    def stop():
+        """停止写线程，调用前应先 flush"""
+        for q in DiskWriter._queues:
+            q.put(None)
+        for thread in DiskWriter._threads:
+            thread.join()
+        DiskWriter._loop = None
+        DiskWriter._queues = []
+        DiskWriter._threads = []
+        DiskWriter._pending = {}
+
+    @staticmethod
+    def _write_file(path: "Path", content: bytes):
+        DiskWriter.ensure_dir(path.parent)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            file = open(tmp_path, "wb")  # pylint: disable=R1732
+        except FileNotFoundError:
+            # 目录在创建之后被删除，例如清除检查点
+            DiskWriter._dirs.discard(path.parent)
+            DiskWriter.ensure_dir(path.parent)
+            file = open(tmp_path, "wb")  # pylint: disable=R1732
+        with file:
+            file.write(content)
+            if config.WRITE_FSYNC == "always":
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+        if config.WRITE_FSYNC == "batch":
+            DiskWriter._unsynced.append(path)
+
+    @staticmethod
+    def _append_file(path: "Path", content: bytes):
+        DiskWriter.ensure_dir(path.parent)
+        with open(path, "ab") as file:
+            file.write(content)
+            if config.WRITE_FSYNC == "always":
+                file.flush()
+                os.fsync(file.fileno())
+        if config.WRITE_FSYNC == "batch":
+            DiskWriter._unsynced.append(path)
+
+    @staticmethod
+    def _run(q: "queue.SimpleQueue", loop: "asyncio.AbstractEventLoop"):
+        while True:
+            job = q.get()
+            if job is None:
+                return
+            path, content, future, append = job
+            error = None
+            start = time.perf_counter()
+            try:
+                if append:
+                    DiskWriter._append_file(path, content)
+                else:
+                    DiskWriter._write_file(path, content)
+            except Exception as e:  # pylint: disable=W0703
+                error = e
+            duration = time.perf_counter() - start
+            loop.call_soon_threadsafe(DiskWriter._done, path, future, error, len(content), duration)
+
+    @staticmethod
+    def _done(path: "Path", future: "asyncio.Future", error: Optional[Exception], size: int, duration: float):
+        DiskWriter._slots.release()
+        if DiskWriter._pending.get(path) is future:
+            del DiskWriter._pending[path]
+        Metrics.observe("file_write_duration_seconds", duration)
+        if error is None:
+            Metrics.inc("file_write_bytes_total", size)
+        else:
+            Metrics.inc("file_write_failures_total")
+            DiskWriter._errors.append((path, error))
+        future.set_result(error is None)
+
+    @staticmethod
+    async def write(path: "Path", content: bytes, append: bool = False):
+        """提交写入，队列未满时立即返回；append 为 True 时追加到文件末尾而不是替换"""
+        DiskWriter._start()
+        await DiskWriter._slots.acquire()
+        future = DiskWriter._loop.create_future()
+        DiskWriter._pending[path] = future
+        q = DiskWriter._queues[hash(path.parent) % len(DiskWriter._queues)]
+        q.put((path, content, future, append))
+
+    @staticmethod
+    def is_pending(path: "Path") -> bool:
+        """文件是否已提交但尚未落盘"""
+        return path in DiskWriter._pending
+
+    @staticmethod
+    async def wait_for(path: "Path") -> bool:
+        """
+        等待该路径已提交的写入完成
+        :return: 最后一次提交的写入是否成功，没有等待中的写入时为 True
+        """
+        future = DiskWriter._pending.get(path)
+        if future is None:
+            return True
+        return await asyncio.shield(future)
+
+    @staticmethod
+    def _sync(paths: List["Path"]):
+        for path in paths:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    @staticmethod
+    async def flush() -> List["Path"]:
+        """
+        等待所有已提交的写入完成
+        :return: 写入失败的路径
+        """
+        if DiskWriter._loop is not asyncio.get_running_loop():
+            return []
+        if DiskWriter._pending:
+            await asyncio.gather(*[asyncio.shield(i) for i in DiskWriter._pending.values()])
+        if DiskWriter._unsynced:
+            paths, DiskWriter._unsynced = DiskWriter._unsynced, []
+            with Metrics.timer("file_fsync_duration_seconds"):
+                await asyncio.get_running_loop().run_in_executor(None, DiskWriter._sync, paths)
+        errors, DiskWriter._errors = DiskWriter._errors, []
+        for path, error in errors:
+            print(f"写入文件失败：{path} {error}")
+        return [path for path, _ in errors]
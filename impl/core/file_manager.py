@@ -1,41 +1,107 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
 import aiofiles
+import aiofiles.os
 import ujson
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Optional
 from pathlib import Path
 from httpx import URL
 
+from .disk_writer import DiskWriter
+from .metrics import Metrics
 from ..assets_utils.path import ASSETS_ROOT, ASSETS_DATA_RAW_ROOT
+from ..config import config
 
 if TYPE_CHECKING:
     from ..models.enums import Game, DataType
 
 
 class FileManager:
+    _decode_executor: Optional["Executor"] = None
+
+    @staticmethod
+    def get_decode_executor() -> "Executor":
+        """解析大 JSON 的执行器，首次使用时按 JSON_DECODE_EXECUTOR 创建"""
+        if FileManager._decode_executor is None:
+            if config.JSON_DECODE_EXECUTOR == "process":
+                FileManager._decode_executor = ProcessPoolExecutor(max_workers=config.JSON_DECODE_WORKERS)
+            else:
+                FileManager._decode_executor = ThreadPoolExecutor(
+                    max_workers=config.JSON_DECODE_WORKERS, thread_name_prefix="json-decode"
+                )
+        return FileManager._decode_executor
+
+    @staticmethod
+    def shutdown_decode_executor():
+        if FileManager._decode_executor is not None:
+            FileManager._decode_executor.shutdown()
+            FileManager._decode_executor = None
+
+    @staticmethod
+    async def decode_json(content: bytes) -> Any:
+        """
+        解析 JSON，超过 JSON_OFFLOAD_THRESHOLD 字节时交给执行器，解析期间事件循环仍可处理其他请求
+        """
+        if len(content) < config.JSON_OFFLOAD_THRESHOLD:
+            return ujson.loads(content)
+        loop = asyncio.get_running_loop()
+        with Metrics.timer("json_decode_offload_duration_seconds"):
+            data = await loop.run_in_executor(FileManager.get_decode_executor(), ujson.loads, content)
+        Metrics.inc("json_decode_offload_bytes_total", len(content))
+        return data
+
     @staticmethod
     async def save_file(file_path: "Path", file_content: bytes):
-        """保存文件"""
-        async with aiofiles.open(file_path, "wb") as file:
-            await file.write(file_content)
+        """
+        保存文件，先写临时文件再替换，中断时不会留下不完整的文件；临时文件按进程区分，多个工作进程可以写同一路径
+        WRITE_BEHIND 开启时交给后台写线程，返回时文件可能尚未落盘，需要时调用 DiskWriter.flush
+        """
+        if config.WRITE_BEHIND:
+            await DiskWriter.write(file_path, file_content)
+            return
+        DiskWriter.ensure_dir(file_path.parent)
+        tmp_path = file_path.with_name(f"{file_path.name}.{os.getpid()}.tmp")
+        with Metrics.timer("file_write_duration_seconds"):
+            async with aiofiles.open(tmp_path, "wb") as file:
+                await file.write(file_content)
+            await aiofiles.os.replace(tmp_path, file_path)
+        Metrics.inc("file_write_bytes_total", len(file_content))
+
+    @staticmethod
+    async def append_file(file_path: "Path", file_content: bytes):
+        """
+        追加到文件末尾，WRITE_BEHIND 开启时与同一目录的其他写入按提交顺序执行
+        """
+        if config.WRITE_BEHIND:
+            await DiskWriter.write(file_path, file_content, append=True)
+            return
+        DiskWriter.ensure_dir(file_path.parent)
+        with Metrics.timer("file_write_duration_seconds"):
+            async with aiofiles.open(file_path, "ab") as file:
+                await file.write(file_content)
+        Metrics.inc("file_write_bytes_total", len(file_content))
 
     @staticmethod
     async def load_file(file_path: "Path") -> bytes:
-        """加载文件"""
-        async with aiofiles.open(file_path, "rb") as file:
-            content = await file.read()
+        """加载文件，文件尚在写入队列中时先等待写入完成"""
+        await DiskWriter.wait_for(file_path)
+        with Metrics.timer("file_read_duration_seconds"):
+            async with aiofiles.open(file_path, "rb") as file:
+                content = await file.read()
+        Metrics.inc("file_read_bytes_total", len(content))
         return content
 
     @staticmethod
     async def save_json(file_path: "Path", data: dict):
         """保存JSON文件"""
-        async with aiofiles.open(file_path, "w", encoding="utf-8") as file:
-            await file.write(ujson.dumps(data, ensure_ascii=False, indent=4))
+        await FileManager.save_file(file_path, ujson.dumps(data, ensure_ascii=False, indent=4).encode("utf-8"))
 
     @staticmethod
     async def load_json(file_path: "Path") -> dict:
-        """加载JSON文件"""
-        async with aiofiles.open(file_path, "r", encoding="utf-8") as file:
-            content = await file.read()
-        return ujson.loads(content)
+        """加载JSON文件，大文件不在事件循环中解析"""
+        return await FileManager.decode_json(await FileManager.load_file(file_path))
 
     @staticmethod
     def sync_load_json(file_path: "Path") -> dict:
@@ -56,7 +122,7 @@ class FileManager:
             p = ASSETS_DATA_RAW_ROOT / game.value / data_type.value / f"{data_source}.{file_type}"
         else:
             p = ASSETS_DATA_RAW_ROOT / game.value / f"{data_type.value}.{file_type}"
-        p.parent.mkdir(parents=True, exist_ok=True)
+        DiskWriter.ensure_dir(p.parent)
         return p
 
     @staticmethod
@@ -90,7 +156,7 @@ class FileManager:
     def get_raw_icon_path(url: str, game: "Game", data_type: "DataType", data_source: str):
         data_source = data_source.lower()
         p = ASSETS_DATA_RAW_ROOT / game.value / data_type.value / data_source
-        p.mkdir(parents=True, exist_ok=True)
+        DiskWriter.ensure_dir(p)
         u = URL(url)
         return p / u.path.split("/")[-1]
 
@@ -98,7 +164,9 @@ class FileManager:
     def has_raw_icon(url: str, game: "Game", data_type: "DataType", data_source: str):
         """检查原始数据文件是否存在"""
         file_path = FileManager.get_raw_icon_path(url, game, data_type, data_source)
-        return file_path.exists(), file_path.relative_to(ASSETS_ROOT)
+        exists = DiskWriter.is_pending(file_path) or file_path.exists()
+        Metrics.inc("file_cache_lookups_total", hit=exists)
+        return exists, file_path.relative_to(ASSETS_ROOT)
 
     @staticmethod
     async def save_raw_icon(url: str, game: "Game", data_type: "DataType", data_source: str, data):
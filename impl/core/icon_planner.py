@@ -0,0 +1,212 @@
+import asyncio
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Set
+
+from httpx import URL
+from pydantic import BaseModel
+
+from .disk_writer import DiskWriter
+from .file_manager import FileManager
+from .metrics import Metrics
+from .retry import RequestError
+from .source_cache import NegativeCache
+from ..config import config
+from ..models.base import IconAsset, IconAssetUrl
+
+
+class IconIntent:
+    """一次图标下载意图"""
+
+    def __init__(
+        self, url: str, path: "Path", relative_path: str, priority: int, optional: bool, spider: str, source: str
+    ):
+        self.url = url
+        self.path = path
+        """保存的绝对路径"""
+        self.relative_path = relative_path
+        """写入数据中的相对路径"""
+        self.priority = priority
+        """越小越先下载"""
+        self.optional = optional
+        """下载失败不影响数据源指纹与数据项指纹"""
+        self.spider = spider
+        self.source = source
+        """数据源，用于不存在链接的缓存"""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"url": self.url, "priority": self.priority, "optional": self.optional}
+
+
+class IconPlanner:
+    """
+    全局图标下载计划
+
+    解析阶段爬虫只登记下载意图并得到确定的保存路径，全部爬虫完成后统一下载：
+    同一链接只下载一次并写入所有目标路径，按域名分组，每个域名的并发受 ICON_HOST_CONCURRENCY 限制，
+    总并发受 ICON_CONCURRENCY 限制；下载失败的路径记录在 failed_paths 中，随后从输出中移除对应的图标；
+    返回 404 的链接记入 NegativeCache，有效期内不再请求，对应的图标同样移除
+    """
+
+    intents: Dict[str, List["IconIntent"]] = {}
+    """链接 -> 下载意图"""
+    failed_paths: Set[str] = set()
+    """下载失败的相对路径"""
+    failed_spiders: Set[str] = set()
+    """存在非可选图标下载失败的爬虫"""
+    missing_spiders: Set[str] = set()
+    """存在图标不存在（404）的爬虫"""
+
+    @staticmethod
+    def register(
+        url: str,
+        path: "Path",
+        relative_path: str,
+        priority: int,
+        optional: bool = False,
+        spider: str = "",
+        source: str = "",
+    ) -> str:
+        """
+        登记下载意图
+        :return: 图标的相对路径
+        """
+        intent = IconIntent(url, path, relative_path, priority, optional, spider, source)
+        IconPlanner.intents.setdefault(url, []).append(intent)
+        Metrics.inc("icon_intents_total", spider=spider)
+        return relative_path
+
+    @staticmethod
+    def get_intents(spider: str) -> List[Dict[str, Any]]:
+        """爬虫登记的下载意图，用于保存检查点"""
+        return [i.to_dict() for intents in IconPlanner.intents.values() for i in intents if i.spider == spider]
+
+    @staticmethod
+    def reset():
+        IconPlanner.intents.clear()
+        IconPlanner.failed_paths.clear()
+        IconPlanner.failed_spiders.clear()
+        IconPlanner.missing_spiders.clear()
+
+    @staticmethod
+    def _mark_failed(url: str, error: Exception, spider: str, intents: Iterable["IconIntent"]):
+        Metrics.inc("icon_download_failures_total", spider=spider)
+        print(f"下载图片失败：{url} {error}")
+        for i in intents:
+            IconPlanner.failed_paths.add(i.relative_path)
+            if not i.optional:
+                IconPlanner.failed_spiders.add(i.spider)
+
+    @staticmethod
+    def _mark_missing(intents: Iterable["IconIntent"]):
+        """图标不存在，从输出中移除，但不视为下载失败"""
+        for i in intents:
+            IconPlanner.failed_paths.add(i.relative_path)
+            IconPlanner.missing_spiders.add(i.spider)
+
+    @staticmethod
+    async def _download(url: str, intents: List["IconIntent"]):
+        # 避免循环导入
+        from ._abstract_spider import RequestClient
+
+        paths = {i.path: i for i in intents if not DiskWriter.is_pending(i.path) and not i.path.exists()}
+        if not paths:
+            return
+        first = min(intents, key=lambda i: i.priority)
+        spider, source = first.spider, first.source
+        if NegativeCache.is_missing(source, url):
+            Metrics.inc("icon_negative_cache_hits_total", spider=spider)
+            IconPlanner._mark_missing(paths.values())
+            return
+        try:
+            with Metrics.spider_context(spider), Metrics.timer("icon_download_duration_seconds", spider=spider):
+                # 同一链接只登记一次下载，不需要经过请求缓存
+                response = await RequestClient.request("GET", url, cache=False)
+        except RequestError as e:
+            if e.status_code != 404:
+                IconPlanner._mark_failed(url, e, spider, paths.values())
+                return
+            NegativeCache.add(source, url, spider)
+            print(f"图片不存在：{url}")
+            IconPlanner._mark_missing(paths.values())
+            return
+        except Exception as e:  # pylint: disable=W0703
+            IconPlanner._mark_failed(url, e, spider, paths.values())
+            return
+        NegativeCache.remove(source, url)
+        Metrics.inc("icon_downloads_total", spider=spider)
+        for path in paths:
+            await FileManager.save_file(path, response.content)
+
+    @staticmethod
+    async def execute() -> Set[str]:
+        """
+        执行所有下载意图
+        :return: 下载失败的相对路径
+        """
+        hosts: Dict[str, List[str]] = {}
+        for url in IconPlanner.intents:
+            hosts.setdefault(URL(url).host, []).append(url)
+        semaphore = asyncio.Semaphore(config.ICON_CONCURRENCY)
+
+        async def worker(queue: Deque[str]):
+            while queue:
+                url = queue.popleft()
+                async with semaphore:
+                    await IconPlanner._download(url, IconPlanner.intents[url])
+
+        workers = []
+        for urls in hosts.values():
+            urls.sort(key=lambda u: min(i.priority for i in IconPlanner.intents[u]))
+            queue = deque(urls)
+            workers.extend(worker(queue) for _ in range(min(config.ICON_HOST_CONCURRENCY, len(urls))))
+        if workers:
+            print(f"下载图标 {len(IconPlanner.intents)} 个，域名 {len(hosts)} 个")
+            await asyncio.gather(*workers)
+        await NegativeCache.save()
+        IconPlanner.intents.clear()
+        return IconPlanner.failed_paths
+
+    @staticmethod
+    def prune(data: Any) -> bool:
+        """
+        移除数据中下载失败的图标，全部格式都失败时整个图标置空
+        :param data: 模型、序列化后的 dict 或它们的列表
+        :return: 是否有图标被移除
+        """
+        failed = IconPlanner.failed_paths
+        if not failed:
+            return False
+        pruned = False
+        if isinstance(data, BaseModel):
+            for key in type(data).model_fields:
+                value = getattr(data, key)
+                if isinstance(value, IconAssetUrl):
+                    if value.path in failed:
+                        setattr(data, key, None)
+                        pruned = True
+                    continue
+                if not isinstance(value, (BaseModel, list)) or not IconPlanner.prune(value):
+                    continue
+                pruned = True
+                if isinstance(value, IconAsset) and not (value.jpg or value.webp or value.png):
+                    setattr(data, key, None)
+            return pruned
+        if isinstance(data, list):
+            for i in data:
+                pruned = IconPlanner.prune(i) or pruned
+            return pruned
+        if not isinstance(data, dict):
+            return False
+        for key, value in data.items():
+            if isinstance(value, dict) and value.keys() == {"url", "path"}:
+                if value["path"] in failed:
+                    data[key] = None
+                    pruned = True
+                continue
+            if not isinstance(value, (dict, list)) or not IconPlanner.prune(value):
+                continue
+            pruned = True
+            if isinstance(value, dict) and value.keys() <= {"jpg", "webp", "png"} and not any(value.values()):
+                data[key] = None
+        return pruned
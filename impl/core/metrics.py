@@ -0,0 +1,192 @@
+import contextlib
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Tuple, List, Any, Iterator
+
+import ujson
+
+LabelsKey = Tuple[Tuple[str, str], ...]
+
+# 直方图默认分桶，单位秒
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+current_spider: ContextVar[str] = ContextVar("current_spider", default="-")
+"""当前正在运行的爬虫名称，用于把请求归属到爬虫"""
+
+
+class Histogram:
+    """累计分桶直方图"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[index] += 1
+
+    def merge(self, data: Dict[str, Any]):
+        """合并 to_dict 输出的另一个直方图，分桶需要一致"""
+        if data["count"] == 0:
+            return
+        self.count += data["count"]
+        self.sum += data["sum"]
+        self.min = data["min"] if self.min is None else min(self.min, data["min"])
+        self.max = data["max"] if self.max is None else max(self.max, data["max"])
+        for index, bound in enumerate(self.buckets):
+            self.bucket_counts[index] += data["buckets"].get(str(bound), 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "avg": round(self.sum / self.count, 6) if self.count else 0,
+            "min": self.min,
+            "max": self.max,
+            "buckets": dict(zip([str(i) for i in self.buckets], self.bucket_counts)),
+        }
+
+
+class Metrics:
+    """
+    运行指标
+
+    按 指标名 + 标签 记录计数器与直方图，运行结束后输出为 JSON 或 Prometheus 文本格式
+    """
+
+    counters: Dict[str, Dict[LabelsKey, float]] = {}
+    histograms: Dict[str, Dict[LabelsKey, Histogram]] = {}
+
+    @staticmethod
+    def _labels_key(labels: Dict[str, Any]) -> LabelsKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    @staticmethod
+    def inc(name: str, value: float = 1, **labels):
+        """计数器增加"""
+        key = Metrics._labels_key(labels)
+        counter = Metrics.counters.setdefault(name, {})
+        counter[key] = counter.get(key, 0) + value
+
+    @staticmethod
+    def observe(name: str, value: float, **labels):
+        """直方图记录一次观测值"""
+        key = Metrics._labels_key(labels)
+        histogram = Metrics.histograms.setdefault(name, {})
+        if key not in histogram:
+            histogram[key] = Histogram()
+        histogram[key].observe(value)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def timer(name: str, **labels) -> Iterator[None]:
+        """记录代码块耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            Metrics.observe(name, time.perf_counter() - start, **labels)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def spider_context(name: str) -> Iterator[None]:
+        """在代码块内把请求归属到指定爬虫"""
+        token = current_spider.set(name)
+        try:
+            yield
+        finally:
+            current_spider.reset(token)
+
+    @staticmethod
+    def reset():
+        Metrics.counters.clear()
+        Metrics.histograms.clear()
+
+    @staticmethod
+    def to_json() -> Dict[str, Any]:
+        def labels_dict(key: LabelsKey) -> Dict[str, str]:
+            return dict(key)
+
+        return {
+            "counters": {
+                name: [{"labels": labels_dict(k), "value": v} for k, v in values.items()]
+                for name, values in Metrics.counters.items()
+            },
+            "histograms": {
+                name: [{"labels": labels_dict(k), **v.to_dict()} for k, v in values.items()]
+                for name, values in Metrics.histograms.items()
+            },
+        }
+
+    @staticmethod
+    def merge(data: Dict[str, Any]):
+        """合并 to_json 输出的指标，例如工作进程的指标"""
+        for name, values in data.get("counters", {}).items():
+            for i in values:
+                Metrics.inc(name, i["value"], **i["labels"])
+        for name, values in data.get("histograms", {}).items():
+            histogram = Metrics.histograms.setdefault(name, {})
+            for i in values:
+                key = Metrics._labels_key(i["labels"])
+                if key not in histogram:
+                    histogram[key] = Histogram()
+                histogram[key].merge(i)
+
+    @staticmethod
+    def to_prometheus() -> str:
+        def fmt_labels(key: LabelsKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = key + extra
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        lines: List[str] = []
+        for name, values in Metrics.counters.items():
+            lines.append(f"# TYPE {name} counter")
+            for key, value in values.items():
+                lines.append(f"{name}{fmt_labels(key)} {value}")
+        for name, values in Metrics.histograms.items():
+            lines.append(f"# TYPE {name} histogram")
+            for key, h in values.items():
+                for bound, count in zip(h.buckets, h.bucket_counts):
+                    lines.append(f"{name}_bucket{fmt_labels(key, (('le', str(bound)),))} {count}")
+                lines.append(f"{name}_bucket{fmt_labels(key, (('le', '+Inf'),))} {h.count}")
+                lines.append(f"{name}_sum{fmt_labels(key)} {h.sum}")
+                lines.append(f"{name}_count{fmt_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def dump(file_path: "Path", fmt: str = "json") -> "Path":
+        """
+        输出指标
+        :param file_path: 输出路径，不含扩展名
+        :param fmt: json 或 prometheus
+        :return:
+        """
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        if fmt == "prometheus":
+            file_path = file_path.with_suffix(".prom")
+            content = Metrics.to_prometheus()
+        else:
+            file_path = file_path.with_suffix(".json")
+            content = ujson.dumps(Metrics.to_json(), ensure_ascii=False, indent=4)
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return file_path
+
+    @staticmethod
+    def summary(name: str = "spider_crawl_duration_seconds", label: str = "spider", top: int = 10) -> List[str]:
+        """按耗时排序的摘要"""
+        values = Metrics.histograms.get(name, {})
+        rows = sorted(((dict(k).get(label, "-"), h.sum) for k, h in values.items()), key=lambda x: -x[1])
+        return [f"{n}: {s:.2f}s" for n, s in rows[:top]]
@@ -0,0 +1,359 @@
+import hashlib
+import os
+import shutil
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any
+
+import ujson
+
+from ..assets_utils.path import ASSETS_DATA_ROOT, ASSETS_DATA_RAW_ROOT, ASSETS_DATA_ARCHIVE_ROOT
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+FULL_ARCHIVE_NAME = "genshin.zip"
+# 固定归档内的文件时间，保证内容不变时归档字节也不变
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class Publisher:
+    """
+    发布工具
+
+    为 data/raw 下的每个文件计算内容哈希并写入清单，
+    按 游戏/数据类型 将文件划分为归档分片，仅重建内容有变化的分片，
+    最后与本地模拟的存储桶目录同步并校验
+    """
+
+    @staticmethod
+    def hash_file(file_path: "Path") -> str:
+        """计算文件的 sha256"""
+        h = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            while chunk := file.read(HASH_CHUNK_SIZE):
+                h.update(chunk)
+        return h.hexdigest()
+
+    @staticmethod
+    def get_shard_key(rel_path: str) -> str:
+        """
+        获取文件所属的分片
+        genshin/character/ambr/xxx.png -> genshin/character
+        genshin/character.json -> genshin/_index
+        :param rel_path: 相对 data/raw 的路径
+        :return:
+        """
+        parts = rel_path.split("/")
+        if len(parts) > 2:
+            return "/".join(parts[:2])
+        if len(parts) == 2:
+            return f"{parts[0]}/_index"
+        return "_index"
+
+    @staticmethod
+    def get_shard_archive_path(shard_key: str) -> "Path":
+        return ASSETS_DATA_ARCHIVE_ROOT / f"{shard_key}.zip"
+
+    @staticmethod
+    def list_files(root: "Path") -> List[str]:
+        """列出需要发布的文件，忽略清单与全量归档本身"""
+        files = []
+        for p in root.rglob("*"):
+            if not p.is_file():
+                continue
+            rel_path = p.relative_to(root).as_posix()
+            if rel_path in (MANIFEST_NAME, FULL_ARCHIVE_NAME):
+                continue
+            files.append(rel_path)
+        files.sort()
+        return files
+
+    @staticmethod
+    def load_manifest(file_path: "Path") -> Dict[str, Any]:
+        if not file_path.exists():
+            return {"version": MANIFEST_VERSION, "files": {}, "shards": {}}
+        with open(file_path, "r", encoding="utf-8") as file:
+            return ujson.loads(file.read())
+
+    @staticmethod
+    def save_manifest(file_path: "Path", manifest: Dict[str, Any]):
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = file_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(ujson.dumps(manifest, ensure_ascii=False, indent=4, sort_keys=True))
+        os.replace(tmp_path, file_path)
+
+    @staticmethod
+    def build_manifest(
+        root: "Path",
+        old_manifest: Optional[Dict[str, Any]] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        计算所有文件的哈希并生成清单
+        大小与修改时间均未变化、或解压全量归档后未被改写的文件直接复用上一次的哈希
+        :param root: 数据目录
+        :param old_manifest: 上一次的清单
+        :param max_workers: 并行计算哈希的线程数
+        :return:
+        """
+        old_files = (old_manifest or {}).get("files", {})
+
+        def entry(rel_path: str) -> Tuple[str, Dict[str, Any]]:
+            stat = (root / rel_path).stat()
+            old = old_files.get(rel_path)
+            if old and old.get("size") == stat.st_size:
+                if old.get("mtime_ns") == stat.st_mtime_ns or Publisher.is_extracted(stat.st_mtime):
+                    return rel_path, old
+            return rel_path, {
+                "sha256": Publisher.hash_file(root / rel_path),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            files = dict(executor.map(entry, Publisher.list_files(root)))
+        shards: Dict[str, List[str]] = {}
+        for rel_path in files:
+            shards.setdefault(Publisher.get_shard_key(rel_path), []).append(rel_path)
+        return {
+            "version": MANIFEST_VERSION,
+            "files": files,
+            "shards": {
+                key: {"digest": Publisher.get_shard_digest(files, members), "files": members}
+                for key, members in shards.items()
+            },
+        }
+
+    @staticmethod
+    def is_extracted(mtime: float) -> bool:
+        """
+        文件是否由全量归档解压后未被改写：归档内的文件时间固定为 ZIP_DATE_TIME，解压时按本地时间还原，
+        爬虫写入的文件不会是这个时间，内容与上一次清单一致
+        """
+        return time.localtime(mtime)[:6] == ZIP_DATE_TIME
+
+    @staticmethod
+    def get_shard_digest(files: Dict[str, Dict[str, Any]], members: List[str]) -> str:
+        """分片摘要：由分片内所有文件的路径与哈希计算得出"""
+        h = hashlib.sha256()
+        for rel_path in sorted(members):
+            h.update(f"{rel_path}\0{files[rel_path]['sha256']}\n".encode("utf-8"))
+        return h.hexdigest()
+
+    @staticmethod
+    def diff(old_manifest: Dict[str, Any], new_manifest: Dict[str, Any]) -> Dict[str, List[str]]:
+        """
+        对比两个清单
+        :return: added / changed / removed 文件列表
+        """
+        old_files = old_manifest.get("files", {})
+        new_files = new_manifest.get("files", {})
+        added = [i for i in new_files if i not in old_files]
+        changed = [i for i in new_files if i in old_files and old_files[i]["sha256"] != new_files[i]["sha256"]]
+        removed = [i for i in old_files if i not in new_files]
+        return {"added": added, "changed": changed, "removed": removed}
+
+    @staticmethod
+    def get_changed_shards(old_manifest: Dict[str, Any], new_manifest: Dict[str, Any]) -> List[str]:
+        """获取需要重建的分片：摘要变化或归档文件不存在"""
+        old_shards = old_manifest.get("shards", {})
+        changed = []
+        for key, shard in new_manifest["shards"].items():
+            old = old_shards.get(key)
+            if old is None or old.get("digest") != shard["digest"]:
+                changed.append(key)
+            elif not Publisher.get_shard_archive_path(key).exists():
+                changed.append(key)
+        return changed
+
+    @staticmethod
+    def restore_shards(old_manifest: Dict[str, Any], bucket: "LocalBucket"):
+        """本地没有上一次的分片归档时（例如 CI 中只还原了全量归档），从存储桶取回，内容未变化的分片无需重建"""
+        for shard in old_manifest.get("shards", {}).values():
+            if "archive" not in shard or "sha256" not in shard:
+                continue
+            archive_path = ASSETS_DATA_ROOT / shard["archive"]
+            if not archive_path.exists():
+                bucket.restore(shard["archive"], shard["sha256"], archive_path)
+
+    @staticmethod
+    def write_archive(archive_path: "Path", root: "Path", members: List[str]) -> "Path":
+        """写入归档，先写临时文件再替换，避免留下半成品"""
+        archive_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = archive_path.with_suffix(".zip.tmp")
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for rel_path in sorted(members):
+                info = zipfile.ZipInfo(rel_path, date_time=ZIP_DATE_TIME)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                with open(root / rel_path, "rb") as src, archive.open(info, "w") as dst:
+                    shutil.copyfileobj(src, dst, HASH_CHUNK_SIZE)
+        os.replace(tmp_path, archive_path)
+        return archive_path
+
+    @staticmethod
+    def build_shards(
+        root: "Path",
+        manifest: Dict[str, Any],
+        shard_keys: List[str],
+        max_workers: Optional[int] = None,
+    ):
+        """并行重建分片，zlib 压缩时会释放 GIL"""
+
+        def build(key: str):
+            shard = manifest["shards"][key]
+            archive_path = Publisher.write_archive(Publisher.get_shard_archive_path(key), root, shard["files"])
+            shard["archive"] = archive_path.relative_to(ASSETS_DATA_ROOT).as_posix()
+            shard["sha256"] = Publisher.hash_file(archive_path)
+            shard["size"] = archive_path.stat().st_size
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(build, shard_keys))
+
+    @staticmethod
+    def remove_stale_shards(manifest: Dict[str, Any]):
+        """删除已经不存在的分片归档"""
+        if not ASSETS_DATA_ARCHIVE_ROOT.exists():
+            return
+        keep = {Publisher.get_shard_archive_path(key) for key in manifest["shards"]}
+        for p in ASSETS_DATA_ARCHIVE_ROOT.rglob("*.zip"):
+            if p not in keep:
+                p.unlink()
+
+    @staticmethod
+    def publish(
+        root: "Path" = ASSETS_DATA_RAW_ROOT,
+        bucket: Optional["LocalBucket"] = None,
+        full_archive: bool = True,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, List[str]]:
+        """
+        发布流程
+        :param root: 数据目录
+        :param bucket: 本地模拟存储桶，为空时不同步
+        :param full_archive: 是否生成全量归档
+        :param max_workers: 并行线程数
+        :return: 文件变化
+        """
+        manifest_path = root / MANIFEST_NAME
+        old_manifest = Publisher.load_manifest(manifest_path)
+        manifest = Publisher.build_manifest(root, old_manifest, max_workers)
+        diff = Publisher.diff(old_manifest, manifest)
+        print(
+            f"文件变化: 新增 {len(diff['added'])} 修改 {len(diff['changed'])} 删除 {len(diff['removed'])}",
+        )
+        if bucket is not None:
+            Publisher.restore_shards(old_manifest, bucket)
+        changed_shards = Publisher.get_changed_shards(old_manifest, manifest)
+        # 未变化的分片沿用上一次的归档信息
+        for key, shard in manifest["shards"].items():
+            if key not in changed_shards:
+                old = old_manifest["shards"][key]
+                shard.update({k: old[k] for k in ("archive", "sha256", "size") if k in old})
+        Publisher.build_shards(root, manifest, changed_shards, max_workers)
+        Publisher.remove_stale_shards(manifest)
+        print(f"重建分片: {len(changed_shards)} / {len(manifest['shards'])}")
+        Publisher.save_manifest(manifest_path, manifest)
+        if full_archive:
+            full_archive_path = root / FULL_ARCHIVE_NAME
+            if any(diff.values()) or not full_archive_path.exists():
+                Publisher.write_archive(full_archive_path, root, Publisher.list_files(root) + [MANIFEST_NAME])
+                print(f"重建全量归档: {FULL_ARCHIVE_NAME}")
+        if bucket is not None:
+            bucket.sync(ASSETS_DATA_ROOT, Publisher.get_publish_files(root, manifest, full_archive))
+            errors = bucket.verify()
+            if errors:
+                raise ValueError(f"存储桶校验失败: {errors[:10]}")
+            print("存储桶校验通过")
+        return diff
+
+    @staticmethod
+    def get_publish_files(root: "Path", manifest: Dict[str, Any], full_archive: bool) -> Dict[str, str]:
+        """
+        获取需要上传的文件
+        :return: 相对 data 目录的路径 -> sha256
+        """
+        prefix = root.relative_to(ASSETS_DATA_ROOT).as_posix()
+        files = {f"{prefix}/{k}": v["sha256"] for k, v in manifest["files"].items()}
+        for shard in manifest["shards"].values():
+            files[shard["archive"]] = shard["sha256"]
+        files[f"{prefix}/{MANIFEST_NAME}"] = Publisher.hash_file(root / MANIFEST_NAME)
+        if full_archive:
+            files[f"{prefix}/{FULL_ARCHIVE_NAME}"] = Publisher.hash_file(root / FULL_ARCHIVE_NAME)
+        return files
+
+
+class LocalBucket:
+    """
+    本地存储桶
+
+    用一个本地目录模拟对象存储，记录每个对象的哈希，
+    同步时只复制内容有变化的对象，用于在上传前验证发布结果
+    """
+
+    INDEX_NAME = ".bucket_index.json"
+
+    def __init__(self, root: "Path"):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / self.INDEX_NAME
+        self.index: Dict[str, str] = {}
+        if self.index_path.exists():
+            with open(self.index_path, "r", encoding="utf-8") as file:
+                self.index = ujson.loads(file.read())
+
+    def save_index(self):
+        with open(self.index_path, "w", encoding="utf-8") as file:
+            file.write(ujson.dumps(self.index, indent=4, sort_keys=True))
+
+    def sync(self, source_root: "Path", files: Dict[str, str]) -> Dict[str, int]:
+        """
+        同步文件到存储桶
+        :param source_root: 源目录
+        :param files: 相对路径 -> sha256
+        :return: 上传、删除、跳过的数量
+        """
+        uploaded = skipped = deleted = 0
+        for rel_path, sha256 in files.items():
+            target = self.root / rel_path
+            if self.index.get(rel_path) == sha256 and target.exists():
+                skipped += 1
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source_root / rel_path, target)
+            self.index[rel_path] = sha256
+            uploaded += 1
+        for rel_path in [i for i in self.index if i not in files]:
+            (self.root / rel_path).unlink(missing_ok=True)
+            del self.index[rel_path]
+            deleted += 1
+        self.save_index()
+        print(f"存储桶同步: 上传 {uploaded} 删除 {deleted} 跳过 {skipped}")
+        return {"uploaded": uploaded, "deleted": deleted, "skipped": skipped}
+
+    def restore(self, rel_path: str, sha256: str, target: "Path") -> bool:
+        """
+        从存储桶取回对象
+        :return: 存储桶中存在内容一致的对象
+        """
+        source = self.root / rel_path
+        if self.index.get(rel_path) != sha256 or not source.exists():
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, target)
+        return True
+
+    def verify(self) -> List[str]:
+        """重新计算存储桶中所有对象的哈希，返回不一致的对象"""
+        errors = []
+        for rel_path, sha256 in self.index.items():
+            target = self.root / rel_path
+            if not target.exists():
+                errors.append(f"missing: {rel_path}")
+            elif Publisher.hash_file(target) != sha256:
+                errors.append(f"mismatch: {rel_path}")
+        return errors
@@ -0,0 +1,195 @@
+import asyncio
+import email.utils
+import random
+import time
+from ssl import SSLZeroReturnError
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Type
+
+from httpx import HTTPError, Response
+
+
+class RequestError(Exception):
+    """请求失败"""
+
+    def __init__(self, method: str, url: str, status_code: Optional[int] = None, message: str = ""):
+        self.method = method
+        self.url = url
+        self.status_code = status_code
+        super().__init__(message or f"Request {method} {url} failed with status code {status_code}")
+
+
+class CircuitOpenError(RequestError):
+    """熔断器打开，且等待时间超过上限"""
+
+
+class CircuitBreaker:
+    """
+    按 host 区分的熔断器
+
+    连续失败达到阈值后打开，打开期间的请求会等待到冷却结束而不是直接失败；
+    冷却结束后只放行一个探测请求，探测失败则冷却时间翻倍
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 5.0, max_reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.failures: Dict[str, int] = {}
+        self.open_until: Dict[str, float] = {}
+        self.timeouts: Dict[str, float] = {}
+        self.probing: Dict[str, bool] = {}
+
+    def is_open(self, host: str) -> bool:
+        return self.failures.get(host, 0) >= self.failure_threshold
+
+    async def acquire(self, host: str, max_wait: float = 300.0) -> bool:
+        """
+        等待直到允许向 host 发送请求
+        :return: 本次请求是否为探测请求，只有探测请求需要 release
+        """
+        waited = 0.0
+        while self.is_open(host):
+            delay = self.open_until.get(host, 0) - time.monotonic()
+            if delay <= 0 and not self.probing.get(host):
+                self.probing[host] = True
+                return True
+            delay = max(delay, 0.1)
+            if waited + delay > max_wait:
+                raise CircuitOpenError("-", host, message=f"Circuit for {host} is open")
+            await asyncio.sleep(delay)
+            waited += delay
+        return False
+
+    def release(self, host: str):
+        """探测请求未得出结果时释放探测权"""
+        self.probing.pop(host, None)
+
+    def record_success(self, host: str):
+        self.failures.pop(host, None)
+        self.open_until.pop(host, None)
+        self.timeouts.pop(host, None)
+        self.probing.pop(host, None)
+
+    def record_failure(self, host: str):
+        failures = self.failures.get(host, 0) + 1
+        self.failures[host] = failures
+        if failures < self.failure_threshold:
+            return
+        if self.probing.pop(host, False):
+            timeout = min(self.timeouts.get(host, self.reset_timeout) * 2, self.max_reset_timeout)
+        elif self.open_until.get(host, 0) > time.monotonic():
+            # 已经打开，打开前发出的请求陆续失败时不再延长冷却
+            return
+        else:
+            timeout = self.reset_timeout
+        self.timeouts[host] = timeout
+        self.open_until[host] = time.monotonic() + timeout
+
+
+class RetryPolicy:
+    """
+    重试策略
+
+    指数退避 + 完全随机抖动，遵循 Retry-After，按状态码类别决定是否重试，
+    并通过熔断器在 host 持续出错时统一退避
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        max_retry_after: float = 120.0,
+        retry_statuses: Tuple[int, ...] = (408, 425, 429),
+        retry_exceptions: Tuple[Type[BaseException], ...] = (HTTPError, SSLZeroReturnError, OSError),
+        circuit_breaker: Optional["CircuitBreaker"] = None,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = retry_statuses
+        self.retry_exceptions = retry_exceptions
+        self.circuit_breaker = circuit_breaker
+
+    def should_retry_status(self, status_code: int) -> bool:
+        """408 / 425 / 429 与所有 5xx 视为可重试"""
+        return status_code in self.retry_statuses or 500 <= status_code < 600
+
+    def is_host_failure(self, status_code: int) -> bool:
+        """计入熔断器的失败：限流与服务端错误"""
+        return status_code == 429 or status_code >= 500
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """解析 Retry-After，支持秒数与 HTTP 日期"""
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            date = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(date.timestamp() - time.time(), 0.0)
+
+    def get_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        获取第 attempt 次重试前的等待时间
+        :param attempt: 从 0 开始的重试次数
+        :param retry_after: 服务端要求的等待时间
+        :return:
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2**attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_retry_after))
+        return delay
+
+    async def execute(
+        self,
+        host: str,
+        send: Callable[[], Awaitable["Response"]],
+        on_retry: Optional[Callable[[int, Optional[int]], None]] = None,
+        max_attempts: Optional[int] = None,
+    ) -> "Response":
+        """
+        按策略执行请求
+        :param host: 请求的 host，用于熔断
+        :param send: 发送请求的函数
+        :param on_retry: 每次重试前的回调，参数为 重试次数 与 状态码
+        :param max_attempts: 覆盖默认的最大尝试次数
+        :return: 最后一次请求的响应，状态码不一定为 200；网络异常在用尽次数后抛出
+        """
+        max_attempts = max_attempts or self.max_attempts
+        breaker = self.circuit_breaker
+        attempt = 0
+        while True:
+            probe = await breaker.acquire(host) if breaker is not None else False
+            retry_after = None
+            try:
+                response = await send()
+            except self.retry_exceptions:
+                if breaker is not None:
+                    breaker.record_failure(host)
+                if attempt + 1 >= max_attempts:
+                    raise
+                status_code = None
+            except BaseException:
+                if probe:
+                    breaker.release(host)
+                raise
+            else:
+                status_code = response.status_code
+                if breaker is not None:
+                    if self.is_host_failure(status_code):
+                        breaker.record_failure(host)
+                    else:
+                        breaker.record_success(host)
+                if not self.should_retry_status(status_code) or attempt + 1 >= max_attempts:
+                    return response
+                retry_after = self.parse_retry_after(response.headers.get("Retry-After"))
+            if on_retry is not None:
+                on_retry(attempt, status_code)
+            await asyncio.sleep(self.get_delay(attempt, retry_after))
+            attempt += 1
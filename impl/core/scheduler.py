@@ -0,0 +1,93 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+
+class TaskNode:
+    def __init__(self, name: str, func: Callable[[], Awaitable[Any]], depends_on: Iterable[str] = ()):
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on)
+
+
+class DependencyError(Exception):
+    """依赖的任务失败或不存在"""
+
+
+class TaskGraph:
+    """
+    有向无环任务图
+
+    没有依赖关系的任务并发执行，任务在其依赖全部成功后开始；
+    依赖失败的任务不会执行，并记录为 DependencyError
+    """
+
+    def __init__(self, max_concurrency: int = 4):
+        self.max_concurrency = max_concurrency
+        self.nodes: Dict[str, "TaskNode"] = {}
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+
+    def add(self, name: str, func: Callable[[], Awaitable[Any]], depends_on: Iterable[str] = ()):
+        if name in self.nodes:
+            raise ValueError(f"duplicate task: {name}")
+        self.nodes[name] = TaskNode(name, func, depends_on)
+
+    def check(self):
+        """检查依赖是否存在以及是否有环"""
+        for node in self.nodes.values():
+            for dep in node.depends_on:
+                if dep not in self.nodes:
+                    raise DependencyError(f"{node.name} depends on unknown task {dep}")
+        visiting: List[str] = []
+        visited = set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                cycle = visiting[visiting.index(name) :] + [name]
+                raise DependencyError(f"dependency cycle at {name}: {' -> '.join(cycle)}")
+            visiting.append(name)
+            for dep in self.nodes[name].depends_on:
+                visit(dep)
+            visiting.pop()
+            visited.add(name)
+
+        for name in self.nodes:
+            visit(name)
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        执行所有任务
+        :return: 任务名 -> 结果，失败的任务记录在 errors 中
+        """
+        self.check()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks: Dict[str, "asyncio.Task"] = {}
+
+        async def run_node(node: "TaskNode"):
+            for dep in node.depends_on:
+                await tasks[dep]
+                if dep in self.errors:
+                    error = DependencyError(f"{node.name} skipped: dependency {dep} failed")
+                    self.errors[node.name] = error
+                    return None
+            async with semaphore:
+                try:
+                    result = await node.func()
+                except Exception as e:  # pylint: disable=W0703
+                    self.errors[node.name] = e
+                    return None
+            self.results[node.name] = result
+            return result
+
+        for node in self.nodes.values():
+            tasks[node.name] = asyncio.create_task(run_node(node), name=node.name)
+        await asyncio.gather(*tasks.values())
+        return self.results
+
+    def get_error(self, name: str) -> Optional[BaseException]:
+        return self.errors.get(name)
+
+    def failed(self) -> List[str]:
+        return list(self.errors.keys())
@@ -0,0 +1,277 @@
+import hashlib
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Callable, Set, Tuple
+
+import ujson
+
+from .disk_writer import DiskWriter
+from .file_manager import FileManager
+from ..assets_utils.path import ASSETS_CACHE_ROOT
+from ..config import config
+
+if TYPE_CHECKING:
+    from ..models.enums import Game, DataType
+
+# 数据源指纹、上一次的输出等内部状态，不放在 data/raw 下以免被发布；CI 中通过 actions/cache 保留到下次运行
+SOURCE_CACHE_ROOT = ASSETS_CACHE_ROOT / "source"
+
+_item_state: ContextVar[Optional[Dict[str, bool]]] = ContextVar("_item_state", default=None)
+"""当前正在解析的数据项状态，不下载图标时标记为不完整"""
+
+
+class SourceCache:
+    """
+    数据源指纹
+
+    爬虫成功完成后保存数据源的指纹与输出，
+    下次运行时数据源字节完全相同则直接沿用上一次的输出，FORCE 模式下忽略指纹
+    """
+
+    @staticmethod
+    def get_path(game: "Game", data_type: "DataType", spider: str, suffix: str) -> "Path":
+        p = SOURCE_CACHE_ROOT / game.value / data_type.value / f"{spider}{suffix}"
+        p.parent.mkdir(parents=True, exist_ok=True)
+        return p
+
+    @staticmethod
+    def get_fingerprint(content: bytes) -> str:
+        """数据源内容的 sha256；不下载图标时的输出不完整，单独计算指纹"""
+        h = hashlib.sha256(content)
+        if config.NO_ICONS:
+            h.update(b"|no-icons")
+        return h.hexdigest()
+
+    @staticmethod
+    def load_fingerprint(game: "Game", data_type: "DataType", spider: str) -> Optional[str]:
+        file_path = SourceCache.get_path(game, data_type, spider, ".fingerprint")
+        if not file_path.exists():
+            return None
+        return file_path.read_text(encoding="utf-8").strip()
+
+    @staticmethod
+    def is_unchanged(game: "Game", data_type: "DataType", spider: str, fingerprint: str) -> bool:
+        """数据源与上一次相同且上一次的输出存在"""
+        if config.FORCE:
+            return False
+        if SourceCache.load_fingerprint(game, data_type, spider) != fingerprint:
+            return False
+        return SourceCache.get_path(game, data_type, spider, ".json").exists()
+
+    @staticmethod
+    async def save(game: "Game", data_type: "DataType", spider: str, fingerprint: str, content: bytes):
+        """先保存输出（已序列化的 JSON）再保存指纹，中断时不会出现指纹与输出不一致"""
+        output_path = SourceCache.get_path(game, data_type, spider, ".json")
+        await FileManager.save_file(output_path, content)
+        fingerprint_path = SourceCache.get_path(game, data_type, spider, ".fingerprint")
+        await FileManager.save_file(fingerprint_path, fingerprint.encode("utf-8"))
+
+    @staticmethod
+    async def save_output(game: "Game", data_type: "DataType", spider: str, content: bytes):
+        """只保存输出，先删除指纹，之后的运行不会把旧指纹与新输出对应起来"""
+        SourceCache.get_path(game, data_type, spider, ".fingerprint").unlink(missing_ok=True)
+        await FileManager.save_file(SourceCache.get_path(game, data_type, spider, ".json"), content)
+
+    @staticmethod
+    def has_output(game: "Game", data_type: "DataType", spider: str) -> bool:
+        file_path = SourceCache.get_path(game, data_type, spider, ".json")
+        return DiskWriter.is_pending(file_path) or file_path.exists()
+
+    @staticmethod
+    async def load_output(game: "Game", data_type: "DataType", spider: str) -> bytes:
+        file_path = SourceCache.get_path(game, data_type, spider, ".json")
+        return await FileManager.load_file(file_path)
+
+
+class ItemHashStore:
+    """
+    数据项指纹
+
+    按 (数据源, 数据类型, id) 记录每一项原始数据的 hash 与解析结果，
+    数据源变化时只解析新增或变化的项，其余沿用上一次的结果，并记录新增、变化、删除的 id
+    """
+
+    def __init__(self, game: "Game", data_type: "DataType", spider: str, items: Dict[str, Dict[str, Any]]):
+        self.game = game
+        self.data_type = data_type
+        self.spider = spider
+        self.items = items
+        self.added: List[str] = []
+        self.changed: List[str] = []
+        self.removed: List[str] = []
+
+    @staticmethod
+    def hash_item(data: Any) -> str:
+        return hashlib.sha1(ujson.dumps(data, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @classmethod
+    async def load(cls, game: "Game", data_type: "DataType", spider: str) -> "ItemHashStore":
+        file_path = SourceCache.get_path(game, data_type, spider, ".items.json")
+        items = {}
+        if file_path.exists():
+            try:
+                items = await FileManager.decode_json(await FileManager.load_file(file_path))
+            except ValueError:
+                items = {}
+        return cls(game, data_type, spider, items)
+
+    def get_unchanged(self, key: str, item_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        未变化的项返回上一次的结果
+        :return: 上一次的结果，结果为空表示上一次解析后被过滤；需要重新解析时返回 None
+        """
+        entry = self.items.get(key)
+        if entry is None:
+            self.added.append(key)
+            return None
+        if config.FORCE or entry["hash"] != item_hash:
+            self.changed.append(key)
+            return None
+        return entry
+
+    def update(self, key: str, item_hash: str, data: Optional[Dict[str, Any]]):
+        self.items[key] = {"hash": item_hash, "data": data}
+
+    def discard(self, key: str):
+        """解析失败或不完整，下次重新解析"""
+        self.items.pop(key, None)
+
+    def remove_missing(self, keys: List[str]):
+        """删除数据源中已经不存在的项"""
+        keys = set(keys)
+        self.removed = [i for i in self.items if i not in keys]
+        for i in self.removed:
+            del self.items[i]
+
+    def get_report(self) -> Dict[str, List[str]]:
+        return {"added": self.added, "changed": self.changed, "removed": self.removed}
+
+    async def save_items(self):
+        file_path = SourceCache.get_path(self.game, self.data_type, self.spider, ".items.json")
+        await FileManager.save_file(file_path, ujson.dumps(self.items, ensure_ascii=False).encode("utf-8"))
+
+    async def save(self):
+        await self.save_items()
+        report_path = SourceCache.get_path(self.game, self.data_type, self.spider, ".changes.json")
+        await FileManager.save_file(report_path, ujson.dumps(self.get_report(), ensure_ascii=False).encode("utf-8"))
+
+    @classmethod
+    async def discard_failed_icons(cls, game: "Game", data_type: "DataType", spider: str, prune: Callable[[Any], bool]):
+        """
+        图标下载失败的项不完整，从记录中删除，下次运行重新解析
+        :param prune: 移除数据中下载失败的图标，返回是否有图标被移除
+        """
+        store = await cls.load(game, data_type, spider)
+        keys = [k for k, v in store.items.items() if v["data"] and prune(v["data"])]
+        if not keys:
+            return
+        for key in keys:
+            store.discard(key)
+        await store.save_items()
+
+    @staticmethod
+    def begin_item() -> Dict[str, bool]:
+        """开始解析一项，需要在该项独立的任务中调用"""
+        state = {"complete": True}
+        _item_state.set(state)
+        return state
+
+    @staticmethod
+    def mark_incomplete():
+        """当前项的结果不完整，例如跳过了图标下载"""
+        state = _item_state.get()
+        if state is not None:
+            state["complete"] = False
+
+
+class NegativeCache:
+    """
+    不存在的链接
+
+    按数据源记录返回 404 的链接，有效期内直接跳过，不再发送请求；
+    某个爬虫的记录过期后，即使数据源未变化也重新解析一次，让这些链接重新请求
+    """
+
+    entries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    """数据源 -> 链接 -> 过期时间与爬虫"""
+    refreshing: Set[Tuple[str, str]] = set()
+    """本次运行重新请求过期记录的 (数据源, 爬虫)"""
+    removed: Dict[str, Set[str]] = {}
+    """数据源 -> 本次运行请求成功、需要删除的链接"""
+
+    @staticmethod
+    def get_path(source: str) -> "Path":
+        p = SOURCE_CACHE_ROOT / "negative" / f"{source.lower() or 'default'}.json"
+        p.parent.mkdir(parents=True, exist_ok=True)
+        return p
+
+    @staticmethod
+    def _load(source: str) -> Dict[str, Dict[str, Any]]:
+        file_path = NegativeCache.get_path(source)
+        if not file_path.exists():
+            return {}
+        try:
+            return FileManager.sync_load_json(file_path)
+        except ValueError:
+            return {}
+
+    @staticmethod
+    def _get_entries(source: str) -> Dict[str, Dict[str, Any]]:
+        source = source.lower()
+        if source not in NegativeCache.entries:
+            NegativeCache.entries[source] = NegativeCache._load(source)
+        return NegativeCache.entries[source]
+
+    @staticmethod
+    def is_missing(source: str, url: str) -> bool:
+        """链接在有效期内返回过 404，FORCE 模式下忽略"""
+        if config.FORCE:
+            return False
+        entry = NegativeCache._get_entries(source).get(url)
+        return entry is not None and entry["expires"] > time.time()
+
+    @staticmethod
+    def add(source: str, url: str, spider: str):
+        NegativeCache.removed.get(source.lower(), set()).discard(url)
+        NegativeCache._get_entries(source)[url] = {"expires": time.time() + config.NEGATIVE_CACHE_TTL, "spider": spider}
+
+    @staticmethod
+    def remove(source: str, url: str):
+        if NegativeCache._get_entries(source).pop(url, None) is not None:
+            NegativeCache.removed.setdefault(source.lower(), set()).add(url)
+
+    @staticmethod
+    def has_expired(source: str, spider: str) -> bool:
+        """爬虫是否有过期的记录，有则本次运行需要重新请求"""
+        now = time.time()
+        entries = NegativeCache._get_entries(source)
+        if any(i["spider"] == spider and i["expires"] <= now for i in entries.values()):
+            NegativeCache.refreshing.add((source.lower(), spider))
+            return True
+        return False
+
+    @staticmethod
+    async def save():
+        """
+        保存所有已加载的数据源；重新请求过的爬虫中仍然过期的记录对应的链接已不再使用，直接删除
+
+        多个工作进程共享同一份记录，保存前先合并其他进程已经写入的记录
+        """
+        now = time.time()
+        refreshing = NegativeCache.refreshing
+        for source, entries in NegativeCache.entries.items():
+            removed = NegativeCache.removed.get(source, set())
+            for url, entry in NegativeCache._load(source).items():
+                if url not in entries and url not in removed:
+                    entries[url] = entry
+            for url in [k for k, v in entries.items() if v["expires"] <= now and (source, v["spider"]) in refreshing]:
+                del entries[url]
+            file_path = NegativeCache.get_path(source)
+            await FileManager.save_file(file_path, ujson.dumps(entries, ensure_ascii=False).encode("utf-8"))
+
+    @staticmethod
+    def reset():
+        NegativeCache.entries.clear()
+        NegativeCache.refreshing.clear()
+        NegativeCache.removed.clear()
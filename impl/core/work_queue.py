@@ -0,0 +1,163 @@
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import ujson
+
+from ..assets_utils.path import ASSETS_DATA_ROOT
+from ..config import config
+
+QUEUE_ROOT = ASSETS_DATA_ROOT / "queue"
+
+
+def get_queue_dir() -> "Path":
+    """工作队列目录，QUEUE_DIR 为空时使用 data/queue"""
+    return Path(config.QUEUE_DIR) if config.QUEUE_DIR else QUEUE_ROOT
+
+
+class WorkQueue:
+    """
+    基于文件系统的工作队列
+
+    每个爬取单元是 pending 目录下的一个 JSON 文件，工作进程通过原子的 rename 领取到 claimed，
+    完成后结果写入 results，单元移动到 done；失败的单元连同错误信息写入 failed。
+    依赖的单元全部完成后才能领取，依赖失败的单元直接记为失败；
+    不依赖任何外部服务，多台机器挂载同一目录即可共同消费
+    """
+
+    def __init__(self, root: "Path"):
+        self.root = root
+        self.pending = root / "pending"
+        self.claimed = root / "claimed"
+        self.done = root / "done"
+        self.failed = root / "failed"
+        self.results = root / "results"
+        self.metrics = root / "metrics"
+
+    def _dirs(self) -> List["Path"]:
+        return [self.pending, self.claimed, self.done, self.failed, self.results, self.metrics]
+
+    def reset(self):
+        """清空队列"""
+        shutil.rmtree(self.root, ignore_errors=True)
+        for p in self._dirs():
+            p.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _write(file_path: "Path", content: bytes):
+        """先写临时文件再替换，其他进程不会读到不完整的文件"""
+        tmp_path = file_path.with_name(f".{file_path.name}.tmp")
+        with open(tmp_path, "wb") as file:
+            file.write(content)
+        os.replace(tmp_path, file_path)
+
+    @staticmethod
+    def _read(file_path: "Path") -> Optional[Dict[str, Any]]:
+        try:
+            with open(file_path, "rb") as file:
+                return ujson.loads(file.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save_config(self, data: Dict[str, Any]):
+        """保存协调者的配置，工作进程按同样的配置运行"""
+        self._write(self.root / "config.json", ujson.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+    def load_config(self) -> Dict[str, Any]:
+        return self._read(self.root / "config.json") or {}
+
+    def put(self, name: str, order: int, depends_on: List[str], **payload):
+        """
+        添加爬取单元
+        :param name: 单元名称，队列内唯一
+        :param order: 领取顺序，越小越先领取
+        :param depends_on: 依赖的单元名称
+        """
+        unit = {"name": name, "order": order, "depends_on": depends_on, **payload}
+        self._write(self.pending / f"{name}.json", ujson.dumps(unit, ensure_ascii=False).encode("utf-8"))
+
+    def _get_state(self, name: str) -> str:
+        if (self.done / f"{name}.json").exists():
+            return "done"
+        if (self.failed / f"{name}.json").exists():
+            return "failed"
+        return "waiting"
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """
+        领取一个依赖已经全部完成的单元
+        :param worker: 工作进程标识
+        :return: 单元，没有可领取的单元时返回 None
+        """
+        units = [i for i in (self._read(p) for p in self.pending.glob("*.json")) if i]
+        for unit in sorted(units, key=lambda i: i["order"]):
+            states = [self._get_state(i) for i in unit["depends_on"]]
+            if "failed" in states:
+                dependency = unit["depends_on"][states.index("failed")]
+                self._fail_pending(unit, f"dependency {dependency} failed")
+                continue
+            if "waiting" in states:
+                continue
+            target = self.claimed / f"{unit['name']}.json"
+            try:
+                os.rename(self.pending / f"{unit['name']}.json", target)
+            except FileNotFoundError:
+                # 已经被其他工作进程领取
+                continue
+            unit["worker"] = worker
+            unit["claimed_at"] = time.time()
+            self._write(target, ujson.dumps(unit, ensure_ascii=False).encode("utf-8"))
+            return unit
+        return None
+
+    def _fail_pending(self, unit: Dict[str, Any], error: str):
+        try:
+            os.rename(self.pending / f"{unit['name']}.json", self.claimed / f"{unit['name']}.json")
+        except FileNotFoundError:
+            return
+        self.fail(unit, error)
+
+    def complete(self, unit: Dict[str, Any], content: bytes):
+        """先写结果再移动到 done，done 中的单元一定有结果"""
+        self._write(self.results / f"{unit['name']}.json", content)
+        os.replace(self.claimed / f"{unit['name']}.json", self.done / f"{unit['name']}.json")
+
+    def fail(self, unit: Dict[str, Any], error: str):
+        unit = {**unit, "error": error}
+        self._write(self.failed / f"{unit['name']}.json", ujson.dumps(unit, ensure_ascii=False).encode("utf-8"))
+        (self.claimed / f"{unit['name']}.json").unlink(missing_ok=True)
+
+    def load_result(self, name: str) -> Optional[bytes]:
+        file_path = self.results / f"{name}.json"
+        if not file_path.exists():
+            return None
+        with open(file_path, "rb") as file:
+            return file.read()
+
+    def get_error(self, name: str) -> Optional[str]:
+        unit = self._read(self.failed / f"{name}.json")
+        return unit.get("error") if unit else None
+
+    def requeue_stale(self, timeout: float) -> List[str]:
+        """
+        领取后超过 timeout 秒仍未完成的单元放回 pending，用于工作进程异常退出的情况
+        :return: 放回的单元名称
+        """
+        names = []
+        now = time.time()
+        for p in self.claimed.glob("*.json"):
+            unit = self._read(p)
+            if unit is None or now - unit.get("claimed_at", now) < timeout:
+                continue
+            try:
+                os.rename(p, self.pending / p.name)
+            except FileNotFoundError:
+                continue
+            names.append(unit["name"])
+        return names
+
+    def is_finished(self) -> bool:
+        """所有单元都已完成或失败"""
+        return not any(self.pending.glob("*.json")) and not any(self.claimed.glob("*.json"))
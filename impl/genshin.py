@@ -1,19 +1,22 @@
-from typing import Optional, Dict, List
+from typing import Optional, Tuple, FrozenSet
 
 from gram_core.base_service import BaseService
 from enkanetwork import Assets as EnkaAssets
 
 from utils.typedefs import StrOrInt
+from .assets_utils.variants import THUMBNAIL, GACHA_MEDIUM
 from .client import (
     _AssetsService,
     _icon_getter as icon_getter,
+    _variant_getter as variant_getter,
     _AssetsServiceError as AssetsServiceError,
     _AssetsCouldNotFound as AssetsCouldNotFound,
 )
 from .models.base import BaseWikiModel
 from .models.enums import Game, DataType
 from .models.genshin.character import Character
-from .models.genshin.other import Other
+from .models.genshin.daily_material import MaterialsData, DailyMaterialIndex
+from .models.genshin.other import Other, RolesMaterial, RoleMaterial
 from .models.genshin.weapon import Weapon
 from .models.genshin.material import Material
 from .models.genshin.artifact import Artifact
@@ -35,6 +38,7 @@ class _AvatarAssets(_AssetsService[Character]):
     data_model: "BaseWikiModel" = Character
     DEFAULT_ID: str = "10000007-anemo"
     """默认ID"""
+    variants = {"icon": (THUMBNAIL,), "side": (THUMBNAIL,), "gacha": (GACHA_MEDIUM,)}
 
     icon = icon_getter("icon")
     """角色图标"""
@@ -44,6 +48,12 @@ class _AvatarAssets(_AssetsService[Character]):
     """抽卡立绘"""
     gacha_card = icon_getter("gacha_card")
     """抽卡卡片"""
+    icon_thumb = variant_getter("icon", THUMBNAIL.name)
+    """角色图标 128px 缩略图"""
+    side_thumb = variant_getter("side", THUMBNAIL.name)
+    """侧视图图标 128px 缩略图"""
+    gacha_medium = variant_getter("gacha", GACHA_MEDIUM.name)
+    """降采样的抽卡立绘"""
 
     def get_target(self, target: StrOrInt, second_target: StrOrInt = None) -> Optional[NameCard]:
         """获取目标"""
@@ -60,6 +70,7 @@ class _WeaponAssets(_AssetsService[Weapon]):
     game: "Game" = Game.GENSHIN
     data_type: "DataType" = DataType.WEAPON
     data_model: "BaseWikiModel" = Weapon
+    variants = {"icon": (THUMBNAIL,), "awaken": (THUMBNAIL,), "gacha": (GACHA_MEDIUM,)}
 
     icon = icon_getter("icon")
     """武器图标"""
@@ -67,6 +78,12 @@ class _WeaponAssets(_AssetsService[Weapon]):
     """突破后图标"""
     gacha = icon_getter("gacha")
     """抽卡立绘"""
+    icon_thumb = variant_getter("icon", THUMBNAIL.name)
+    """武器图标 128px 缩略图"""
+    awaken_thumb = variant_getter("awaken", THUMBNAIL.name)
+    """突破后图标 128px 缩略图"""
+    gacha_medium = variant_getter("gacha", GACHA_MEDIUM.name)
+    """降采样的抽卡立绘"""
 
 
 class _MaterialAssets(_AssetsService[Material]):
@@ -124,16 +141,59 @@ class _OtherAssets(_AssetsService[Other]):
     game: "Game" = Game.GENSHIN
     data_type = DataType.OTHER
     data_model = Other
+    use_bundle = False
+
+    def __init__(self):
+        super().__init__()
+        self.clear_class_data()
+
+    def clear_class_data(self) -> None:
+        # 未读取数据时各项为空，查询返回 None 或空结果
+        self.all_items_map = Other()
+        self.daily_material_index = DailyMaterialIndex(MaterialsData())
 
     def _sync_read_metadata(self, datas):
         self.all_items_map = Other.model_validate(datas)
+        daily_material = self.all_items_map.daily_material or MaterialsData()
+        self.daily_material_index = daily_material.build_index()
 
-    def get_roles_material(self) -> Dict[str, List[str]]:
+    def get_roles_material(self) -> Optional[RolesMaterial]:
         return self.all_items_map.roles_material
 
-    def get_daily_material(self) -> Dict[str, List[str]]:
+    def get_role_material(self, target: StrOrInt) -> Optional[RoleMaterial]:
+        """按角色 ID 或名称获取培养素材"""
+        roles_material = self.all_items_map.roles_material
+        if roles_material is None:
+            return None
+        return roles_material.get_by_id(str(target)) or roles_material.get_by_name(str(target))
+
+    def get_daily_material(self) -> Optional[MaterialsData]:
         return self.all_items_map.daily_material
 
+    def get_material_weekdays(self, name: str) -> Tuple[int, ...]:
+        """素材可以刷的星期几，0 为周一"""
+        return self.daily_material_index.get_material_weekdays(name)
+
+    def get_material_areas(self, name: str) -> Tuple[str, ...]:
+        """素材所在的国家"""
+        return self.daily_material_index.get_material_areas(name)
+
+    def get_item_materials(self, item_id: StrOrInt) -> Tuple[str, ...]:
+        """角色天赋素材或武器突破素材"""
+        return self.daily_material_index.get_item_materials(str(item_id))
+
+    def get_item_weekdays(self, item_id: StrOrInt) -> Tuple[int, ...]:
+        """角色或武器可以刷素材的星期几"""
+        return self.daily_material_index.get_item_weekdays(str(item_id))
+
+    def get_weekday_items(self, weekday: int) -> FrozenSet[str]:
+        """当日可以刷素材的角色与武器 ID"""
+        return self.daily_material_index.get_weekday_items(weekday)
+
+    def get_weekday_materials(self, weekday: int) -> FrozenSet[str]:
+        """当日可以刷的素材"""
+        return self.daily_material_index.get_weekday_materials(weekday)
+
 
 class AssetsService(BaseService.Dependence):
     """asset服务
@@ -161,7 +221,8 @@ class AssetsService(BaseService.Dependence):
             lambda x: (not x[0].startswith("_")) and x[1].__name__.endswith("Assets"),
             self.__annotations__.items(),
         ):
-            setattr(self, attr, clz.get_instance())
+            # 不在依赖注入时读取数据，数据在 initialize 中异步读取
+            setattr(self, attr, clz.create_instance())
 
     async def init(self, force):
         for attr, _ in filter(
@@ -1,11 +1,13 @@
 import datetime
-from typing import TYPE_CHECKING, Annotated, Union, Optional
+import functools
+from typing import TYPE_CHECKING, Annotated, Union, Optional, List, Type
 
 from pydantic import (
     AfterValidator,
     BaseModel,
     BeforeValidator,
     ConfigDict,
+    TypeAdapter,
     WrapSerializer,
 )
 
@@ -149,6 +151,20 @@ class BaseWikiModel(APIModel):
     """ 星级 """
 
 
+@functools.lru_cache(maxsize=None)
+def get_list_adapter(model: Type[BaseModel]) -> "TypeAdapter[List[BaseModel]]":
+    """
+    Returns a cached TypeAdapter for a list of the given model.
+
+    Args:
+        model (Type[BaseModel]): The item model.
+
+    Returns:
+        TypeAdapter: Validates and serializes a whole list in a single call.
+    """
+    return TypeAdapter(List[model])
+
+
 class Birthday(APIModel):
     """Represents a character's birthday.
 
@@ -0,0 +1,152 @@
+import dataclasses
+import enum
+import functools
+import sys
+import types
+import typing
+from typing import Any, Dict, List, Type, Tuple
+
+from pydantic import BaseModel, TypeAdapter
+
+__all__ = ("FrozenModelFactory",)
+
+
+class FrozenModelFactory:
+    """
+    只读模型
+
+    按 pydantic 模型的字段生成 frozen + __slots__ 的 dataclass，并把已经由爬虫校验过的数据直接转换过去：
+    嵌套模型递归转换，列表转为元组，字符串驻留，枚举按值还原；
+    其他类型（数字、时间、联合类型等）按字段注解与模型配置校验，与 pydantic 模型的值类型一致；
+    模型上定义的属性与方法会复制到 dataclass 上
+    """
+
+    _classes: Dict[Type[BaseModel], type] = {}
+    _fields: Dict[Type[BaseModel], List[Tuple[str, str, Any]]] = {}
+
+    @staticmethod
+    def _get_own_members(model: Type[BaseModel]) -> Dict[str, Any]:
+        """模型自身（不含 pydantic 基类）定义的属性与方法"""
+        members = {}
+        for clz in reversed(model.__mro__):
+            if not issubclass(clz, BaseModel) or clz.__module__.startswith("pydantic"):
+                continue
+            for name, value in vars(clz).items():
+                if name.startswith("__") or name.startswith("model_") or name in model.model_fields:
+                    continue
+                if isinstance(value, (property, staticmethod, classmethod, types.FunctionType)):
+                    members[name] = value
+        return members
+
+    @staticmethod
+    def get_class(model: Type[BaseModel]) -> type:
+        """获取模型对应的只读 dataclass"""
+        if model in FrozenModelFactory._classes:
+            return FrozenModelFactory._classes[model]
+        fields = []
+        for name, info in model.model_fields.items():
+            if info.default_factory is not None:
+                field = dataclasses.field(default_factory=info.default_factory)
+            elif info.is_required():
+                field = dataclasses.field()
+            elif isinstance(info.default, dict):
+                field = dataclasses.field(default_factory=info.default.copy)
+            elif isinstance(info.default, (list, set)):
+                field = dataclasses.field(default=tuple(info.default))
+            else:
+                field = dataclasses.field(default=info.default)
+            fields.append((name, Any, field))
+        clz = dataclasses.make_dataclass(
+            f"Frozen{model.__name__}",
+            fields,
+            namespace=FrozenModelFactory._get_own_members(model),
+            frozen=True,
+            slots=True,
+            kw_only=True,
+        )
+        clz.__module__ = model.__module__
+        FrozenModelFactory._classes[model] = clz
+        return clz
+
+    @staticmethod
+    def _get_fields(model: Type[BaseModel]) -> List[Tuple[str, str, Any]]:
+        """字段名、数据中的键与注解，带有校验器等元数据的字段还原为 Annotated"""
+        if model not in FrozenModelFactory._fields:
+            fields = []
+            for name, info in model.model_fields.items():
+                annotation = info.annotation
+                if info.metadata:
+                    annotation = typing.Annotated[(annotation, *info.metadata)]
+                fields.append((name, info.alias or name, annotation))
+            FrozenModelFactory._fields[model] = fields
+        return FrozenModelFactory._fields[model]
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _get_adapter(model: Type[BaseModel], annotation: Any) -> "TypeAdapter":
+        return TypeAdapter(annotation, config=model.model_config)
+
+    @staticmethod
+    def _validate(model: Type[BaseModel], annotation: Any, value: Any) -> Any:
+        """按注解校验，结果中的 pydantic 模型同样转换为只读对象"""
+        return FrozenModelFactory._freeze(FrozenModelFactory._get_adapter(model, annotation).validate_python(value))
+
+    @staticmethod
+    def _freeze(value: Any) -> Any:
+        if isinstance(value, BaseModel):
+            return FrozenModelFactory.from_data(type(value), value)
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return tuple(FrozenModelFactory._freeze(i) for i in value)
+        if isinstance(value, dict):
+            return {k: FrozenModelFactory._freeze(v) for k, v in value.items()}
+        if type(value) is str:
+            return sys.intern(value)
+        return value
+
+    @staticmethod
+    def _convert(model: Type[BaseModel], annotation: Any, value: Any) -> Any:
+        if value is None or annotation is Any:
+            return value
+        origin = typing.get_origin(annotation)
+        if origin is typing.Annotated:
+            return FrozenModelFactory._validate(model, annotation, value)
+        if origin in (typing.Union, types.UnionType):
+            args = [i for i in typing.get_args(annotation) if i is not type(None)]
+            if len(args) == 1:
+                return FrozenModelFactory._convert(model, args[0], value)
+            return FrozenModelFactory._validate(model, annotation, value)
+        if origin in (list, tuple, set, frozenset):
+            args = typing.get_args(annotation)
+            item_type = args[0] if args else Any
+            return tuple(FrozenModelFactory._convert(model, item_type, i) for i in value)
+        if origin is dict:
+            _, value_type = typing.get_args(annotation) or (Any, Any)
+            return {k: FrozenModelFactory._convert(model, value_type, v) for k, v in value.items()}
+        if isinstance(annotation, type):
+            if issubclass(annotation, BaseModel):
+                return FrozenModelFactory.from_data(annotation, value)
+            if issubclass(annotation, enum.Enum):
+                return annotation(value)
+            if type(value) is annotation:
+                return sys.intern(value) if annotation is str else value
+        return FrozenModelFactory._validate(model, annotation, value)
+
+    @staticmethod
+    def from_data(model: Type[BaseModel], data: Any) -> Any:
+        """
+        把爬虫输出的数据转换为只读对象，不再经过 pydantic 校验
+        :param model: 数据对应的 pydantic 模型
+        :param data: dict 或 pydantic 模型实例
+        :return:
+        """
+        if isinstance(data, BaseModel):
+            data = {k: getattr(data, k) for k in data.model_fields_set}
+        kwargs = {}
+        for name, key, annotation in FrozenModelFactory._get_fields(model):
+            if key in data:
+                kwargs[name] = FrozenModelFactory._convert(model, annotation, data[key])
+        return FrozenModelFactory.get_class(model)(**kwargs)
+
+    @staticmethod
+    def from_list(model: Type[BaseModel], datas: typing.Iterable[Any]) -> Tuple[Any, ...]:
+        return tuple(FrozenModelFactory.from_data(model, i) for i in datas)
@@ -1,4 +1,4 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple, FrozenSet, Set
 
 from pydantic import BaseModel, RootModel
 
@@ -88,3 +88,87 @@ class MaterialsData(RootModel):
 
     def is_empty(self) -> bool:
         return self.root is None
+
+    def build_index(self) -> "DailyMaterialIndex":
+        return DailyMaterialIndex(self)
+
+
+class DailyMaterialIndex:
+    """
+    每日素材倒排索引
+
+    加载时遍历一次 MaterialsData，之后的查询均为字典查找；
+    星期几从 0 开始，0 为周一，6 为周日
+    """
+
+    def __init__(self, data: "MaterialsData"):
+        self.material_weekdays: Dict[str, Tuple[int, ...]] = {}
+        """素材名称 -> 可以刷的星期几"""
+        self.material_areas: Dict[str, Tuple[str, ...]] = {}
+        """素材名称 -> 所在国家"""
+        self.item_materials: Dict[str, Tuple[str, ...]] = {}
+        """角色/武器 ID -> 天赋/突破素材名称"""
+        self.item_weekdays: Dict[str, Tuple[int, ...]] = {}
+        """角色/武器 ID -> 可以刷素材的星期几"""
+        self.weekday_avatars: Dict[int, FrozenSet[str]] = {}
+        """星期几 -> 可以刷天赋素材的角色 ID"""
+        self.weekday_weapons: Dict[int, FrozenSet[str]] = {}
+        """星期几 -> 可以刷突破素材的武器 ID"""
+        self.weekday_items: Dict[int, FrozenSet[str]] = {}
+        """星期几 -> 可以刷素材的角色与武器 ID"""
+        self.weekday_materials: Dict[int, FrozenSet[str]] = {}
+        """星期几 -> 可以刷的素材名称"""
+        if not data.is_empty():
+            self._build(data)
+
+    def _build(self, data: "MaterialsData"):
+        material_weekdays: Dict[str, Set[int]] = {}
+        material_areas: Dict[str, Dict[str, None]] = {}
+        item_materials: Dict[str, Set[str]] = {}
+        item_weekdays: Dict[str, Set[int]] = {}
+        for weekday, areas in enumerate(data.root):
+            avatars, weapons, materials = set(), set(), set()
+            for area, area_data in areas.items():
+                for ids, names, target in (
+                    (area_data.avatar, area_data.avatar_materials, avatars),
+                    (area_data.weapon, area_data.weapon_materials, weapons),
+                ):
+                    materials.update(names)
+                    target.update(ids)
+                    for name in names:
+                        material_weekdays.setdefault(name, set()).add(weekday)
+                        material_areas.setdefault(name, {})[area] = None
+                    for item_id in ids:
+                        item_weekdays.setdefault(item_id, set()).add(weekday)
+                        # 周日所有素材都能刷，取各天的交集得到物品实际需要的素材
+                        if item_id in item_materials:
+                            item_materials[item_id].intersection_update(names)
+                        else:
+                            item_materials[item_id] = set(names)
+            self.weekday_avatars[weekday] = frozenset(avatars)
+            self.weekday_weapons[weekday] = frozenset(weapons)
+            self.weekday_items[weekday] = frozenset(avatars | weapons)
+            self.weekday_materials[weekday] = frozenset(materials)
+        self.material_weekdays = {k: tuple(sorted(v)) for k, v in material_weekdays.items()}
+        self.material_areas = {k: tuple(v) for k, v in material_areas.items()}
+        self.item_materials = {k: tuple(sorted(v)) for k, v in item_materials.items()}
+        self.item_weekdays = {k: tuple(sorted(v)) for k, v in item_weekdays.items()}
+
+    def get_material_weekdays(self, name: str) -> Tuple[int, ...]:
+        return self.material_weekdays.get(name, ())
+
+    def get_material_areas(self, name: str) -> Tuple[str, ...]:
+        return self.material_areas.get(name, ())
+
+    def get_item_materials(self, item_id: str) -> Tuple[str, ...]:
+        return self.item_materials.get(str(item_id), ())
+
+    def get_item_weekdays(self, item_id: str) -> Tuple[int, ...]:
+        return self.item_weekdays.get(str(item_id), ())
+
+    def get_weekday_items(self, weekday: int) -> FrozenSet[str]:
+        """当日可以刷素材的所有角色与武器 ID"""
+        return self.weekday_items.get(weekday, frozenset())
+
+    def get_weekday_materials(self, weekday: int) -> FrozenSet[str]:
+        return self.weekday_materials.get(weekday, frozenset())
@@ -1,10 +1,127 @@
-from typing import Any
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import core_schema
 
 from ..base import APIModel
+from .daily_material import MaterialsData
+
+
+class RoleMaterialData(APIModel):
+    """角色培养素材原始数据，仅用于校验"""
+
+    id: str = ""
+    """角色 ID"""
+    ascension_materials: str = ""
+    """突破宝石"""
+    level_up_materials: str = ""
+    """突破 boss 材料"""
+    materials: List[str] = []
+    """地区特产与怪物掉落"""
+    talent: List[str] = []
+    """天赋书系列与周本材料"""
+    cumulative: Dict[str, Dict[str, int]] = {}
+    """消耗合计"""
+
+
+class RolesMaterialData(APIModel):
+    status: int = 0
+    data: Dict[str, RoleMaterialData] = {}
+    """角色名称 -> 培养素材"""
+
+
+class RoleMaterial:
+    """单个角色的培养素材，素材名称经过驻留，多个角色共享同一字符串"""
+
+    __slots__ = ("id", "name", "ascension_materials", "level_up_materials", "materials", "talent", "cumulative")
+
+    def __init__(
+        self,
+        id: str,  # pylint: disable=W0622
+        name: str,
+        ascension_materials: str,
+        level_up_materials: str,
+        materials: Tuple[str, ...],
+        talent: Tuple[str, ...],
+        cumulative: Dict[str, Dict[str, int]],
+    ):
+        self.id = id
+        self.name = name
+        self.ascension_materials = ascension_materials
+        self.level_up_materials = level_up_materials
+        self.materials = materials
+        self.talent = talent
+        self.cumulative = cumulative
+
+    @classmethod
+    def from_data(cls, name: str, data: "RoleMaterialData") -> "RoleMaterial":
+        intern = sys.intern
+        return cls(
+            id=data.id,
+            name=intern(name),
+            ascension_materials=intern(data.ascension_materials),
+            level_up_materials=intern(data.level_up_materials),
+            materials=tuple(intern(i) for i in data.materials),
+            talent=tuple(intern(i) for i in data.talent),
+            cumulative={k: {intern(i): c for i, c in v.items()} for k, v in data.cumulative.items()},
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "ascension_materials": self.ascension_materials,
+            "level_up_materials": self.level_up_materials,
+            "materials": list(self.materials),
+            "talent": list(self.talent),
+            "cumulative": self.cumulative,
+        }
+
+    def __repr__(self) -> str:
+        return f"RoleMaterial(id={self.id!r}, name={self.name!r})"
+
+
+class RolesMaterial:
+    """角色培养素材表，按角色 ID 与名称索引"""
+
+    __slots__ = ("status", "items", "id_map", "name_map")
+
+    def __init__(self, items: List["RoleMaterial"], status: int = 0):
+        self.status = status
+        self.items: Tuple["RoleMaterial", ...] = tuple(items)
+        self.id_map: Dict[str, "RoleMaterial"] = {i.id: i for i in self.items if i.id}
+        self.name_map: Dict[str, "RoleMaterial"] = {i.name: i for i in self.items}
+
+    @classmethod
+    def from_data(cls, data: "RolesMaterialData") -> "RolesMaterial":
+        return cls([RoleMaterial.from_data(k, v) for k, v in data.data.items()], data.status)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"status": self.status, "data": {i.name: i.to_dict() for i in self.items}}
+
+    def get_by_id(self, avatar_id: str) -> Optional["RoleMaterial"]:
+        return self.id_map.get(str(avatar_id))
+
+    def get_by_name(self, name: str) -> Optional["RoleMaterial"]:
+        return self.name_map.get(name)
+
+    def __iter__(self) -> Iterator["RoleMaterial"]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: "GetCoreSchemaHandler") -> "core_schema.CoreSchema":
+        return core_schema.no_info_after_validator_function(
+            cls.from_data,
+            handler.generate_schema(RolesMaterialData),
+            serialization=core_schema.plain_serializer_function_ser_schema(lambda v: v.to_dict()),
+        )
 
 
 class Other(APIModel):
-    daily_material: Any
-    """每日素材表"""
-    roles_material: Any
-    """角色培养素材"""
+    daily_material: Optional[MaterialsData] = None
+    """每日素材表，对应爬虫未运行或失败时为空"""
+    roles_material: Optional[RolesMaterial] = None
+    """角色培养素材，对应爬虫未运行或失败时为空"""
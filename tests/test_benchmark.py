@@ -0,0 +1,28 @@
+from impl.benchmark.harness import REDIRECTED_PATHS, BenchmarkHarness, BenchmarkResult
+
+
+def make_result(name, wall_time, peak_rss=None):
+    result = BenchmarkResult(name)
+    result.wall_time = wall_time
+    result.peak_rss = peak_rss
+    return result
+
+
+def test_paths_redirected_and_restored(tmp_path):
+    origin = [getattr(module, name) for module, name, _ in REDIRECTED_PATHS]
+    with BenchmarkHarness(tmp_path / "fixtures", work_dir=tmp_path / "work") as harness:
+        harness._use_work_dir("spider")
+        for module, name, _ in REDIRECTED_PATHS:
+            assert getattr(module, name).is_relative_to(tmp_path / "work" / "spider"), name
+    assert [getattr(module, name) for module, name, _ in REDIRECTED_PATHS] == origin
+
+
+def test_compare_peak_rss_only_for_total():
+    baseline = [
+        {"name": "A", "wall_time": 1.0, "cpu_total": 0, "cpu_parse": 0, "peak_rss_kb": 100},
+        {"name": "total", "wall_time": 2.0, "cpu_total": 0, "cpu_parse": 0, "peak_rss_kb": 100},
+    ]
+    # 单个爬虫不报告峰值内存，旧基线中的值不参与比较
+    assert BenchmarkHarness.compare([make_result("A", 1.0)], baseline) == []
+    assert BenchmarkHarness.compare([make_result("total", 2.0, 200)], baseline) == ["total peak_rss_kb: 100 -> 200"]
+    assert "-" in BenchmarkHarness.format_results([make_result("A", 1.0)]).splitlines()[-1]
@@ -0,0 +1,78 @@
+import pytest
+
+from impl.core.bundle import BundleItems, BundleMapping, BundleReader, BundleWriter
+from impl.models.genshin.weapon import Weapon
+
+NAMES = ["天空之翼", "弓藏", "阿莫斯之弓", "绝弦", "西风猎弓"]
+
+
+def make_weapons():
+    return [
+        Weapon(id=15500 - i, name=name, en_name=f"Bow {i}", rank=4, weapon_type="WEAPON_BOW", description="")
+        for i, name in enumerate(NAMES)
+    ]
+
+
+@pytest.fixture
+def reader(tmp_path):
+    path = tmp_path / "weapon.bin"
+    path.write_bytes(BundleWriter.build(make_weapons()))
+    reader = BundleReader(path)
+    yield reader
+    reader.close()
+
+
+def test_round_trip(reader):
+    weapons = make_weapons()
+    assert len(reader) == len(weapons)
+    for i, weapon in enumerate(weapons):
+        assert reader.get_id(i) == str(weapon.id)
+        assert reader.get_name(i) == weapon.name
+        assert Weapon.model_validate(reader.get_document(i)) == weapon
+
+
+def test_binary_search(reader):
+    for i, name in enumerate(NAMES):
+        assert reader.find_by_id(str(15500 - i)) == i
+        assert reader.find_by_name(name) == i
+    # 比最小值小、比最大值大以及落在中间的缺失项
+    for missing in ("0", "15498x", "99999"):
+        assert reader.find_by_id(missing) is None
+    assert reader.find_by_name("不存在") is None
+
+
+def test_empty_bundle(tmp_path):
+    path = tmp_path / "empty.bin"
+    path.write_bytes(BundleWriter.build([]))
+    reader = BundleReader(path)
+    assert len(reader) == 0
+    assert reader.find_by_id("1") is None
+    reader.close()
+
+
+def test_bad_magic(tmp_path):
+    path = tmp_path / "weapon.bin"
+    data = bytearray(BundleWriter.build(make_weapons()))
+    data[:4] = b"XXXX"
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        BundleReader(path)
+
+
+def test_items_and_mapping(reader):
+    items = BundleItems(reader, Weapon.model_validate)
+    assert [i.name for i in items[1:3]] == NAMES[1:3]
+    assert items[-1].name == NAMES[-1]
+    assert items[0] is items[0]
+    with pytest.raises(IndexError):
+        _ = items[len(NAMES)]
+
+    by_id = BundleMapping(items)
+    assert by_id["15499"].name == NAMES[1]
+    assert 15499 in by_id
+    assert "1" not in by_id
+    with pytest.raises(KeyError):
+        _ = by_id["1"]
+    by_name = BundleMapping(items, by_name=True)
+    assert by_name["绝弦"].id == "15497"
+    assert list(by_name) == NAMES
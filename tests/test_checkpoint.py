@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from impl.config import config
+from impl.core import checkpoint
+from impl.core.checkpoint import CheckpointStore
+from impl.core.disk_writer import DiskWriter
+from impl.models.enums import DataType, Game
+
+UNIT = (Game.GENSHIN, DataType.WEAPON, "HoneyWeaponSpider")
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_ROOT", tmp_path)
+    monkeypatch.setattr(config, "RESUME", True)
+    monkeypatch.setattr(config, "WRITE_BEHIND", True)
+    yield tmp_path
+    DiskWriter.stop()
+
+
+def test_resume_items_then_output():
+    async def main():
+        await CheckpointStore.save_item(*UNIT, "1", {"id": 1})
+        await CheckpointStore.save_item(*UNIT, "2", {"id": 2})
+        # 中断后恢复：读取时等待尚未落盘的追加
+        assert await CheckpointStore.load_items(*UNIT) == {"1": {"id": 1}, "2": {"id": 2}}
+        assert not CheckpointStore.is_done(*UNIT)
+
+        await CheckpointStore.save_item(*UNIT, "3", {"id": 3})
+        await CheckpointStore.save_output(*UNIT, b"[1, 2, 3]")
+        # 不经过 flush，单元输出已经落盘，逐条检查点才被删除
+        assert CheckpointStore.get_unit_path(*UNIT).read_bytes() == b"[1, 2, 3]"
+        assert not CheckpointStore.get_unit_path(*UNIT, ".items.jsonl").exists()
+        assert await DiskWriter.flush() == []
+
+    asyncio.run(main())
+    DiskWriter.stop()
+
+    async def restore():
+        assert CheckpointStore.is_done(*UNIT)
+        assert await CheckpointStore.load_output(*UNIT) == b"[1, 2, 3]"
+        assert await CheckpointStore.load_items(*UNIT) == {}
+
+    asyncio.run(restore())
+
+
+def test_failed_output_keeps_items():
+    async def main():
+        await CheckpointStore.save_item(*UNIT, "1", {"id": 1})
+        # 输出路径被目录占用，替换失败
+        CheckpointStore.get_unit_path(*UNIT).mkdir()
+        await CheckpointStore.save_output(*UNIT, b"[1]")
+        assert await DiskWriter.flush() == [CheckpointStore.get_unit_path(*UNIT)]
+        assert await CheckpointStore.load_items(*UNIT) == {"1": {"id": 1}}
+
+    asyncio.run(main())
+
+
+def test_without_write_behind(monkeypatch):
+    monkeypatch.setattr(config, "WRITE_BEHIND", False)
+
+    async def main():
+        await CheckpointStore.save_item(*UNIT, "1", {"id": 1})
+        assert await CheckpointStore.load_items(*UNIT) == {"1": {"id": 1}}
+        await CheckpointStore.save_output(*UNIT, b"[1]")
+        assert await CheckpointStore.load_output(*UNIT) == b"[1]"
+        assert await CheckpointStore.load_items(*UNIT) == {}
+
+    asyncio.run(main())
@@ -0,0 +1,169 @@
+import asyncio
+import threading
+
+import pytest
+import ujson
+
+from impl.models.base import IconAsset
+from impl.models.enums import DataType, Game
+from impl.models.genshin.weapon import Weapon
+
+# 素材服务依赖 bot 的运行环境（utils 等），单独运行爬虫时跳过
+client = pytest.importorskip("impl.client")
+
+ICON = {
+    "png": {"url": "https://origin.com/a.png", "path": "data/raw/genshin/character/ambr/a.png"},
+    "webp": {"url": "https://origin.com/a.webp", "path": "data/raw/genshin/character/ambr/a.webp"},
+}
+
+
+class _Service(client._AssetsService):
+    game = Game.GENSHIN
+    data_type = DataType.CHARACTER
+    BASE_URL = "https://mirror.com/"
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(client, "ASSETS_PATH", tmp_path)
+    service = _Service()
+    service.host_stats = client._HostStats()
+    return service
+
+
+def fake_download(service, available):
+    """只有 available 中的地址可以下载"""
+    requested = []
+
+    async def download(url, path, retry=5):
+        requested.append(url)
+        if url not in available:
+            raise client.RequestError("GET", url, 404)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(url.encode())
+        return path
+
+    service._download = download
+    return requested
+
+
+def test_source_order(service):
+    icon = IconAsset.model_validate(ICON)
+    sources = [(url, path.name) for url, path in service._get_icon_sources(icon)]
+    # 分数相同时镜像优先、png 优先
+    assert sources == [
+        ("https://mirror.com/data/raw/genshin/character/ambr/a.png", "a.png"),
+        ("https://mirror.com/data/raw/genshin/character/ambr/a.webp", "a.webp"),
+        ("https://origin.com/a.png", "a.png"),
+        ("https://origin.com/a.webp", "a.webp"),
+    ]
+    service.host_stats.record("mirror.com", 0.0, False)
+    assert [url for url, _ in service._get_icon_sources(icon)][:2] == [
+        "https://origin.com/a.png",
+        "https://origin.com/a.webp",
+    ]
+
+
+def test_fallback_saved_with_its_extension(service):
+    icon = IconAsset.model_validate(ICON)
+    requested = fake_download(service, {"https://mirror.com/data/raw/genshin/character/ambr/a.webp"})
+    path = asyncio.run(service._download_icon(icon))
+    assert path.name == "a.webp"
+    assert path.read_bytes().endswith(b"a.webp")
+    assert service._get_icon_path(icon) == path
+    assert requested == [
+        "https://mirror.com/data/raw/genshin/character/ambr/a.png",
+        "https://mirror.com/data/raw/genshin/character/ambr/a.webp",
+    ]
+    # 已经存在的格式不再下载
+    assert asyncio.run(service._download_icon(icon)) == path
+    assert len(requested) == 2
+
+
+def test_origin_fallback_and_all_failed(service):
+    icon = IconAsset.model_validate(ICON)
+    fake_download(service, {"https://origin.com/a.png"})
+    assert asyncio.run(service._download_icon(icon)).name == "a.png"
+
+    other = IconAsset.model_validate({"png": {"url": "", "path": "data/raw/genshin/character/ambr/b.png"}})
+    requested = fake_download(service, set())
+    path = asyncio.run(service._download_icon(other))
+    # 全部失败时返回首选格式的路径
+    assert path.name == "b.png"
+    assert not path.exists()
+    assert requested == ["https://mirror.com/data/raw/genshin/character/ambr/b.png"]
+
+
+class _WeaponService(client._AssetsService):
+    game = Game.GENSHIN
+    data_type = DataType.WEAPON
+    data_model = Weapon
+
+
+def weapon_data(name):
+    return {"id": "1", "name": name, "en_name": "", "rank": 4, "weapon_type": "WEAPON_BOW", "description": ""}
+
+
+@pytest.fixture
+def weapon_service(tmp_path, monkeypatch):
+    monkeypatch.setattr(client, "ASSETS_PATH", tmp_path)
+    service = _WeaponService()
+    service.data_path.write_text(ujson.dumps([weapon_data("弓藏")], ensure_ascii=False), encoding="utf-8")
+    parsed = []
+    read_metadata = service._sync_read_metadata
+
+    def _sync_read_metadata(datas):
+        parsed.append(threading.current_thread() is threading.main_thread())
+        read_metadata(datas)
+
+    service._sync_read_metadata = _sync_read_metadata
+    return service, parsed
+
+
+def test_concurrent_first_call(weapon_service):
+    service, parsed = weapon_service
+
+    async def main():
+        # 依赖注入只创建实例，首次的 load 与 initialize 并发时只读取一次
+        await asyncio.gather(service.load(), service.initialize(False), service.load())
+
+    asyncio.run(main())
+    assert parsed == [False]
+    assert service.loaded
+    assert service.get_by_name("弓藏").id == "1"
+    # 已经读取过的实例同步获取时不再读取
+    service.ensure_loaded()
+    assert parsed == [False]
+
+
+def test_force_reload(weapon_service):
+    service, parsed = weapon_service
+    asyncio.run(service.load())
+    service.data_path.write_text(ujson.dumps([weapon_data("绝弦")], ensure_ascii=False), encoding="utf-8")
+    asyncio.run(service.load())
+    assert service.get_name_list() == ["弓藏"]
+    asyncio.run(service.load(force=True))
+    assert service.get_name_list() == ["绝弦"]
+    assert len(parsed) == 2
+
+
+def test_empty_service(weapon_service):
+    service, parsed = weapon_service
+    service.data_path.unlink()
+    # 未读取数据时为空，查询不抛出 AttributeError
+    assert service.get_by_id(1) is None
+    assert service.get_name_list() == []
+    asyncio.run(service.load())
+    assert service.loaded
+    assert parsed == []
+
+
+def test_other_assets_empty(tmp_path, monkeypatch):
+    genshin = pytest.importorskip("impl.genshin")
+    monkeypatch.setattr(client, "ASSETS_PATH", tmp_path)
+    other = genshin._OtherAssets()
+    # 数据读取之前查询返回空结果
+    assert other.get_roles_material() is None
+    assert other.get_role_material("10000002") is None
+    assert other.get_daily_material() is None
+    assert other.get_material_weekdays("「自由」的教导") == ()
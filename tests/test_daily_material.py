@@ -0,0 +1,43 @@
+from impl.models.genshin.daily_material import AreaDailyMaterialsData, MaterialsData
+
+DAY1 = AreaDailyMaterialsData(avatar_materials=["自由"], avatar=["1"], weapon_materials=["高塔"], weapon=["11"])
+DAY2 = AreaDailyMaterialsData(avatar_materials=["抗争"], avatar=["2"], weapon_materials=["狮牙"], weapon=["12"])
+ALL = AreaDailyMaterialsData(
+    avatar_materials=["自由", "抗争"], avatar=["1", "2"], weapon_materials=["高塔", "狮牙"], weapon=["11", "12"]
+)
+
+
+def build():
+    # 周一、周二与周日（所有素材都能刷）
+    days = [{"蒙德": DAY1}, {"蒙德": DAY2}] + [{}] * 4 + [{"蒙德": ALL, "璃月": ALL}]
+    return MaterialsData(days).build_index()
+
+
+def test_material_lookup():
+    index = build()
+    assert index.get_material_weekdays("自由") == (0, 6)
+    assert index.get_material_areas("自由") == ("蒙德", "璃月")
+    assert index.get_material_weekdays("未知") == ()
+
+
+def test_item_lookup():
+    index = build()
+    # 周日出现的素材不计入物品实际需要的素材
+    assert index.get_item_materials("1") == ("自由",)
+    assert index.get_item_materials(11) == ("高塔",)
+    assert index.get_item_weekdays("2") == (1, 6)
+    assert index.get_item_materials("3") == ()
+
+
+def test_weekday_lookup():
+    index = build()
+    assert index.get_weekday_items(0) == {"1", "11"}
+    assert index.get_weekday_materials(1) == {"抗争", "狮牙"}
+    assert index.get_weekday_items(3) == frozenset()
+    assert index.get_weekday_items(6) == {"1", "2", "11", "12"}
+
+
+def test_empty():
+    index = MaterialsData().build_index()
+    assert index.get_item_materials("1") == ()
+    assert index.get_weekday_items(0) == frozenset()
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+import ujson
+
+from impl.config import config
+from impl.core import file_manager
+from impl.core.file_manager import FileManager
+from impl.core.metrics import Metrics
+
+
+@pytest.fixture(autouse=True)
+def executor(monkeypatch):
+    monkeypatch.setattr(config, "JSON_OFFLOAD_THRESHOLD", 16)
+    monkeypatch.setattr(config, "JSON_DECODE_EXECUTOR", "thread")
+    Metrics.reset()
+    yield
+    FileManager.shutdown_decode_executor()
+    Metrics.reset()
+
+
+def test_small_content_inline():
+    assert asyncio.run(FileManager.decode_json(b'{"a": 1}')) == {"a": 1}
+    # 小于阈值时直接解析，不创建执行器，不记录指标
+    assert FileManager._decode_executor is None
+    assert "json_decode_offload_bytes_total" not in Metrics.counters
+
+
+def test_large_content_offloaded():
+    content = ujson.dumps({"name": "弓藏" * 10}).encode("utf-8")
+    assert asyncio.run(FileManager.decode_json(content)) == {"name": "弓藏" * 10}
+    assert isinstance(FileManager._decode_executor, ThreadPoolExecutor)
+    assert Metrics.counters["json_decode_offload_bytes_total"][()] == len(content)
+    assert Metrics.histograms["json_decode_offload_duration_seconds"][()].count == 1
+
+
+def test_loop_not_blocked(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    loads = ujson.loads
+
+    def slow_loads(content):
+        started.set()
+        # 解析在执行器中阻塞，直到事件循环中的其他协程放行
+        assert release.wait(5)
+        return loads(content)
+
+    monkeypatch.setattr(file_manager.ujson, "loads", slow_loads)
+
+    async def main():
+        task = asyncio.create_task(FileManager.decode_json(b'{"items": [1, 2, 3, 4, 5]}'))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        assert not task.done()
+        release.set()
+        return await task
+
+    assert asyncio.run(main()) == {"items": [1, 2, 3, 4, 5]}
+
+
+def test_process_executor(monkeypatch):
+    monkeypatch.setattr(config, "JSON_DECODE_EXECUTOR", "process")
+    monkeypatch.setattr(config, "JSON_DECODE_WORKERS", 1)
+    assert asyncio.run(FileManager.decode_json(b'{"items": [1, 2, 3, 4, 5]}')) == {"items": [1, 2, 3, 4, 5]}
+    assert isinstance(FileManager._decode_executor, ProcessPoolExecutor)
+
+
+def test_load_json(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "WRITE_BEHIND", False)
+    file_path = tmp_path / "data.json"
+    data = {"id": 1, "name": "绝弦" * 10}
+
+    async def main():
+        await FileManager.save_json(file_path, data)
+        return await FileManager.load_json(file_path)
+
+    assert asyncio.run(main()) == data
+    assert Metrics.counters["json_decode_offload_bytes_total"][()] == file_path.stat().st_size
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+
+import pytest
+
+from impl.config import config
+from impl.core.disk_writer import DiskWriter
+from impl.core.file_manager import FileManager
+
+
+@pytest.fixture(autouse=True)
+def writer(monkeypatch):
+    monkeypatch.setattr(config, "WRITE_BEHIND", True)
+    monkeypatch.setattr(config, "WRITE_THREADS", 4)
+    monkeypatch.setattr(config, "WRITE_FSYNC", "none")
+    yield
+    DiskWriter.stop()
+    DiskWriter._errors = []
+
+
+def record_writes(monkeypatch):
+    """记录写线程实际执行写入的顺序"""
+    written = []
+    write_file, append_file = DiskWriter._write_file, DiskWriter._append_file
+
+    def _write_file(path, content):
+        write_file(path, content)
+        written.append((path, content))
+
+    def _append_file(path, content):
+        append_file(path, content)
+        written.append((path, content))
+
+    monkeypatch.setattr(DiskWriter, "_write_file", staticmethod(_write_file))
+    monkeypatch.setattr(DiskWriter, "_append_file", staticmethod(_append_file))
+    return written
+
+
+def test_order_within_directory(tmp_path, monkeypatch):
+    written = record_writes(monkeypatch)
+    submitted = []
+
+    async def main():
+        for i in range(20):
+            for d in ("a", "b", "c"):
+                path = tmp_path / d / f"{i % 3}.json"
+                content = f"{d}{i}".encode()
+                submitted.append((path, content))
+                await FileManager.save_file(path, content)
+        return await DiskWriter.flush()
+
+    assert asyncio.run(main()) == []
+    # 不同目录可能由不同线程并行写入，同一目录内按提交顺序写入
+    for d in ("a", "b", "c"):
+        directory = tmp_path / d
+        assert [i for i in written if i[0].parent == directory] == [i for i in submitted if i[0].parent == directory]
+        # 同一路径最后一次提交的内容生效
+        assert (directory / "0.json").read_bytes() == f"{d}18".encode()
+        assert (directory / "2.json").read_bytes() == f"{d}17".encode()
+    assert not list(tmp_path.glob("*/*.tmp"))
+
+
+def test_append_and_replace_order(tmp_path):
+    path = tmp_path / "unit" / "items.jsonl"
+
+    async def main():
+        await FileManager.append_file(path, b"1\n")
+        await FileManager.append_file(path, b"2\n")
+        # 整体替换之后的追加写在替换后的内容之后
+        await FileManager.save_file(path, b"0\n")
+        await FileManager.append_file(path, b"3\n")
+        return await DiskWriter.flush()
+
+    assert asyncio.run(main()) == []
+    assert path.read_bytes() == b"0\n3\n"
+
+
+def test_read_after_write(tmp_path, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    write_file = DiskWriter._write_file
+
+    def _write_file(path, content):
+        started.set()
+        assert release.wait(5)
+        write_file(path, content)
+
+    monkeypatch.setattr(DiskWriter, "_write_file", staticmethod(_write_file))
+    path = tmp_path / "data.json"
+
+    async def main():
+        await FileManager.save_file(path, b"content")
+        assert DiskWriter.is_pending(path)
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        assert not path.exists()
+        # 读取尚未落盘的文件时等待写入完成
+        task = asyncio.create_task(FileManager.load_file(path))
+        await asyncio.sleep(0.05)
+        assert not task.done()
+        release.set()
+        content = await task
+        assert not DiskWriter.is_pending(path)
+        assert await DiskWriter.wait_for(path)
+        return content
+
+    assert asyncio.run(main()) == b"content"
+
+
+def test_flush_reports_errors(tmp_path, capsys):
+    (tmp_path / "file").write_bytes(b"")
+    bad = tmp_path / "file" / "data.json"
+    good = tmp_path / "dir" / "data.json"
+
+    async def main():
+        await FileManager.save_file(bad, b"bad")
+        await FileManager.save_file(good, b"good")
+        assert not await DiskWriter.wait_for(bad)
+        assert await DiskWriter.wait_for(good)
+        errors = await DiskWriter.flush()
+        # 失败记录在 flush 时清空，下一次 flush 不重复报告
+        return errors, await DiskWriter.flush()
+
+    errors, again = asyncio.run(main())
+    assert errors == [bad]
+    assert again == []
+    assert good.read_bytes() == b"good"
+    assert capsys.readouterr().out.startswith(f"写入文件失败：{bad} ")
+
+
+def test_queue_bound(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "WRITE_QUEUE_SIZE", 1)
+    release = threading.Event()
+    write_file = DiskWriter._write_file
+
+    def _write_file(path, content):
+        assert release.wait(5)
+        write_file(path, content)
+
+    monkeypatch.setattr(DiskWriter, "_write_file", staticmethod(_write_file))
+
+    async def main():
+        await FileManager.save_file(tmp_path / "1.json", b"1")
+        # 队列已满，第二次保存等待第一次写入完成
+        task = asyncio.create_task(FileManager.save_file(tmp_path / "2.json", b"2"))
+        await asyncio.sleep(0.05)
+        assert not task.done()
+        release.set()
+        await task
+        return await DiskWriter.flush()
+
+    assert asyncio.run(main()) == []
+    assert (tmp_path / "2.json").read_bytes() == b"2"
@@ -0,0 +1,69 @@
+import datetime
+from typing import List, Optional, Union
+
+import pytest
+import ujson
+
+from impl.models.base import APIModel, DateTimeField, TimeDeltaField
+from impl.models.frozen import FrozenModelFactory
+from impl.models.genshin.character import Character
+from impl.models.genshin.weapon import Weapon
+
+# 与爬虫输出相同的 JSON，数字未经 pydantic 转换
+WEAPON = """{
+    "id": 15502, "name": "阿莫斯之弓", "en_name": "Amos' Bow", "rank": 5,
+    "attribute": {"type": "攻击力%", "value": "10.8%"},
+    "affix": {"name": "矢志不忘", "description": ["普通攻击与重击造成的伤害提高12%"]},
+    "ascension": ["104312", "112040"], "story": null,
+    "stats": [{"level": "1", "ATK": 46}, {"level": "20+", "ATK": 133.1, "bonus": "10.8%"}],
+    "weapon_type": "WEAPON_BOW", "description": "",
+    "icon": {"png": {"url": "https://example.com/a.png", "path": "data/raw/a.png"}}
+}"""
+CHARACTER = """{
+    "id": "10000002", "name": "神里绫华", "en_name": "Kamisato Ayaka", "rank": 5,
+    "element": "Ice", "weapon_type": "WEAPON_SWORD_ONE_HAND", "body_type": "BODY_GIRL",
+    "birthday": {"month": 9, "day": 28}, "association": "稻妻"
+}"""
+
+
+class Event(APIModel):
+    start: DateTimeField
+    duration: TimeDeltaField
+    value: Union[int, str]
+    scores: List[float] = []
+    limit: Optional[float] = None
+
+
+EVENT = """{"start": "2024-01-01T04:00:00", "duration": "3600", "value": "12", "scores": [1, 2.5], "limit": 3}"""
+
+
+def assert_same(frozen, model):
+    if isinstance(model, APIModel):
+        for name in type(model).model_fields:
+            assert_same(getattr(frozen, name), getattr(model, name))
+    elif isinstance(model, list):
+        assert isinstance(frozen, tuple)
+        assert len(frozen) == len(model)
+        for i, j in zip(frozen, model):
+            assert_same(i, j)
+    else:
+        assert type(frozen) is type(model), (frozen, model)
+        assert frozen == model
+
+
+@pytest.mark.parametrize("model, content", [(Weapon, WEAPON), (Character, CHARACTER), (Event, EVENT)])
+def test_matches_pydantic(model, content):
+    data = ujson.loads(content)
+    assert_same(FrozenModelFactory.from_data(model, data), model.model_validate(data))
+
+
+def test_annotated_validators():
+    event = FrozenModelFactory.from_data(Event, ujson.loads(EVENT))
+    assert event.start.tzinfo is not None
+    assert event.duration == datetime.timedelta(hours=1)
+    assert event.scores == (1.0, 2.5)
+
+
+def test_from_model_instance():
+    weapon = Weapon.model_validate(ujson.loads(WEAPON))
+    assert_same(FrozenModelFactory.from_data(Weapon, weapon), weapon)
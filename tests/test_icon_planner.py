@@ -0,0 +1,120 @@
+import asyncio
+
+import httpx
+import pytest
+
+from impl.config import config
+from impl.core import source_cache
+from impl.core._abstract_spider import RequestClient
+from impl.core.icon_planner import IconPlanner
+from impl.core.retry import RetryPolicy
+from impl.core.source_cache import NegativeCache
+from impl.models.genshin.weapon import Weapon
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """模拟图标服务器，记录请求与每个域名的最大并发"""
+    state = {"requests": [], "active": {}, "max_active": {}}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        state["requests"].append(str(request.url))
+        state["active"][host] = state["active"].get(host, 0) + 1
+        state["max_active"][host] = max(state["max_active"].get(host, 0), state["active"][host])
+        await asyncio.sleep(0.01)
+        state["active"][host] -= 1
+        if "404" in request.url.path:
+            return httpx.Response(404)
+        if "500" in request.url.path:
+            return httpx.Response(500)
+        return httpx.Response(200, content=request.url.path.encode())
+
+    monkeypatch.setattr(RequestClient, "client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    # 重试不等待
+    monkeypatch.setattr(RequestClient, "retry_policy", RetryPolicy(base_delay=0))
+    monkeypatch.setattr(source_cache, "SOURCE_CACHE_ROOT", tmp_path / "cache")
+    monkeypatch.setattr(config, "WRITE_BEHIND", False)
+    monkeypatch.setattr(config, "FORCE", False)
+    IconPlanner.reset()
+    NegativeCache.reset()
+    yield state
+    IconPlanner.reset()
+    NegativeCache.reset()
+
+
+def register(tmp_path, url, name, spider="A", optional=False, priority=100):
+    return IconPlanner.register(url, tmp_path / name, name, priority, optional, spider, "ambr")
+
+
+def test_same_url_downloaded_once(tmp_path, server):
+    register(tmp_path, "https://a.com/x.png", "a/x.png", spider="A")
+    register(tmp_path, "https://a.com/x.png", "b/x.png", spider="B")
+    assert asyncio.run(IconPlanner.execute()) == set()
+    assert server["requests"] == ["https://a.com/x.png"]
+    assert (tmp_path / "a/x.png").read_bytes() == (tmp_path / "b/x.png").read_bytes() == b"/x.png"
+    assert IconPlanner.intents == {}
+
+
+def test_existing_file_not_downloaded(tmp_path, server):
+    (tmp_path / "x.png").write_bytes(b"old")
+    register(tmp_path, "https://a.com/x.png", "x.png")
+    asyncio.run(IconPlanner.execute())
+    assert server["requests"] == []
+
+
+def test_host_concurrency(tmp_path, server, monkeypatch):
+    monkeypatch.setattr(config, "ICON_HOST_CONCURRENCY", 2)
+    monkeypatch.setattr(config, "ICON_CONCURRENCY", 3)
+    for host in ("a.com", "b.com"):
+        for i in range(6):
+            register(tmp_path, f"https://{host}/{i}.png", f"{host}/{i}.png", priority=i)
+    asyncio.run(IconPlanner.execute())
+    assert len(server["requests"]) == 12
+    assert server["max_active"] == {"a.com": 2, "b.com": 2}
+    # 同一域名内按优先级下载
+    assert [i for i in server["requests"] if "a.com" in i][:2] == ["https://a.com/0.png", "https://a.com/1.png"]
+
+
+def test_missing_icons_negative_cached(tmp_path, server):
+    register(tmp_path, "https://a.com/404.png", "404.png")
+    assert asyncio.run(IconPlanner.execute()) == {"404.png"}
+    assert IconPlanner.missing_spiders == {"A"}
+    assert IconPlanner.failed_spiders == set()
+
+    IconPlanner.reset()
+    register(tmp_path, "https://a.com/404.png", "404.png")
+    assert asyncio.run(IconPlanner.execute()) == {"404.png"}
+    # 有效期内不再请求
+    assert len(server["requests"]) == 1
+
+
+def test_failed_icons(tmp_path, server):
+    register(tmp_path, "https://a.com/500.png", "500.png", spider="A")
+    register(tmp_path, "https://b.com/500.png", "b500.png", spider="B", optional=True)
+    assert asyncio.run(IconPlanner.execute()) == {"500.png", "b500.png"}
+    # 可选图标失败不影响爬虫的指纹
+    assert IconPlanner.failed_spiders == {"A"}
+
+
+def make_icon(*formats):
+    return {fmt: {"url": f"https://a.com/x.{fmt}", "path": f"x.{fmt}"} for fmt in formats}
+
+
+def test_prune_model_and_dict():
+    IconPlanner.failed_paths.update({"x.png", "y.png"})
+    data = {"id": "1", "name": "a", "en_name": "", "rank": 4, "weapon_type": "WEAPON_BOW", "description": ""}
+    weapon = Weapon(**data, icon=make_icon("png", "webp"), awaken=make_icon("png"))
+    assert IconPlanner.prune([weapon])
+    assert weapon.icon.png is None
+    assert weapon.icon.webp.path == "x.webp"
+    assert weapon.awaken is None
+
+    raw = {**data, "icon": make_icon("png", "webp"), "awaken": make_icon("png"), "stats": [{"gacha": make_icon("png")}]}
+    assert IconPlanner.prune(raw)
+    assert raw["icon"] == {"png": None, "webp": {"url": "https://a.com/x.webp", "path": "x.webp"}}
+    assert raw["awaken"] is None
+    assert raw["stats"] == [{"gacha": None}]
+
+    IconPlanner.failed_paths.clear()
+    assert not IconPlanner.prune(raw)
@@ -0,0 +1,33 @@
+from impl.core._abstract_spider import SpiderManager
+from impl.models.base import get_list_adapter
+from impl.models.genshin.weapon import Weapon, WeaponAffix
+
+
+def make_weapon(**kwargs):
+    data = {"id": "1", "name": "弓藏", "en_name": "", "rank": 4, "weapon_type": "WEAPON_BOW", "description": ""}
+    data.update(kwargs)
+    return Weapon(**data)
+
+
+def test_adapter_is_cached():
+    assert get_list_adapter(Weapon) is get_list_adapter(Weapon)
+
+
+def test_adapter_round_trip():
+    adapter = get_list_adapter(Weapon)
+    weapons = [make_weapon(), make_weapon(id="2", name="绝弦/Stringless", affix={"name": "a", "description": ["b"]})]
+    data = adapter.dump_json(weapons)
+    assert adapter.validate_json(data) == weapons
+    # 与之前的 ujson 输出不同，"/" 不再转义
+    assert "绝弦/Stringless".encode("utf-8") in data
+
+
+def test_merge_model():
+    weapon = make_weapon(story="", affix=WeaponAffix(name="a", description=[]))
+    other = make_weapon(en_name="Slingshot", story="故事", rank=5, affix=WeaponAffix(name="b", description=["c"]))
+    SpiderManager.merge_model(weapon, other)
+    # 只补全为空的字段，嵌套模型递归合并
+    assert weapon.en_name == "Slingshot"
+    assert weapon.story == "故事"
+    assert weapon.rank == 4
+    assert weapon.affix == WeaponAffix(name="a", description=["c"])
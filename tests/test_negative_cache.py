@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+import ujson
+
+from impl.config import config
+from impl.core import source_cache
+from impl.core.source_cache import NegativeCache
+
+
+@pytest.fixture(autouse=True)
+def cache_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(source_cache, "SOURCE_CACHE_ROOT", tmp_path)
+    monkeypatch.setattr(config, "WRITE_BEHIND", False)
+    monkeypatch.setattr(config, "FORCE", False)
+    monkeypatch.setattr(config, "NEGATIVE_CACHE_TTL", 100)
+    NegativeCache.reset()
+    yield tmp_path
+    NegativeCache.reset()
+
+
+@pytest.fixture
+def now(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(source_cache.time, "time", lambda: clock[0])
+    return clock
+
+
+def test_ttl(now):
+    NegativeCache.add("Honey", "a", "weapon")
+    assert NegativeCache.is_missing("honey", "a")
+    assert not NegativeCache.is_missing("honey", "b")
+    now[0] += 100
+    assert not NegativeCache.is_missing("honey", "a")
+
+
+def test_force_ignores_cache(monkeypatch):
+    NegativeCache.add("honey", "a", "weapon")
+    monkeypatch.setattr(config, "FORCE", True)
+    assert not NegativeCache.is_missing("honey", "a")
+
+
+def test_has_expired(now):
+    NegativeCache.add("honey", "a", "weapon")
+    NegativeCache.add("honey", "b", "avatar")
+    now[0] += 100
+    NegativeCache.add("honey", "c", "avatar")
+    assert NegativeCache.has_expired("honey", "weapon")
+    assert not NegativeCache.has_expired("honey", "material")
+    assert NegativeCache.refreshing == {("honey", "weapon")}
+
+
+def test_save_drops_expired_refreshed_entries(now):
+    NegativeCache.add("honey", "a", "weapon")
+    NegativeCache.add("honey", "b", "avatar")
+    now[0] += 100
+    assert NegativeCache.has_expired("honey", "weapon")
+    asyncio.run(NegativeCache.save())
+
+    NegativeCache.reset()
+    # 重新请求过的爬虫的过期记录被删除，未重新请求的保留
+    assert set(NegativeCache._get_entries("honey")) == {"b"}
+
+
+def test_save_merges_other_processes(now):
+    NegativeCache.add("honey", "a", "weapon")
+    asyncio.run(NegativeCache.save())
+
+    # 本进程加载后新增 c 并删除 a，期间另一个进程写入了 b
+    NegativeCache.reset()
+    NegativeCache.add("honey", "c", "weapon")
+    NegativeCache.remove("honey", "a")
+    entry = {"expires": now[0] + 100, "spider": "weapon"}
+    NegativeCache.get_path("honey").write_text(ujson.dumps({"a": entry, "b": entry}))
+    asyncio.run(NegativeCache.save())
+
+    NegativeCache.reset()
+    assert set(NegativeCache._get_entries("honey")) == {"b", "c"}
+
+
+def test_remove_then_add():
+    NegativeCache.add("honey", "a", "weapon")
+    NegativeCache.remove("honey", "a")
+    NegativeCache.add("honey", "a", "weapon")
+    asyncio.run(NegativeCache.save())
+    NegativeCache.reset()
+    assert NegativeCache.is_missing("honey", "a")
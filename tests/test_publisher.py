@@ -0,0 +1,84 @@
+import os
+import shutil
+import time
+import zipfile
+
+import pytest
+
+from impl.assets_utils.path import ASSETS_CACHE_ROOT, ASSETS_DATA_RAW_ROOT
+from impl.core import publisher, source_cache
+from impl.core.publisher import Publisher, LocalBucket, ZIP_DATE_TIME
+
+
+@pytest.fixture
+def data_root(tmp_path, monkeypatch):
+    root = tmp_path / "data"
+    monkeypatch.setattr(publisher, "ASSETS_DATA_ROOT", root)
+    monkeypatch.setattr(publisher, "ASSETS_DATA_ARCHIVE_ROOT", root / "archive")
+    raw = root / "raw"
+    for name, content in (("character/ambr/a.png", b"a"), ("weapon/ambr/b.png", b"b"), ("character.json", b"[]")):
+        path = raw / "genshin" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    return raw
+
+
+def test_shard_key():
+    assert Publisher.get_shard_key("genshin/character/ambr/a.png") == "genshin/character"
+    assert Publisher.get_shard_key("genshin/character.json") == "genshin/_index"
+    assert Publisher.get_shard_key("manifest.json") == "_index"
+
+
+def test_source_cache_not_published():
+    # 爬虫的内部缓存不在 data/raw 下，不会进入清单、分片与全量归档
+    assert source_cache.SOURCE_CACHE_ROOT.is_relative_to(ASSETS_CACHE_ROOT)
+    assert not source_cache.SOURCE_CACHE_ROOT.is_relative_to(ASSETS_DATA_RAW_ROOT)
+
+
+def test_changed_shards(data_root):
+    empty = Publisher.load_manifest(data_root / "missing.json")
+    manifest = Publisher.build_manifest(data_root)
+    assert sorted(Publisher.get_changed_shards(empty, manifest)) == sorted(manifest["shards"])
+
+    Publisher.build_shards(data_root, manifest, list(manifest["shards"]))
+    assert Publisher.get_changed_shards(manifest, Publisher.build_manifest(data_root, manifest)) == []
+
+    (data_root / "genshin/weapon/ambr/b.png").write_bytes(b"changed")
+    new_manifest = Publisher.build_manifest(data_root, manifest)
+    assert Publisher.get_changed_shards(manifest, new_manifest) == ["genshin/weapon"]
+
+    # 归档丢失的分片需要重建
+    Publisher.get_shard_archive_path("genshin/_index").unlink()
+    assert Publisher.get_changed_shards(new_manifest, new_manifest) == ["genshin/_index"]
+
+
+def test_extracted_files_reuse_hash(data_root, monkeypatch):
+    manifest = Publisher.build_manifest(data_root)
+    path = data_root / "genshin/character.json"
+    mtime = time.mktime(ZIP_DATE_TIME + (0, 0, -1))
+    os.utime(path, (mtime, mtime))
+    monkeypatch.setattr(Publisher, "hash_file", staticmethod(lambda _: pytest.fail("rehashed")))
+    assert Publisher.build_manifest(data_root, manifest)["files"] == manifest["files"]
+
+
+def test_publish_restores_shards_from_bucket(data_root, tmp_path, monkeypatch):
+    bucket = LocalBucket(tmp_path / "bucket")
+    Publisher.publish(root=data_root, bucket=bucket)
+
+    # 新环境中只有全量归档，分片归档从存储桶取回
+    shutil.rmtree(data_root.parent)
+    data_root.mkdir(parents=True)
+    with zipfile.ZipFile(tmp_path / "bucket" / "raw" / "genshin.zip") as archive:
+        archive.extractall(data_root)
+    (data_root / "genshin/weapon/ambr/b.png").write_bytes(b"changed")
+
+    rebuilt = []
+    build_shards = Publisher.build_shards
+
+    def record(root, manifest, shard_keys, max_workers=None):
+        rebuilt.extend(shard_keys)
+        build_shards(root, manifest, shard_keys, max_workers)
+
+    monkeypatch.setattr(Publisher, "build_shards", staticmethod(record))
+    Publisher.publish(root=data_root, bucket=LocalBucket(tmp_path / "bucket"))
+    assert rebuilt == ["genshin/weapon"]
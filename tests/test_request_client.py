@@ -0,0 +1,119 @@
+import asyncio
+
+import httpx
+import pytest
+
+from impl.config import config
+from impl.core._abstract_spider import RequestClient
+from impl.core.retry import RequestError, RetryPolicy
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """模拟服务端，记录实际发出的请求"""
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append((request.method, request.url.path))
+        await asyncio.sleep(0.01)
+        path = request.url.path
+        if path.startswith("/404"):
+            return httpx.Response(404)
+        if path.startswith("/img"):
+            return httpx.Response(200, content=b"x" * 1000, headers={"content-type": "image/png"})
+        return httpx.Response(200, content=b"x" * 100, headers={"content-type": "application/json"})
+
+    monkeypatch.setattr(RequestClient, "client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(RequestClient, "retry_policy", RetryPolicy())
+    monkeypatch.setattr(RequestClient, "inflight", {})
+    monkeypatch.setattr(config, "REQUEST_CACHE_TTL", 60)
+    monkeypatch.setattr(config, "REQUEST_CACHE_MAX_BYTES", 1000)
+    monkeypatch.setattr(config, "REQUEST_CACHE_MAX_ITEM_BYTES", 500)
+    RequestClient.reset_cache()
+    yield calls
+    RequestClient.reset_cache()
+
+
+def request(url, method="GET", **kwargs):
+    return RequestClient.request(method, f"https://example.com{url}", **kwargs)
+
+
+def test_single_flight(calls):
+    async def main():
+        responses = await asyncio.gather(*[request("/a") for _ in range(5)])
+        assert all(i is responses[0] for i in responses)
+        # 完成后的相同请求命中缓存，方法名不区分大小写
+        assert await request("/a", "get") is responses[0]
+
+    asyncio.run(main())
+    assert calls == [("GET", "/a")]
+
+
+def test_cache_expires(calls, monkeypatch):
+    async def main():
+        await request("/a")
+        monkeypatch.setattr(config, "REQUEST_CACHE_TTL", 0)
+        RequestClient.reset_cache()
+        await request("/a")
+        await request("/a")
+
+    asyncio.run(main())
+    assert len(calls) == 3
+
+
+def test_no_cache(calls):
+    async def main():
+        await asyncio.gather(request("/a", "POST"), request("/a", "POST"))
+        await asyncio.gather(request("/b", cache=False), request("/b", cache=False))
+        await request("/b")
+
+    asyncio.run(main())
+    assert calls == [("POST", "/a")] * 2 + [("GET", "/b")] * 3
+
+
+def test_errors_are_shared_but_not_cached(calls):
+    async def main():
+        results = await asyncio.gather(*[request("/404", times=0) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(i, RequestError) for i in results)
+        with pytest.raises(RequestError):
+            await request("/404", times=0)
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_cancel_does_not_affect_other_callers(calls):
+    async def main():
+        first = asyncio.ensure_future(request("/a"))
+        second = asyncio.ensure_future(request("/a"))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert (await second).status_code == 200
+
+    asyncio.run(main())
+    assert len(calls) == 1
+
+
+def test_large_binary_not_cached(calls):
+    async def main():
+        await request("/img")
+        await request("/img")
+
+    asyncio.run(main())
+    assert len(calls) == 2
+    assert RequestClient.cache_bytes == 0
+
+
+def test_evict_least_recently_used(calls):
+    async def main():
+        for i in range(10):
+            await request(f"/{i}")
+        await request("/0")
+        # 缓存已满，再加入一个时淘汰最久未使用的 /1 而不是刚刚访问的 /0
+        await request("/10")
+        await request("/0")
+        await request("/1")
+
+    asyncio.run(main())
+    assert calls[10:] == [("GET", "/10"), ("GET", "/1")]
+    assert RequestClient.cache_bytes <= config.REQUEST_CACHE_MAX_BYTES
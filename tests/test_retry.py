@@ -0,0 +1,150 @@
+import asyncio
+
+import httpx
+import pytest
+
+from impl.core import retry
+from impl.core.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    """不实际等待，只记录等待时间"""
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(retry.asyncio, "sleep", sleep)
+    return delays
+
+
+def responses(*items):
+    items = list(items)
+    calls = []
+
+    async def send():
+        calls.append(1)
+        item = items.pop(0)
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    return send, calls
+
+
+def test_delay_is_bounded():
+    policy = RetryPolicy(base_delay=1, max_delay=4)
+    for attempt in range(10):
+        assert 0 <= policy.get_delay(attempt) <= 4
+    assert policy.get_delay(0, retry_after=10) == 10
+    assert policy.get_delay(0, retry_after=1000) == policy.max_retry_after
+
+
+def test_parse_retry_after():
+    assert RetryPolicy.parse_retry_after("3") == 3
+    assert RetryPolicy.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert RetryPolicy.parse_retry_after("soon") is None
+    assert RetryPolicy.parse_retry_after(None) is None
+
+
+def test_retry_statuses(no_sleep):
+    send, calls = responses(
+        httpx.Response(503),
+        httpx.Response(429, headers={"Retry-After": "7"}),
+        httpx.Response(200),
+    )
+    response = asyncio.run(RetryPolicy().execute("a.com", send))
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert no_sleep[1] == 7
+
+
+def test_client_error_is_not_retried():
+    send, calls = responses(httpx.Response(404))
+    assert asyncio.run(RetryPolicy().execute("a.com", send)).status_code == 404
+    assert len(calls) == 1
+
+
+def test_network_error_raised_after_attempts():
+    send, calls = responses(*[httpx.ConnectError("boom")] * 3)
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(RetryPolicy(max_attempts=3).execute("a.com", send))
+    assert len(calls) == 3
+
+
+def test_circuit_breaker_opens_and_recovers(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(retry.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=5, max_reset_timeout=8)
+    breaker.record_failure("a.com")
+    assert not breaker.is_open("a.com")
+    breaker.record_failure("a.com")
+    assert breaker.is_open("a.com")
+    # 打开期间等待超过上限
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(breaker.acquire("a.com", max_wait=1))
+
+    # 冷却结束后放行一个探测请求，探测失败冷却时间翻倍（不超过上限）
+    now[0] += 5
+    asyncio.run(breaker.acquire("a.com"))
+    assert breaker.probing["a.com"]
+    breaker.record_failure("a.com")
+    assert breaker.timeouts["a.com"] == 8
+
+    now[0] += 8
+    asyncio.run(breaker.acquire("a.com"))
+    breaker.record_success("a.com")
+    assert not breaker.is_open("a.com")
+
+
+def test_cancelled_request_keeps_others_probe(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(retry.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5)
+    policy = RetryPolicy(circuit_breaker=breaker)
+
+    async def main():
+        started = asyncio.Event()
+
+        async def send():
+            started.set()
+            await asyncio.Event().wait()
+
+        # 熔断器打开前发出的请求
+        task = asyncio.create_task(policy.execute("a.com", send))
+        await started.wait()
+        breaker.record_failure("a.com")
+        now[0] += 5
+        assert await breaker.acquire("a.com")
+        # 非探测请求被取消时不释放其他请求持有的探测权
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert breaker.probing["a.com"]
+
+    asyncio.run(main())
+
+
+def test_cancelled_probe_releases(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(retry.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5)
+    policy = RetryPolicy(circuit_breaker=breaker)
+    breaker.record_failure("a.com")
+    now[0] += 5
+
+    async def main():
+        started = asyncio.Event()
+
+        async def send():
+            started.set()
+            await asyncio.Event().wait()
+
+        task = asyncio.create_task(policy.execute("a.com", send))
+        await started.wait()
+        assert breaker.probing["a.com"]
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert not breaker.probing.get("a.com")
+
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+import ujson
+
+from impl._spiders.genshin.other import GenshinRoleMaterialSpider
+
+NAMES = {
+    "1": "神里绫华",
+    "101": "哀叙冰玉碎屑",
+    "102": "恒常机关之心",
+    "103": "绯樱绣球",
+    "104": "破损的刀镡",
+    "105": "影打刀镡",
+    "201": "「风雅」的教导",
+    "202": "「风雅」的哲学",
+    "203": "血玉之枝",
+}
+ASCENSION = [{"id": 101, "count": 1}, {"id": 102, "count": 2}, {"id": 103, "count": 3}, {"id": 104, "count": 4}]
+FILES = {
+    "avatar_data_path": [
+        {"id": 10000002, "nameTextMapHash": 1, "featureTagGroupID": 1, "avatarPromoteId": 2, "skillDepotId": 201}
+    ],
+    "material_data_path": [{"id": int(k), "nameTextMapHash": int(k)} for k in NAMES if k != "1"],
+    "avatar_promote_data_path": [
+        {"avatarPromoteId": 2, "promoteLevel": 1, "costItems": ASCENSION},
+        # costItems 不是 4 项的行跳过
+        {"avatarPromoteId": 2, "promoteLevel": 3, "costItems": ASCENSION[:3]},
+        {"avatarPromoteId": 2, "promoteLevel": 6, "costItems": ASCENSION},
+    ],
+    "avatar_skill_depot_data_path": [{"id": 201, "skills": [301, 302], "energySkill": 303}],
+    "avatar_skill_data_path": [{"id": 300 + i, "proudSkillGroupId": 400 + i} for i in (1, 2, 3)],
+    "proud_skill_data_path": [
+        row
+        for group in (401, 402, 403)
+        for row in (
+            {"proudSkillGroupId": group, "level": 2, "costItems": [{"id": 201, "count": 3}, {"id": 105, "count": 6}]},
+            {
+                "proudSkillGroupId": group,
+                "level": 10,
+                "costItems": [{"id": 202, "count": 1}, {"id": 105, "count": 2}, {"id": 203, "count": 1}],
+            },
+        )
+    ],
+}
+
+
+@pytest.fixture
+def spider(tmp_path):
+    spider = GenshinRoleMaterialSpider()
+    for attr, data in FILES.items():
+        p = tmp_path / f"{attr}.json"
+        p.write_text(ujson.dumps(data), encoding="utf-8")
+        setattr(spider, attr, p)
+    spider.zh_lang = NAMES
+    return spider
+
+
+def test_explode_and_group():
+    rows = FILES["avatar_promote_data_path"]
+    columns = GenshinRoleMaterialSpider.explode_cost_items(rows, "avatarPromoteId", "promoteLevel", 4)
+    assert columns["level"] == [1] * 4 + [6] * 4
+    assert columns["slot"] == [0, 1, 2, 3] * 2
+    totals = GenshinRoleMaterialSpider.group_sum(columns["key"], columns["id"], columns["count"])
+    assert totals == {2: {101: 2, 102: 4, 103: 6, 104: 8}}
+    assert GenshinRoleMaterialSpider.group_pick(columns, 6) == {2: {0: 101, 1: 102, 2: 103, 3: 104}}
+    # 不限制长度时保留所有行
+    columns = GenshinRoleMaterialSpider.explode_cost_items(rows, "avatarPromoteId", "promoteLevel")
+    assert len(columns["id"]) == 11
+
+
+def test_cumulative_totals(spider):
+    async def main():
+        await spider.get_name_list()
+        await spider.load_material_data()
+        await spider.get_up_data()
+        await spider.get_skill_data()
+
+    asyncio.run(main())
+    data = spider.data["data"]["神里绫华"]
+    assert data["ascension_materials"] == "哀叙冰玉碎屑"
+    assert data["level_up_materials"] == "恒常机关之心"
+    assert data["materials"] == ["绯樱绣球", "破损的刀镡"]
+    assert data["talent"] == ["风雅", "血玉之枝"]
+    assert data["cumulative"] == {
+        "ascension": {"哀叙冰玉碎屑": 2, "恒常机关之心": 4, "绯樱绣球": 6, "破损的刀镡": 8},
+        "talent": {"影打刀镡": 8, "「风雅」的教导": 3, "「风雅」的哲学": 1, "血玉之枝": 1},
+        "talents": {"影打刀镡": 24, "「风雅」的教导": 9, "「风雅」的哲学": 3, "血玉之枝": 3},
+    }
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from impl.core.scheduler import DependencyError, TaskGraph
+
+
+def make_task(order, name, result=None, error=None):
+    async def func():
+        order.append(name)
+        if error is not None:
+            raise error
+        return result
+
+    return func
+
+
+def test_duplicate_task():
+    graph = TaskGraph()
+    graph.add("a", make_task([], "a"))
+    with pytest.raises(ValueError):
+        graph.add("a", make_task([], "a"))
+
+
+def test_unknown_dependency():
+    graph = TaskGraph()
+    graph.add("a", make_task([], "a"), depends_on=["b"])
+    with pytest.raises(DependencyError, match="unknown"):
+        graph.check()
+
+
+def test_cycle():
+    graph = TaskGraph()
+    graph.add("a", make_task([], "a"), depends_on=["c"])
+    graph.add("b", make_task([], "b"), depends_on=["a"])
+    graph.add("c", make_task([], "c"), depends_on=["b"])
+    graph.add("d", make_task([], "d"))
+    with pytest.raises(DependencyError, match="a -> c -> b -> a"):
+        graph.check()
+    # 有环时不执行任何任务
+    with pytest.raises(DependencyError):
+        asyncio.run(graph.run())
+
+
+def test_run_in_dependency_order():
+    order = []
+    graph = TaskGraph(max_concurrency=2)
+    graph.add("c", make_task(order, "c", 3), depends_on=["a", "b"])
+    graph.add("a", make_task(order, "a", 1))
+    graph.add("b", make_task(order, "b", 2), depends_on=["a"])
+    assert asyncio.run(graph.run()) == {"a": 1, "b": 2, "c": 3}
+    assert order == ["a", "b", "c"]
+    assert graph.failed() == []
+
+
+def test_dependency_failure_propagates():
+    order = []
+    graph = TaskGraph()
+    graph.add("a", make_task(order, "a", error=RuntimeError("boom")))
+    graph.add("b", make_task(order, "b"), depends_on=["a"])
+    graph.add("c", make_task(order, "c"), depends_on=["b"])
+    graph.add("d", make_task(order, "d", 4))
+    results = asyncio.run(graph.run())
+    assert results == {"d": 4}
+    assert sorted(order) == ["a", "d"]
+    assert isinstance(graph.get_error("a"), RuntimeError)
+    assert isinstance(graph.get_error("b"), DependencyError)
+    assert isinstance(graph.get_error("c"), DependencyError)
+    assert sorted(graph.failed()) == ["a", "b", "c"]
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from impl.config import config
+from impl.core import file_manager, source_cache
+from impl.core._abstract_spider import BaseSpider, SpiderManager
+from impl.core.bundle import BundleReader
+from impl.core.file_manager import FileManager
+from impl.core.source_cache import SourceCache
+from impl.models.base import get_list_adapter
+from impl.models.enums import DataType, Game
+from impl.models.genshin.weapon import Weapon
+
+
+class _WeaponSpider(BaseSpider):
+    game = Game.GENSHIN
+    data_type = DataType.WEAPON
+    model = Weapon
+
+    async def start_crawl(self):
+        return []
+
+
+class AmbrSpider(_WeaponSpider):
+    data_source = "ambr"
+    priority = 100
+
+
+class HoneySpider(_WeaponSpider):
+    data_source = "honey"
+    priority = 110
+
+
+def make_weapon(name, **kwargs):
+    data = {"id": "1", "name": name, "en_name": "", "rank": 4, "weapon_type": "WEAPON_BOW", "description": ""}
+    return Weapon(**{**data, **kwargs})
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_manager, "ASSETS_ROOT", tmp_path)
+    monkeypatch.setattr(file_manager, "ASSETS_DATA_RAW_ROOT", tmp_path / "data" / "raw")
+    monkeypatch.setattr(source_cache, "SOURCE_CACHE_ROOT", tmp_path / "cache")
+    monkeypatch.setattr(config, "WRITE_BEHIND", False)
+    monkeypatch.setattr(config, "SOURCES", ["ambr"])
+    monkeypatch.setattr(SpiderManager, "spiders", {})
+    monkeypatch.setattr(SpiderManager, "unselected", {})
+    return tmp_path
+
+
+def save_filtered(ambr: "AmbrSpider", honey: "HoneySpider", data):
+    async def main():
+        await ambr.initialize()
+        await honey.initialize()
+        units = SpiderManager.get_units()
+        assert [i[2] for i in units] == [ambr]
+        await SpiderManager.save_results(units, {"AmbrSpider": data})
+
+    asyncio.run(main())
+
+
+def test_filtered_save_without_previous_output(root):
+    save_filtered(AmbrSpider(), HoneySpider(), [make_weapon("弓藏")])
+    # 未运行的数据源没有上一次的输出，不覆盖合并结果
+    assert not FileManager.get_raw_file_path(Game.GENSHIN, DataType.WEAPON).exists()
+
+
+def test_filtered_save_merges_previous_output(root):
+    honey = [make_weapon("弓藏", story="故事"), make_weapon("绝弦")]
+    content = get_list_adapter(Weapon).dump_json(honey)
+    asyncio.run(SourceCache.save_output(Game.GENSHIN, DataType.WEAPON, "HoneySpider", content))
+
+    save_filtered(AmbrSpider(), HoneySpider(), [make_weapon("弓藏", en_name="Slingshot")])
+    file_path = FileManager.get_raw_file_path(Game.GENSHIN, DataType.WEAPON)
+    data = get_list_adapter(Weapon).validate_json(file_path.read_bytes())
+    # 按优先级合并：ambr 的字段优先，honey 补全空字段与缺少的数据项
+    assert [(i.name, i.en_name, i.story) for i in data] == [("弓藏", "Slingshot", "故事"), ("绝弦", "", None)]
+    reader = BundleReader(file_path.with_suffix(".bin"))
+    assert len(reader) == 2
+    reader.close()
+
+
+def test_save_output_drops_fingerprint(root):
+    async def main():
+        await SourceCache.save(Game.GENSHIN, DataType.WEAPON, "HoneySpider", "abc", b"[]")
+        await SourceCache.save_output(Game.GENSHIN, DataType.WEAPON, "HoneySpider", b"[]")
+
+    asyncio.run(main())
+    assert SourceCache.has_output(Game.GENSHIN, DataType.WEAPON, "HoneySpider")
+    assert SourceCache.load_fingerprint(Game.GENSHIN, DataType.WEAPON, "HoneySpider") is None
+
+
+def test_dependency_cycle_exits(root, monkeypatch, capsys):
+    monkeypatch.setattr(config, "SOURCES", [])
+    monkeypatch.setattr(AmbrSpider, "depends_on", ("HoneySpider",))
+    monkeypatch.setattr(HoneySpider, "depends_on", ("AmbrSpider",))
+
+    async def main():
+        await AmbrSpider().initialize()
+        await HoneySpider().initialize()
+        await SpiderManager.start_crawl()
+
+    with pytest.raises(SystemExit) as e:
+        asyncio.run(main())
+    assert e.value.code == 1
+    assert "AmbrSpider -> HoneySpider -> AmbrSpider" in capsys.readouterr().out
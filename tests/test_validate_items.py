@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from impl.config import config
+from impl.core import source_cache
+from impl.core._abstract_spider import BaseSpider
+from impl.models.enums import DataType, Game
+from impl.models.genshin.weapon import Weapon
+
+
+class WeaponSpider(BaseSpider):
+    game = Game.GENSHIN
+    data_type = DataType.WEAPON
+    data_source = "ambr"
+    model = Weapon
+
+    async def start_crawl(self):
+        return []
+
+
+def weapon_data(name, **kwargs):
+    data = {"id": "1", "name": name, "en_name": "", "rank": 4, "weapon_type": "WEAPON_BOW", "description": ""}
+    return {**data, **kwargs}
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setattr(source_cache, "SOURCE_CACHE_ROOT", tmp_path / "cache")
+    monkeypatch.setattr(config, "WRITE_BEHIND", False)
+    return tmp_path
+
+
+def test_validate_items():
+    items = {"a": weapon_data("弓藏"), "b": weapon_data("绝弦", rank=5)}
+    result = WeaponSpider().validate_items(items)
+    assert list(result.keys()) == ["a", "b"]
+    assert all(isinstance(i, Weapon) for i in result.values())
+    assert result["b"].rank == 5
+
+
+def test_validate_items_drops_failed(capsys):
+    items = {
+        "a": weapon_data("弓藏"),
+        "b": weapon_data("绝弦", rank="x", weapon_type="WEAPON_X"),
+        "c": weapon_data("西风猎弓"),
+        "d": weapon_data("祭礼弓", id=None),
+    }
+    result = WeaponSpider().validate_items(items)
+    # 失败的项被剔除，其余项重新整批校验，保持原有顺序
+    assert list(result.keys()) == ["a", "c"]
+    assert [i.name for i in result.values()] == ["弓藏", "西风猎弓"]
+    out = capsys.readouterr().out.splitlines()
+    # 每个失败项只打印一行，同一项的多个错误合并
+    assert len(out) == 2
+    assert out[0].startswith("解析数据失败: b rank:") and "weapon_type:" in out[0]
+    assert out[1].startswith("解析数据失败: d id:")
+
+
+def test_validate_items_all_failed():
+    assert WeaponSpider().validate_items({"a": weapon_data("弓藏", rank="x")}) == {}
+
+
+def test_parse_items_skips_invalid(root):
+    async def parse(key, value):
+        return value
+
+    spider = WeaponSpider()
+    spider.source_fingerprint = "fingerprint"
+    items = {"a": weapon_data("弓藏"), "b": weapon_data("绝弦", rank="x")}
+    result = asyncio.run(spider.parse_items(items, parse))
+    assert [i.name for i in result] == ["弓藏"]
+    # 校验失败的项未记录，输出不完整，不记录数据源指纹
+    assert spider.source_fingerprint is None
+    store = asyncio.run(source_cache.ItemHashStore.load(Game.GENSHIN, DataType.WEAPON, "WeaponSpider"))
+    assert store.get_unchanged("a", source_cache.ItemHashStore.hash_item(items["a"])) is not None
+    assert store.get_unchanged("b", source_cache.ItemHashStore.hash_item(items["b"])) is None
+
+    # 再次解析时沿用校验通过的项，只重新解析失败的项
+    parsed = []
+
+    async def parse_again(key, value):
+        parsed.append(key)
+        return value
+
+    result = asyncio.run(WeaponSpider().parse_items(items, parse_again))
+    assert parsed == ["b"]
+    assert [i.name for i in result] == ["弓藏"]
@@ -0,0 +1,65 @@
+import asyncio
+import os
+
+import pytest
+from PIL import Image
+
+from impl.assets_utils import variants
+from impl.assets_utils.variants import GACHA_MEDIUM, THUMBNAIL, ImageVariantBuilder, get_variant_path
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "icon.png"
+    Image.new("RGBA", (256, 512), (255, 0, 0, 255)).save(path)
+    return path
+
+
+def build(tmp_path, jobs):
+    builder = ImageVariantBuilder(tmp_path / "index.json", max_workers=1)
+    return asyncio.run(builder.build(jobs))
+
+
+def test_build_variants(tmp_path, source):
+    built = build(tmp_path, [(source, THUMBNAIL), (source, GACHA_MEDIUM)])
+    assert built == [get_variant_path(source, THUMBNAIL), get_variant_path(source, GACHA_MEDIUM)]
+    with Image.open(built[0]) as image:
+        assert image.format == "WEBP"
+        assert image.size == (64, 128)
+
+
+def test_unchanged_source_skips_pool(tmp_path, source, monkeypatch):
+    build(tmp_path, [(source, THUMBNAIL)])
+
+    def no_pool(*_, **__):
+        raise AssertionError("process pool should not be created")
+
+    monkeypatch.setattr(variants, "ProcessPoolExecutor", no_pool)
+    assert build(tmp_path, [(source, THUMBNAIL)]) == []
+
+
+def test_touched_source_checks_hash(tmp_path, source):
+    build(tmp_path, [(source, THUMBNAIL)])
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    # 修改时间变化但内容相同，计算 hash 后跳过
+    assert build(tmp_path, [(source, THUMBNAIL)]) == []
+
+    Image.new("RGBA", (256, 256), (0, 0, 255, 255)).save(source)
+    assert build(tmp_path, [(source, THUMBNAIL)]) == [get_variant_path(source, THUMBNAIL)]
+
+
+def test_changed_variant_or_missing_target(tmp_path, source):
+    build(tmp_path, [(source, THUMBNAIL)])
+    get_variant_path(source, THUMBNAIL).unlink()
+    assert build(tmp_path, [(source, THUMBNAIL)]) == [get_variant_path(source, THUMBNAIL)]
+    smaller = variants.ImageVariant("thumb", 64)
+    assert build(tmp_path, [(source, smaller)]) == [get_variant_path(source, smaller)]
+
+
+def test_broken_source_is_kept(tmp_path):
+    broken = tmp_path / "broken.png"
+    broken.write_bytes(b"not an image")
+    assert build(tmp_path, [(broken, THUMBNAIL), (tmp_path / "missing.png", THUMBNAIL)]) == []
+    assert broken.exists()
+    assert not get_variant_path(broken, THUMBNAIL).exists()
@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from impl.core import work_queue
+from impl.core.work_queue import WorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(tmp_path / "queue")
+    queue.reset()
+    return queue
+
+
+def test_claim_in_order(queue):
+    queue.put("b", 2, [])
+    queue.put("a", 1, [], game="genshin")
+    unit = queue.claim("w1")
+    assert unit["name"] == "a"
+    assert unit["game"] == "genshin"
+    assert unit["worker"] == "w1"
+    assert not (queue.pending / "a.json").exists()
+    assert (queue.claimed / "a.json").exists()
+    assert queue.claim("w2")["name"] == "b"
+    assert queue.claim("w3") is None
+
+
+def test_only_one_worker_claims(queue, monkeypatch):
+    queue.put("a", 1, [])
+    queue.put("b", 2, [])
+    other = WorkQueue(queue.root)
+    rename = os.rename
+    claimed = {}
+
+    def race(src, dst):
+        # 另一个工作进程在读取 pending 之后、rename 之前抢先领取了同一个单元
+        if not claimed:
+            monkeypatch.setattr(work_queue.os, "rename", rename)
+            claimed.update(other.claim("w2"))
+            monkeypatch.setattr(work_queue.os, "rename", race)
+        rename(src, dst)
+
+    monkeypatch.setattr(work_queue.os, "rename", race)
+    unit = queue.claim("w1")
+    assert claimed["name"] == "a"
+    assert unit["name"] == "b"
+
+
+def test_dependencies(queue):
+    queue.put("a", 1, [])
+    queue.put("b", 0, ["a"])
+    unit = queue.claim("w1")
+    assert unit["name"] == "a"
+    # a 尚未完成，b 不能领取
+    assert queue.claim("w2") is None
+    queue.complete(unit, b"[1]")
+    assert queue.load_result("a") == b"[1]"
+    assert queue.claim("w2")["name"] == "b"
+
+
+def test_dependency_failure(queue):
+    queue.put("a", 1, [])
+    queue.put("b", 2, ["a"])
+    queue.put("c", 3, ["b"])
+    queue.fail(queue.claim("w1"), "boom")
+    assert queue.get_error("a") == "boom"
+    assert queue.claim("w1") is None
+    assert queue.get_error("b") == "dependency a failed"
+    assert queue.get_error("c") == "dependency b failed"
+    assert queue.load_result("b") is None
+    assert queue.is_finished()
+
+
+def test_requeue_stale(queue, monkeypatch):
+    queue.put("a", 1, [])
+    queue.claim("w1")
+    assert not queue.is_finished()
+    assert queue.requeue_stale(60) == []
+    now = work_queue.time.time()
+    monkeypatch.setattr(work_queue.time, "time", lambda: now + 61)
+    assert queue.requeue_stale(60) == ["a"]
+    unit = queue.claim("w2")
+    assert unit["worker"] == "w2"
+    queue.complete(unit, b"[]")
+    assert queue.is_finished()
+
+
+def test_config(queue):
+    assert queue.load_config() == {}
+    queue.save_config({"FORCE": True})
+    assert WorkQueue(queue.root).load_config() == {"FORCE": True}